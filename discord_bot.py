@@ -1,4 +1,5 @@
 
+import asyncio
 import datetime
 from dotenv import load_dotenv
 import os
@@ -8,6 +9,9 @@ from discord.ext import commands
 from discord import app_commands
 from view.tournament_link import TournamentModal
 from models.lang import translate
+from models.set_poller import attach_set_pollers
+from models.match_scheduler import BusyPlayers
+from models.global_scheduler import GlobalMatchScheduler
 
 
 load_dotenv()  # Charge le fichier .env
@@ -22,7 +26,9 @@ bot = commands.Bot(command_prefix="!", intents=intents)
 # AJOUTEZ ces attributs au bot pour éviter les variables globales
 bot.match_manager = []
 bot.current_tournament = []
-bot.player_in_game = []
+bot.player_in_game = BusyPlayers()  # Joueurs en match, toutes pools confondues
+bot.match_scheduler = None  # Attribution commune des stations à toutes les pools (voir /start_matches)
+bot.sgg_request = None  # Client start.gg unique du bot, créé au premier /setup_tournament
 current_tournament_guild_id = None
 
 
@@ -117,7 +123,17 @@ async def start_matches(interaction: discord.Interaction):
         bot.current_tournament[i].sgg_request = bot.current_tournament[0].sgg_request
     await interaction.response.defer()
     for match_manager in bot.match_manager:
-        await match_manager.start_match_processing(interaction)
+        match_manager.tournament.sgg_request = bot.current_tournament[0].sgg_request
+    # Un seul polling des sets par événement, partagé par toutes les pools
+    attach_set_pollers([match_manager.tournament for match_manager in bot.match_manager])
+    # Une seule file de stations pour toutes les pools : une pool terminée cède ses stations aux autres
+    if bot.match_scheduler is not None and bot.match_scheduler.is_running:
+        # Pools configurées depuis le démarrage : elles rejoignent la boucle en cours
+        for match_manager in bot.match_manager:
+            await bot.match_scheduler.add_manager(interaction, match_manager)
+        return
+    bot.match_scheduler = GlobalMatchScheduler(bot.match_manager)
+    await bot.match_scheduler.start(interaction)
 
 @bot.tree.command(name="stop_matches", description=translate("stop_matches_description"))
 @has_role("Tournament Admin")
@@ -135,6 +151,8 @@ async def stop_matches(interaction: discord.Interaction):
         )
         return
     await interaction.response.defer()
+    if bot.match_scheduler is not None:
+        bot.match_scheduler.stop()
     for match_manager in bot.match_manager:
         await match_manager.stop_match_processing(interaction)
     
@@ -158,9 +176,9 @@ async def stop_matches(interaction: discord.Interaction):
         except discord.HTTPException:
             pass
     for match_manager in bot.match_manager:
-        match_manager.reset_all_match()
+        await match_manager.reset_all_match()
         match_manager.active_matches.clear()
-        match_manager.pending_matches.clear()
+        match_manager.pending_matches = []
     await interaction.followup.send(
         translate(
             "full_stop_done",
@@ -175,7 +193,7 @@ async def delete_all_stations(interaction: discord.Interaction):
         if current_tournament:
             for station in current_tournament.station:
                 station['isUsed'] = False
-                current_tournament.sgg_request.delete_station(station['id'])
+                await current_tournament.sgg_request.delete_station(station['id'])
                 num_stations += 1
     await interaction.response.send_message(
         translate("delete_stations_done", num_station=num_stations),
@@ -307,7 +325,10 @@ async def help_command(interaction: discord.Interaction):
 @has_role("Tournament Admin")
 async def force_refresh(interaction: discord.Interaction):
     await interaction.response.defer()  # Important pour éviter l'expiration trop rapide
-    await bot.match_manager.refresh_matches_list(interaction)
+    # Regroupée avec l'actualisation déjà demandée par la boucle, s'il y en a une
+    await asyncio.gather(*[
+        match_manager.request_refresh(interaction, full_sync=True) for match_manager in bot.match_manager
+    ])
     await interaction.followup.send(translate("refresh_done"))
 
 @bot.tree.command(name="key_info", description="Sgg key information")
@@ -329,7 +350,8 @@ async def key_info(interaction: discord.Interaction):
     embed = discord.Embed(title="📊 Statut des clés API", color=0x3498db)
     embed.set_thumbnail(url="https://cdn-icons-png.flaticon.com/512/2889/2889676.png")  # Icône de statistiques
 
-    rate_status = bot.current_tournament[0].sgg_request.get_rate_limit_status()
+    rate_status = await bot.current_tournament[0].sgg_request.get_rate_limit_status()
+    cache_status = rate_status.pop("Cache", None)
 
     for key, status in rate_status.items():
         # Déterminer la couleur en fonction de l'utilisation
@@ -346,6 +368,7 @@ async def key_info(interaction: discord.Interaction):
             color = 0x2ecc71  # Vert
         
         value = (
+            f"🔹 État: **{status.get('état', 'ok')}**\n"
             f"🔹 Utilisées: **{used}** requêtes\n"
             f"🔹 Restantes: **{remaining}** requêtes\n"
             f"📊 Utilisation: **{percentage:.1f}%**\n"
@@ -358,10 +381,56 @@ async def key_info(interaction: discord.Interaction):
             inline=False
         )
 
+    if cache_status:
+        lookups = cache_status['hits'] + cache_status['misses']
+        hit_rate = (cache_status['hits'] / lookups) * 100 if lookups > 0 else 0
+        embed.add_field(
+            name="🗄️ Cache",
+            value=(
+                f"🔹 Hits: **{cache_status['hits']}** (requêtes économisées)\n"
+                f"🔹 Misses: **{cache_status['misses']}**\n"
+                f"🔹 Requêtes partagées (en vol): **{cache_status.get('requêtes_partagées', 0)}**\n"
+                f"📊 Taux de hit: **{hit_rate:.1f}%**\n"
+                f"💾 Entrées: **{cache_status['entrées_mémoire']}** mémoire / **{cache_status['entrées_disque']}** disque"
+            ),
+            inline=False
+        )
+
     # Ajouter un footer avec la date/heure actuelle
     embed.set_footer(text=f"Mis à jour le {datetime.datetime.now().strftime('%d/%m/%Y à %H:%M:%S')}")
 
     await interaction.followup.send(embed=embed)
+
+@bot.tree.command(name="journal_status", description=translate("journal_status_description"))
+@app_commands.describe(retry_failed="Remettre en attente les mutations en échec")
+@has_role("Tournament Admin")
+async def journal_status(interaction: discord.Interaction, retry_failed: bool = False):
+    if not bot.current_tournament:
+        await interaction.response.send_message(translate("no_tournament"))
+        return
+
+    sgg_request = bot.current_tournament[0].sgg_request
+    retried = await sgg_request.retry_failed_mutations() if retry_failed else 0
+    backlog = await sgg_request.get_journal_backlog()
+
+    embed = discord.Embed(
+        title=translate("journal_status_title"),
+        description=translate("journal_counts", pending=backlog['pending'], failed=backlog['failed'], done=backlog['done']),
+        color=0xe74c3c if backlog['failed'] else 0x3498db
+    )
+    entries = [
+        translate("journal_entry", **entry) + (f"\n  ↳ {entry['last_error']}" if entry['last_error'] else "")
+        for entry in backlog['entries']
+    ]
+    embed.add_field(
+        name=translate("journal_entries_label"),
+        value="\n".join(entries)[:1024] if entries else translate("journal_empty"),
+        inline=False
+    )
+    if retry_failed:
+        embed.set_footer(text=translate("journal_retried", count=retried))
+
+    await interaction.response.send_message(embed=embed, ephemeral=True)
     
 
 bot.run(token)
\ No newline at end of file
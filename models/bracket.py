@@ -0,0 +1,114 @@
+from typing import Dict, Iterable, List, Optional
+
+
+class BracketGraph:
+    """
+    Graphe des sets d'une pool : chaque slot d'un set indique le set dont il
+    reçoit le gagnant ou le perdant (prereqType "set").
+
+    depth(set) est la longueur de la plus longue chaîne de sets qui dépendent
+    de lui jusqu'à la fin du bracket (chemin critique) : plus elle est grande,
+    plus le retard de ce set retarde la finale.
+
+    report() prédit, dès qu'un set est terminé, les sets suivants qui
+    deviennent appelables (gagnant et perdant placés selon prereqPlacement).
+    """
+    def __init__(self, sets: Iterable[Dict]):
+        self.successors: Dict[str, List[str]] = {}
+        self.predecessors: Dict[str, List[str]] = {}
+        self.nodes: Dict[str, Dict] = {}
+        # Joueurs déjà placés par les résultats connus : set -> index du slot -> entrant
+        self.placements: Dict[str, Dict[int, Dict]] = {}
+        for bracket_set in sets:
+            set_id = str(bracket_set['id'])
+            self.nodes[set_id] = bracket_set
+            self.successors.setdefault(set_id, [])
+            self.predecessors.setdefault(set_id, [])
+            for slot in bracket_set.get('slots') or []:
+                if slot.get('prereqType') == 'set' and slot.get('prereqId') is not None:
+                    prereq_id = str(slot['prereqId'])
+                    self.successors.setdefault(prereq_id, []).append(set_id)
+                    self.predecessors[set_id].append(prereq_id)
+        self._depths = self._compute_depths()
+
+    def _compute_depths(self) -> Dict[str, int]:
+        """Profondeurs par parcours en profondeur itératif (ordre postfixe)."""
+        depths: Dict[str, int] = {}
+        for root in self.successors:
+            if root in depths:
+                continue
+            stack = [(root, False)]
+            on_path = set()
+            while stack:
+                set_id, expanded = stack.pop()
+                if expanded:
+                    on_path.discard(set_id)
+                    depths[set_id] = max((depths.get(succ, 0) + 1 for succ in self.successors.get(set_id, [])), default=0)
+                    continue
+                if set_id in depths or set_id in on_path:
+                    continue  # Déjà calculé, ou cycle (reset de grande finale)
+                on_path.add(set_id)
+                stack.append((set_id, True))
+                for succ in self.successors.get(set_id, []):
+                    if succ not in depths and succ not in on_path:
+                        stack.append((succ, False))
+        return depths
+
+    def depth(self, set_id) -> int:
+        return self._depths.get(str(set_id), 0)
+
+    def __contains__(self, set_id) -> bool:
+        return str(set_id) in self.successors
+
+    def _is_conditional(self, set_id: str) -> bool:
+        """Reset de grande finale : tous ses slots viennent du même set, il n'est pas toujours joué."""
+        prereqs = set(self.predecessors.get(set_id, []))
+        return len(prereqs) == 1 and len(self.predecessors[set_id]) > 1
+
+    def report(self, set_id, winner: Dict, loser: Dict, known_sets: Optional[Dict] = None) -> List[Dict]:
+        """
+        Enregistre le résultat d'un set et retourne les sets suivants dont les
+        deux joueurs sont désormais connus, au format des sets de iter_event_sets.
+
+        Args:
+            winner, loser: entrants ({'id', 'name'}) du set terminé
+            known_sets: sets déjà reçus de start.gg (SetStore.sets), pour les
+                        slots remplis par un seed ou un résultat antérieur
+        """
+        known_sets = known_sets or {}
+        predicted = []
+        for succ in self.successors.get(str(set_id), []):
+            node = self.nodes.get(succ)
+            if node is None or self._is_conditional(succ) or str(node['id']).startswith('preview'):
+                continue  # Set encore virtuel (bracket non démarré) ou reset éventuel
+            slots = node.get('slots') or []
+            placements = self.placements.setdefault(succ, {})
+            for index, slot in enumerate(slots):
+                if slot.get('prereqType') == 'set' and str(slot.get('prereqId')) == str(set_id):
+                    entrant = loser if slot.get('prereqPlacement') == 2 else winner
+                    # Copie : Match.report_Match compte les jeux gagnés dans l'entrant du set précédent
+                    placements[index] = {'id': entrant['id'], 'name': entrant['name']}
+            known = known_sets.get(node['id'])
+            entrants = []
+            for index in range(len(slots)):
+                entrant = placements.get(index)
+                if entrant is None and known is not None and index < len(known['slots']):
+                    entrant = known['slots'][index]['entrant']
+                entrants.append(entrant)
+            if len(entrants) != 2 or any(entrant is None for entrant in entrants):
+                continue
+            if known is not None and known.get('state', 1) != 1:
+                continue  # Déjà lancé ou terminé
+            predicted.append({
+                'id': node['id'],
+                'identifier': node.get('identifier'),
+                'round': node.get('round'),
+                'fullRoundText': node.get('fullRoundText'),
+                'state': 1,
+                'updatedAt': None,
+                'phaseGroup': known.get('phaseGroup') if known is not None else None,
+                'slots': [{'entrant': entrant} for entrant in entrants],
+                'stream': None,
+                'station': None,
+            })
+        return predicted
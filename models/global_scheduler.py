@@ -0,0 +1,171 @@
+import asyncio
+from collections import deque
+from typing import Dict, List, Optional
+
+from models.lang import translate
+from models.task_supervisor import TaskSupervisor
+
+
+class GlobalMatchScheduler:
+    """
+    Attribution commune à toutes les pools lancées : une seule file de
+    stations libres, servie par ordre de priorité parmi les matchs prêts de
+    chaque gestionnaire (MatchManager).
+
+    - Les pools d'un même tournoi start.gg partagent la même liste de stations :
+      une station libérée par une pool terminée sert aussitôt les autres.
+    - Une station n'est proposée qu'aux pools dont le tournoi possède une
+      station de ce numéro (start.gg rattache les stations à un tournoi).
+    - Les conflits de joueurs entre pools passent par bot.player_in_game,
+      partagé par les planificateurs de toutes les pools.
+    - Une pool configurée après le démarrage rejoint la boucle en cours (add_manager).
+    """
+    # Délai maximal sans réveil : filet de sécurité si un signal était manqué
+    WAKEUP_FALLBACK = 60
+    # Relances de la boucle commune si elle plante hors de son tour protégé
+    LOOP_RESTARTS = 3
+
+    def __init__(self, managers: List):
+        self.managers = managers
+        self.free_stations = deque()
+        self.is_running = False
+        self.task: Optional[asyncio.Task] = None
+        self.tasks = TaskSupervisor("planificateur global")
+        self._wakeup = asyncio.Event()
+        self._unavailable_players = set()
+
+    def _merge_stations(self) -> Dict[object, List[Dict]]:
+        """Fusionne les stations des pools d'un même tournoi et relie les files au gestionnaire global."""
+        stations_by_tournament: Dict[object, List[Dict]] = {}
+        for manager in self.managers:
+            stations = stations_by_tournament.setdefault(manager.tournament.id, [])
+            known = {station['number'] for station in stations}
+            for station in manager.tournament.station or []:
+                if station['number'] not in known:
+                    stations.append(station)
+                    known.add(station['number'])
+        for manager in self.managers:
+            manager.tournament.station = stations_by_tournament[manager.tournament.id]
+            # Mêmes objets partout : une station libérée ou un match prêt réveille la boucle globale
+            manager.scheduler.free_stations = self.free_stations
+            manager._wakeup = self._wakeup
+        return stations_by_tournament
+
+    def _share_stations(self):
+        """Fusionne les stations et remplit la file des stations libres (au démarrage)."""
+        stations_by_tournament = self._merge_stations()
+        busy_stations = {number for manager in self.managers for number in manager.active_matches}
+        numbers = sorted({
+            station['number']
+            for stations in stations_by_tournament.values() for station in stations
+            if not station['isUsed'] and station['number'] not in busy_stations
+        })
+        self.free_stations.clear()
+        self.free_stations.extend(numbers)
+
+    async def start(self, interaction):
+        """Démarre l'attribution automatique pour toutes les pools"""
+        if self.is_running:
+            await interaction.followup.send(translate("match_manager_already_running"))
+            return
+        for manager in self.managers:
+            if not manager.pending_matches and not await manager.initialize_matches(interaction):
+                return
+        self._share_stations()
+        for manager in self.managers:
+            manager.is_running = True
+        self.is_running = True
+        await interaction.followup.send(translate("match_manager_started"))
+        self.task = self.tasks.spawn("loop", lambda: self.processing_loop(interaction), restarts=self.LOOP_RESTARTS)
+
+    async def add_manager(self, interaction, manager):
+        """Ajoute une pool à la boucle en cours : ses matchs et ses nouvelles stations rejoignent les files communes."""
+        if manager.is_running:
+            return
+        if not manager.pending_matches and not await manager.initialize_matches(interaction):
+            return
+        # Seules les stations inconnues jusqu'ici sont ajoutées à la file : les autres
+        # sont peut-être en cours d'attribution par la boucle
+        known = {
+            (other.tournament.id, station['number'])
+            for other in self.managers if other.is_running
+            for station in other.tournament.station or []
+        }
+        if manager not in self.managers:
+            self.managers.append(manager)
+        stations = self._merge_stations()[manager.tournament.id]
+        self.free_stations.extend(
+            station['number'] for station in stations
+            if (manager.tournament.id, station['number']) not in known
+            and not station['isUsed'] and station['number'] not in manager.active_matches
+        )
+        manager.is_running = True
+        await interaction.followup.send(translate("match_manager_started"))
+        self._wakeup.set()
+
+    def _running_managers(self) -> List:
+        return [manager for manager in self.managers if manager.is_running]
+
+    async def processing_loop(self, interaction):
+        """Boucle commune : nettoyage des matchs terminés, attribution, actualisations dues"""
+        while self.is_running and any(manager.has_work() for manager in self._running_managers()):
+            try:
+                self._wakeup.clear()
+                managers = self._running_managers()
+                for manager in managers:
+                    await manager.check_completed_matches(interaction)
+                await self.dispatch(interaction, managers)
+                timeout = min([self.WAKEUP_FALLBACK] + [manager.schedule_due_refresh() for manager in managers])
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
+            except Exception as e:
+                print(translate("processing_loop_error_log", error=e))
+                await asyncio.sleep(10)
+        self.is_running = False
+        for manager in self.managers:
+            manager.is_running = False
+        await interaction.followup.send(translate("all_matches_processed"))
+
+    def _best_match_for(self, station_number: int, managers: List):
+        """Gestionnaire dont le match prêt est le plus prioritaire pour cette station (None si aucun)"""
+        best_manager, best_key = None, None
+        for manager in managers:
+            if not any(station['number'] == station_number for station in manager.tournament.station or []):
+                continue
+            key = manager.scheduler.peek_ready()
+            if key is not None and (best_key is None or key < best_key):
+                best_manager, best_key = manager, key
+        return best_manager
+
+    async def dispatch(self, interaction, managers: Optional[List] = None):
+        """Assigne à chaque station libre le match prêt le plus prioritaire, toutes pools confondues"""
+        managers = managers if managers is not None else self._running_managers()
+        unassigned = deque()
+        while self.free_stations:
+            station_num = self.free_stations.popleft()
+            manager = self._best_match_for(station_num, managers)
+            if manager is None:
+                unassigned.append(station_num)
+                continue
+            match_to_assign = manager.scheduler.pop_ready()
+            if not await manager.start_on_station(interaction, match_to_assign, station_num):
+                # start_on_station a remis la station dans la file : on la réessaiera au prochain réveil
+                unassigned.append(self.free_stations.popleft())
+        self.free_stations.extend(unassigned)
+
+        if self.free_stations:
+            blocked = set()
+            for manager in managers:
+                blocked |= manager.scheduler.blocked_player_names()
+            if blocked and blocked != self._unavailable_players:
+                await interaction.followup.send(
+                    translate("players_unavailable", players=", ".join(blocked)),
+                    delete_after=60  # Supprime le message après 60 secondes
+                )
+                self._unavailable_players = blocked
+
+    def stop(self):
+        self.is_running = False
+        self._wakeup.set()
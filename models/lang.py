@@ -115,9 +115,16 @@ translations = {
         "help_description": "**Commandes disponibles** :",
         "help_config": "`/setup_tournament` - Configurer un nouveau tournoi\n`/start_matches` - Démarrer la gestion automatique\n`/stop_matches` - Tout arrêter et nettoyer\n`/force_refresh` - Rechargement complet (en cas de bug)",
         "help_matches": "`/match_status` - Statut global du gestionnaire\n`/list_stations` - Liste des stations et leur état",
-        "help_maintenance": "`/force_station_free [n°]` - Libérer une station bloquée",
+        "help_maintenance": "`/force_station_free [n°]` - Libérer une station bloquée\n`/journal_status` - Mutations start.gg en attente",
         "help_footer": "💡 Les commandes marquées nécessitent le rôle 'Tournament Admin'",
         "refresh_done": "🔄 Rechargement complet des matchs effectué",
+        "journal_status_description": "Affiche les mutations start.gg en attente d'envoi",
+        "journal_status_title": "📮 Journal des mutations start.gg",
+        "journal_counts": "⏳ En attente: **{pending}**\n❌ En échec: **{failed}**\n✅ Envoyées: **{done}**",
+        "journal_entries_label": "Dernières mutations non envoyées",
+        "journal_entry": "#{id} `{field}` - {status} ({attempts} tentatives, {created_at})",
+        "journal_empty": "Aucune mutation en attente 🎉",
+        "journal_retried": "🔁 {count} mutation(s) en échec remise(s) en attente",
         "pending_matches_count": "🎯 {count} matchs en attente de traitement",
         "bo3_label": "BO3 (standard)",
         "bo5_label": "BO5 (finales)",
@@ -137,6 +144,7 @@ translations = {
         "stop_matches_description": "Arrête la gestion automatique des matchs et nettoie tout",
         "match_manager_stopped": "⏹️ Arrêt du gestionnaire de matchs demandé",
         "new_matches_log": "Nouveaux matchs détectés : {count}",
+        "prestaged_sets_log": "Sets suivants préparés à l'avance : {count}",
         "processing_loop_error_log": "Erreur dans la boucle de traitement : {error}",
         "all_matches_processed": "✅ Tous les matchs ont été traités !",
         "match_assigned": "🎮 Match assigné à la station {station} : **{p1}** vs **{p2}**",
@@ -168,6 +176,7 @@ translations = {
         "status_active_matches_label": "Matchs actifs",
         "status_station_info": "Station {station} : {p1} vs {p2}",
         "status_active_stations_label": "Stations actives",
+        "status_tasks_label": "Tâches en arrière-plan",
         "status_none": "Aucun",
         "station_freed_message": "🔄 Station {station} libérée",
         "error_assigning_match": "❌ Erreur lors de l'assignation du match : {error}",
@@ -332,9 +341,16 @@ translations = {
         "help_description": "**Available commands**:",
         "help_config": "`/setup_tournament` - Configure a new tournament\n`/start_matches` - Start automatic handling\n`/stop_matches` - Stop everything and clean up\n`/force_refresh` - Full refresh (if bug)",
         "help_matches": "`/match_status` - Match manager global status\n`/list_stations` - List stations and their state",
-        "help_maintenance": "`/force_station_free [n°]` - Free a stuck station",
+        "help_maintenance": "`/force_station_free [n°]` - Free a stuck station\n`/journal_status` - Pending start.gg mutations",
         "help_footer": "💡 Commands marked require the 'Tournament Admin' role",
         "refresh_done": "🔄 Full match list refresh done",
+        "journal_status_description": "Shows start.gg mutations waiting to be sent",
+        "journal_status_title": "📮 start.gg mutation journal",
+        "journal_counts": "⏳ Pending: **{pending}**\n❌ Failed: **{failed}**\n✅ Sent: **{done}**",
+        "journal_entries_label": "Latest unsent mutations",
+        "journal_entry": "#{id} `{field}` - {status} ({attempts} attempts, {created_at})",
+        "journal_empty": "No pending mutation 🎉",
+        "journal_retried": "🔁 {count} failed mutation(s) queued again",
         "pending_matches_count": "🎯 {count} matches pending processing",
         "bo3_label": "BO3 (standard)",
         "bo5_label": "BO5 (finals)",
@@ -349,6 +365,7 @@ translations = {
         "match_manager_started": "🚀 Match manager started",
         "match_manager_stopped": "⏹️ Match manager stop requested",
         "new_matches_log": "New matches detected: {count}",
+        "prestaged_sets_log": "Upcoming sets staged ahead: {count}",
         "processing_loop_error_log": "Error in processing loop: {error}",
         "all_matches_processed": "✅ All matches have been processed!",
         "match_assigned": "🎮 Match assigned to station {station}: **{p1}** vs **{p2}**",
@@ -379,6 +396,7 @@ translations = {
         "status_active_matches_label": "Active matches",
         "status_station_info": "Station {station}: {p1} vs {p2}",
         "status_active_stations_label": "Active stations",
+        "status_tasks_label": "Background tasks",
         "status_none": "None",
         "station_freed_message": "🔄 Station {station} freed",
         "error_assigning_match": "❌ Error assigning match: {error}",
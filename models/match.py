@@ -23,15 +23,15 @@ class Match:
         self.characters = {char['id']: char['name'] for char in characters}
         self.charactersName = [char['name'] for char in characters]
         self.charactersIDbyName = {char['name']: char['id'] for char in characters}
-    def start_match(self):
+    async def start_match(self):
         # Start the match using the StartGG API
-        result = self.sgg_request.startMatch(self.matchId)
-    def set_station(self, station_id):
+        result = await self.sgg_request.startMatch(self.matchId)
+    async def set_station(self, station_id):
         # Set the station number for the match
         self.stationNumber = station_id
         print(translate("station_assigned_log", station=station_id, match=self.matchId))
-        self.sgg_request.assign_station_to_set(self.matchId, station_id)
-    def report_Match(self, isWinnerP1 : bool , characterP1_name : int, characterP2_name: int):
+        await self.sgg_request.assign_station_to_set(self.matchId, station_id)
+    async def report_Match(self, isWinnerP1 : bool , characterP1_name : int, characterP2_name: int):
  
         p1_char_id = self.charactersIDbyName.get(characterP1_name, None)
         p2_char_id = self.charactersIDbyName.get(characterP2_name, None)
@@ -55,7 +55,7 @@ class Match:
         self.gameData.append(match)
         if winner['gamesWon'] >= self.number_of_games_to_win:
            # Si tous les jeux sont terminés, on envoie le rapport de match
-           result = self.sgg_request.update_match_score(self.matchId, self.gameData, self.gameData[-1]['winnerId'])
+           result = await self.sgg_request.update_match_score(self.matchId, self.gameData, self.gameData[-1]['winnerId'])
            self.gameData = []  # Réinitialise les données du match après l'envoi
            self.isComplete = True
     # Dans match.py, ajoutez cette méthode :
@@ -1,100 +1,178 @@
 import asyncio
-import copy
+import os
 from typing import Dict, List
 import discord
 from discord.ext import commands
 from models.match import Match
 from models.tournament import Tournament, sggMatch_to_MyMatch
 from models.lang import translate
+from models.poll_controller import AdaptivePollController
+from models.match_scheduler import MatchScheduler
+from models.set_store import SetStore
+from models.task_supervisor import TaskSupervisor
 
 class MatchManager:
+    # Poids de la priorité d'un set, en secondes d'attente équivalentes :
+    # un niveau de chemin critique vaut 10 minutes d'attente de ses joueurs,
+    # chaque jeu de plus au format (BO) en vaut 2 et demie.
+    DEPTH_WEIGHT = 600
+    BEST_OF_WEIGHT = 150
+    # Relances d'une tâche de match qui plante (reprise à la dernière étape connue)
+    MATCH_RESTARTS = 2
+    # Créations anticipées de canaux (prédictions) menées en même temps, au plus
+    PRESTAGE_CONCURRENCY = 4
+    # Suppressions de canaux menées en même temps, au plus (limite de débit de Discord)
+    CHANNEL_DELETION_CONCURRENCY = 4
+    # Tâches de match en même temps, au plus : une par station en temps normal,
+    # filet de sécurité si des tâches s'accumulaient
+    MATCH_CONCURRENCY = 128
+    # Délai avant la suppression du canal d'un set terminé (secondes)
+    CHANNEL_DELETION_DELAY = 60
     def __init__(self, bot: commands.Bot, tournament: Tournament , player_can_check_presence_of_other_player: bool = False):
         self.bot = bot
         self.tournament = tournament
         self.active_matches: Dict[int, Dict] = {}  # station_number -> match_info
-        self.pending_matches: List[Dict] = []  # Liste des matchs en attente
+        # File d'attente indexée (joueurs occupés, sets joués, stations libres, matchs prêts)
+        self._wakeup = asyncio.Event()  # Réveille la boucle d'attribution (voir notify)
+        self._completed_stations = set()  # Stations dont la tâche du match est terminée
+        self.scheduler = MatchScheduler(bot.player_in_game, self.player_keys, self.match_priority, self.notify)
         self.is_running = False
         self.player_can_check_presence_of_other_player = player_can_check_presence_of_other_player  # Indique si les joueurs peuvent vérifier la présence de l'autre
         self.player_list = {}  # Dictionnaire pour stocker les joueurs et leurs IDs Discord
-        self.match_already_played = []
-    def are_players_available(self, match_to_check):
-        """Vérifie si les joueurs du match ne sont pas déjà dans un match en cours"""
-        p1_id = match_to_check['slots'][0]['entrant']['id']
-        p2_id = match_to_check['slots'][1]['entrant']['id']
-        p1_discord_id = self.tournament.DiscordIdForPlayer.get(p1_id)
-        p2_discord_id = self.tournament.DiscordIdForPlayer.get(p2_id)
-        
-        for player_id in self.bot.player_in_game:
-            if player_id == p1_discord_id:
-                return False, match_to_check['slots'][0]['entrant']['name']
-            if player_id == p2_discord_id:
-                return False, match_to_check['slots'][1]['entrant']['name']
-        
-        return True, None
-        
-        return True
-    def deepcopy(self):
-        # Crée une nouvelle instance sans appeler __init__ (pour éviter side effects)
-        new_manager = MatchManager.__new__(MatchManager)
-
-        # Copier les attributs simples
-        new_manager.bot = self.bot  # Référence au bot, pas besoin de deepcopy
-        new_manager.tournament = copy.deepcopy(self.tournament)
-
-        # Copie profonde des dictionnaires et listes
-        new_manager.active_matches = copy.deepcopy(self.active_matches)
-        new_manager.pending_matches = copy.deepcopy(self.pending_matches)
-        new_manager.match_already_played = copy.deepcopy(self.match_already_played)
+        self._refresh_task = None  # Actualisation en arrière-plan (les pages alimentent pending_matches au fil de l'eau)
+        self.tasks = self._create_task_supervisor()  # Toutes les tâches lancées par ce gestionnaire
+        self._assigning = set()  # Sets retirés de la file mais pas encore dans active_matches
+        self._prestaged: Dict = {}  # ID de set prédit -> (tâche de création anticipée de son canal, numéro de synchronisation)
+        self._syncs_started = 0  # Actualisations lancées sans polling partagé (voir syncs_started)
+        # Prochaine actualisation, pas encore lancée : toutes les demandes reçues d'ici là en partagent le résultat
+        self._next_refresh = None
+        self._next_refresh_full = False
+        self._next_refresh_interaction = None
+        # Remplaçables (simulateur) : vérification de présence et report d'un jeu.
+        # None : vues Discord check_player_presence et send_match_report
+        self.presence_check = None
+        self.game_report = None
+        self._poll_controller = self._create_poll_controller()  # Sans polling partagé (voir poll_controller)
+        self._refresh_pages = 0  # Pages reçues par la dernière actualisation
+    def _create_task_supervisor(self) -> TaskSupervisor:
+        return TaskSupervisor(f"pool {self.tournament.selectedPoolId}", limits={
+            "prestage": self.PRESTAGE_CONCURRENCY,
+            "channel_deletion": self.CHANNEL_DELETION_CONCURRENCY,
+            "match": self.MATCH_CONCURRENCY,
+        })
+    @staticmethod
+    def _create_poll_controller() -> AdaptivePollController:
+        # Part du budget de requêtes par minute que le polling des sets peut consommer
+        return AdaptivePollController(budget_fraction=float(os.getenv('STARTGG_POLL_BUDGET_FRACTION', 0.2)))
+    @property
+    def poll_controller(self) -> AdaptivePollController:
+        """Intervalle d'actualisation : celui du polling partagé de l'événement, s'il y en a un."""
+        if self.tournament.set_poller is not None:
+            return self.tournament.set_poller.poll_controller
+        return self._poll_controller
+    @property
+    def syncs_started(self) -> int:
+        """Numéro de la dernière synchronisation des sets lancée (polling partagé ou actualisation de la pool)"""
+        if self.tournament.set_poller is not None:
+            return self.tournament.set_poller.polls_started
+        return self._syncs_started
+    def notify(self):
+        """Signale à la boucle qu'il y a du travail (match prêt, station libérée, match terminé)."""
+        self._wakeup.set()
+    @property
+    def pending_matches(self) -> List[Dict]:
+        """Matchs en attente, dans l'ordre des rounds"""
+        return list(self.scheduler.pending.values())
+    @pending_matches.setter
+    def pending_matches(self, matches: List[Dict]):
+        self.scheduler.set_pending(matches)
+    def player_keys(self, match) -> List:
+        """Identifiants des deux joueurs : ID Discord (commun à toutes les pools), sinon ID d'entrant"""
+        keys = []
+        for slot in match['slots']:
+            entrant_id = slot['entrant']['id']
+            discord_id = self.tournament.DiscordIdForPlayer.get(entrant_id)
+            keys.append(str(discord_id) if discord_id is not None else f"entrant-{entrant_id}")
+        return keys
+    def match_priority(self, match, players) -> float:
+        """
+        Clé de priorité d'un set prêt (la plus petite passe en premier) : sets
+        qui bloquent la plus longue chaîne du bracket, joueurs libres depuis le
+        plus longtemps, puis formats les plus longs.
 
-        # Copie des autres attributs
-        new_manager.is_running = copy.copy(self.is_running)
-        new_manager.player_can_check_presence_of_other_player = copy.copy(self.player_can_check_presence_of_other_player)
-        new_manager.player_list = copy.deepcopy(self.player_list)
- 
-
-        return new_manager
-
-        return new_manager   
+        L'attente des joueurs est comptée par leur heure moyenne de libération
+        plutôt que par une durée : la clé reste valable dans le tas.
+        """
+        bracket = self.tournament.bracket
+        depth = bracket.depth(match['id']) if bracket is not None else 0
+        busy = self.bot.player_in_game
+        idle_since = sum(busy.idle_since_of(player) for player in players) / max(1, len(players))
+        best_of = self.tournament.best_of_for(match)
+        return idle_since - depth * self.DEPTH_WEIGHT - best_of * self.BEST_OF_WEIGHT
     async def initialize_matches(self, interaction):
         """Initialise la liste des matchs en attente"""
         try:
-            matches = self.tournament.get_matches(state=1)  # Matchs non commencés
+            matches = await self.tournament.get_matches(state=1)  # Matchs non commencés
+            if self.tournament.bracket is None:
+                # Sans graphe du bracket, les sets prêts passent dans l'ordre des rounds
+                await self.tournament.load_bracket()
             
             self.pending_matches = matches.copy()
+            # File reconstruite : les prochaines actualisations n'appliquent que les changements suivants
+            self.tournament.set_store.take_changes()
             await interaction.followup.send(translate("pending_matches_count", count=len(self.pending_matches)))
             return True
         except Exception as e:
             await interaction.followup.send(translate("match_fetch_error", error=e))
             return False
-    def reset_all_match(self):
+    async def reset_all_match(self):
         for id in self.active_matches:
             match = self.active_matches[id]
             match_id = match['sgg_match']['id']
-            self.tournament.sgg_request.reset_set(match_id)
+            await self.tournament.sgg_request.reset_set(match_id)
 
-    async def refresh_matches_list(self, interaction=None):
-        """Actualise la liste des matchs en attente depuis l'API"""
+    async def refresh_matches_list(self, interaction=None, full_sync: bool = False):
+        """Actualise la liste des matchs en attente depuis l'API (seuls les sets modifiés sont téléchargés)"""
         try:
-            # Récupérer les nouveaux matchs disponibles
-            new_matches = self.tournament.get_matches(state=1)  # Matchs non commencés
-            
-            # Filtrer les matchs qui ne sont pas déjà en cours ou dans la liste d'attente
-            current_match_ids = set()
-            
-            # Ajouter les IDs des matchs en cours
-            for match_info in self.active_matches.values():
-                current_match_ids.add(match_info['sgg_match']['id'])
-            
-            # Ajouter les IDs des matchs en attente
-            for pending_match in self.pending_matches:
-                current_match_ids.add(pending_match['id'])
-            
-            # Ajouter uniquement les nouveaux matchs
             new_pending_matches = []
-            for match in new_matches:
-                if match['id'] not in current_match_ids:
-                    new_pending_matches.append(match)
-                    self.pending_matches.append(match)
+            self._refresh_pages = 0
+            if self.tournament.set_poller is None:
+                self._syncs_started += 1
+            # Chaque page reçue alimente aussitôt la file d'attente
+            async for matches in self.tournament.iter_matches(full_sync=full_sync):
+                self._refresh_pages += 1
+                # Filtrer les matchs qui ne sont pas déjà en cours, en cours d'assignation ou dans la liste d'attente
+                current_match_ids = set(self._assigning)
+                
+                # Ajouter les IDs des matchs en cours
+                for match_info in self.active_matches.values():
+                    current_match_ids.add(match_info['sgg_match']['id'])
+                
+                # Ajouter uniquement les nouveaux matchs
+                for match in matches:
+                    if match['id'] not in current_match_ids and self.scheduler.add_match(match):
+                        new_pending_matches.append(match)
+            
+            set_store = self.tournament.set_store
+            changes = set_store.take_changes()
+            if full_sync or changes is None:
+                # Synchronisation complète : ne garder que les matchs appelables, dans l'ordre des rounds
+                callable_matches = {match['id']: match for match in set_store.callable_sets()}
+                self.scheduler.set_pending(self.tournament.order_match(
+                    [callable_matches[match_id] for match_id in self.scheduler.pending if match_id in callable_matches]
+                ))
+            else:
+                # Sinon seuls les sets modifiés depuis la dernière actualisation sont revus
+                for set_id in changes:
+                    match = set_store.get(set_id)
+                    if match is None or not SetStore.is_callable(match):
+                        # Plus appelable (commencé, reporté ou mis sur stream)
+                        self.scheduler.remove_match(set_id)
+                    elif set_id in self.scheduler and self.scheduler.pending[set_id] is not match:
+                        # Toujours appelable mais modifié : la file garde la nouvelle version
+                        self.scheduler.remove_match(set_id)
+                        self.scheduler.add_match(match)
+            self._discard_stale_prestaged()
             
             if new_pending_matches and interaction:
                 try:
@@ -114,99 +192,107 @@ class MatchManager:
                         await interaction.channel.send(translate("refresh_error", error=e))
             return 0
     
-    async def start_match_processing(self, interaction):
-        """Démarre le processus automatique de gestion des matchs"""
-        if self.is_running:
-            await interaction.followup.send(translate("match_manager_already_running"))
-            return
-        if not self.pending_matches:
-            if not await self.initialize_matches(interaction):
-                return
-        self.is_running = True
-        await interaction.followup.send(translate("match_manager_started"))
-        asyncio.create_task(self.match_processing_loop(interaction))
+    def request_refresh(self, interaction=None, full_sync: bool = False, delay: float = 0) -> asyncio.Future:
+        """
+        Demande une actualisation des matchs ; retourne un futur (nombre de nouveaux matchs).
+        
+        Les demandes sont regroupées : toutes celles qui arrivent avant le
+        lancement de la prochaine actualisation (au plus tôt delay secondes
+        après la première, et jamais pendant qu'une autre est en cours)
+        déclenchent une seule requête et reçoivent le même résultat.
+        """
+        self._next_refresh_full = self._next_refresh_full or full_sync
+        if interaction is not None:
+            self._next_refresh_interaction = interaction
+        if self._next_refresh is None:
+            self._next_refresh = asyncio.get_running_loop().create_future()
+            result, previous = self._next_refresh, self._refresh_task
+            self._refresh_task = self.tasks.spawn(
+                "refresh", lambda: self._refresh_in_background(result, previous, delay)
+            )
+        return self._next_refresh
+    
+    def schedule_refresh(self):
+        """Lance une actualisation en arrière-plan (regroupée avec celle déjà demandée, s'il y en a une)."""
+        self.request_refresh()
+    
+    async def _refresh_in_background(self, result: asyncio.Future, previous, delay: float):
+        try:
+            # Une seule actualisation à la fois, puis fenêtre de regroupement des demandes
+            if previous is not None and not previous.done():
+                await asyncio.wait([previous])
+            if delay > 0:
+                await asyncio.sleep(delay)
+            # Les demandes suivantes iront dans l'actualisation d'après
+            full_sync, interaction = self._next_refresh_full, self._next_refresh_interaction
+            self._next_refresh = None
+            self._next_refresh_full = False
+            self._next_refresh_interaction = None
+            
+            new_matches_count = await self.refresh_matches_list(interaction, full_sync=full_sync)
+            if new_matches_count > 0:
+                print(translate("new_matches_log", count=new_matches_count))
+            if self.tournament.set_poller is None:
+                # Prochaine actualisation : plus tôt si des stations attendent, plus tard si rien ne bouge
+                # (avec un polling partagé, c'est lui qui la programme pour toutes les pools)
+                self._poll_controller.record_requests(self._refresh_pages)
+                try:
+                    self._poll_controller.update_budget(await self.tournament.sgg_request.get_rate_limit_status())
+                except Exception as e:
+                    print(translate("refresh_error_log", error=e))
+                free_stations = sum(1 for station in self.tournament.station or [] if not station['isUsed'])
+                self._poll_controller.record_poll(new_matches_count, free_stations)
+            if not result.done():
+                result.set_result(new_matches_count)
+        except asyncio.CancelledError:
+            if self._next_refresh is result:
+                self._next_refresh = None
+            result.cancel()
+            raise
+        finally:
+            # La boucle recalcule son délai d'attente (et sa condition de fin)
+            self.notify()
     
     async def stop_match_processing(self, interaction):
         """Arrête le processus automatique"""
         self.is_running = False
+        self.notify()
+        # Matchs en cours, suppressions de canaux, actualisations : rien ne survit à l'arrêt
+        await self.tasks.cancel_all()
         await interaction.followup.send(translate("match_manager_stopped"))
     
-    async def match_processing_loop(self, interaction):
-        """Boucle principale qui gère l'attribution automatique des matchs"""
-        refresh_counter = 0
-        
-        while self.is_running and (self.pending_matches or self.active_matches):
-            try:
-                await self.assign_pending_matches(interaction)
-                await self.check_completed_matches(interaction)
-                refresh_counter += 1
-                if refresh_counter >= 6:
-                    new_matches_count = await self.refresh_matches_list()
-                    if new_matches_count > 0:
-                        print(translate("new_matches_log", count=new_matches_count))
-                    refresh_counter = 0
-                await asyncio.sleep(5)
-            except Exception as e:
-                print(translate("processing_loop_error_log", error=e))
-                await asyncio.sleep(10)
-        self.is_running = False
-        await interaction.followup.send(translate("all_matches_processed"))
+    @property
+    def is_refreshing(self) -> bool:
+        return self._refresh_task is not None and not self._refresh_task.done()
     
-    async def assign_pending_matches(self, interaction):
-        """Assigne les matchs en attente aux stations libres"""
-        if not self.pending_matches:
-            return
-            
+    # Délai maximal sans réveil : filet de sécurité si un signal était manqué
+    WAKEUP_FALLBACK = 60
+    
+    def has_work(self) -> bool:
+        """Reste-t-il des matchs en attente, en cours ou à venir d'une actualisation ?"""
+        return bool(self.scheduler.pending or self.active_matches or self.is_refreshing)
+    
+    def schedule_due_refresh(self) -> float:
+        """Lance l'actualisation si elle est due ; retourne le délai d'attente maximal de la boucle."""
+        if self.poll_controller.due() and not self.is_refreshing:
+            # En arrière-plan : les stations libres reçoivent les matchs dès l'arrivée de leur page
+            self.schedule_refresh()
+        if self.is_refreshing:
+            return self.WAKEUP_FALLBACK
+        return min(self.WAKEUP_FALLBACK, self.poll_controller.seconds_until_due())
+    
+    async def start_on_station(self, interaction, match_to_assign, station_num: int) -> bool:
+        """Lance un match retiré de la file sur une station ; False si l'assignation a échoué"""
+        self._assigning.add(match_to_assign['id'])
         try:
-            # Trouver les stations disponibles
-            available_stations = []
-            for station in self.tournament.station:
-                if not station['isUsed'] and station['number'] not in self.active_matches:
-                    available_stations.append(station['number'])
-            
-            # Variables pour suivre l'état précédent
-            if not hasattr(self, '_last_availability_status'):
-                self._last_availability_status = None
-                self._unavailable_players = set()
-            
-            current_unavailable_players = set()
-            any_available = False
-            
-            # Assigner un match par station disponible
-            for station_num in available_stations:
-                if not self.pending_matches:
-                    break
-                    
-                # Trouver le premier match avec des joueurs disponibles
-                match_index = None
-                for i, match in enumerate(self.pending_matches):
-                    if match['id'] in self.match_already_played:
-                        continue
-                    available, unavailable_player = self.are_players_available(match)
-                    if available:
-                        match_index = i
-                        any_available = True
-                        break
-                    elif unavailable_player:
-                        current_unavailable_players.add(unavailable_player)
-                
-                if match_index is None:
-                    # Aucun match avec joueurs disponibles
-                    if current_unavailable_players != self._unavailable_players:
-                        # Envoyer un message seulement si la liste des joueurs indisponibles a changé
-                        players_list = ", ".join(current_unavailable_players)
-                        await interaction.followup.send(
-                            translate("players_unavailable", players=players_list),
-                            delete_after=60  # Supprime le message après 60 secondes
-                        )
-                        self._unavailable_players = current_unavailable_players
-                    return
-                    
-                match_to_assign = self.pending_matches.pop(match_index)
-                await self.assign_match_to_station(interaction, match_to_assign, station_num)
-                
-        except Exception as e:
-            print(f"Assignation Error: {e}")
+            await self.assign_match_to_station(interaction, match_to_assign, station_num)
+        finally:
+            self._assigning.discard(match_to_assign['id'])
+        if station_num not in self.active_matches:
+            # Échec de l'assignation : la station reste libre, le match reviendra à l'actualisation
+            self.scheduler.free_stations.appendleft(station_num)
+            return False
+        return True
     
     async def assign_match_to_station(self, interaction, sgg_match, station_number: int):
         """Assigne un match spécifique à une station"""
@@ -214,36 +300,38 @@ class MatchManager:
             my_match = sggMatch_to_MyMatch(sgg_match, self.tournament)
             character_names = [char['name'] for char in self.tournament.characterList]
             my_match.set_characters(self.tournament.characterList)
-            my_match.set_station(self.get_station_id_by_number(station_number))
-            my_match.start_match()
+            # Émis ensemble : StartGG les regroupe dans un seul document (une seule requête)
+            await asyncio.gather(
+                my_match.set_station(self.get_station_id_by_number(station_number)),
+                my_match.start_match(),
+                self.tournament.sgg_request.mark_set_as_pending(sgg_match['id'])
+            )
             for station in self.tournament.station:
                 if station['number'] == station_number:
                     station['isUsed'] = True
                     station['current_match'] = sgg_match
                     break
-            # Ajouter les joueurs à la liste des joueurs en jeu
-            p1_id = sgg_match['slots'][0]['entrant']['id']
-            p2_id = sgg_match['slots'][1]['entrant']['id']
-            p1_id = self.tournament.DiscordIdForPlayer.get(p1_id)
-            p2_id = self.tournament.DiscordIdForPlayer.get(p2_id)
-            self.bot.player_in_game.extend([p1_id, p2_id])  # Modification ici
-            channel = await self.create_match_channel(interaction.guild, my_match, station_number)
+            # Marquer les joueurs comme occupés (toutes pools confondues) et le set comme lancé
+            self.scheduler.mark_started(sgg_match)
+            channel = await self._take_prestaged_channel(sgg_match['id'], station_number)
+            if channel is None:
+                channel = await self.create_match_channel(interaction.guild, my_match, station_number)
             self.active_matches[station_number] = {
                 'match_object': my_match,
                 'sgg_match': sgg_match,
                 'channel': channel,
-                'task': None
+                'task': None,
+                'stage': 'presence'  # presence -> playing -> reported (reprise après un plantage)
             }
-            task = asyncio.create_task(self.run_match(channel, my_match, station_number))
-            self.active_matches[station_number]['task'] = task
+            self.active_matches[station_number]['task'] = self.tasks.spawn(
+                "match",
+                lambda: self.run_match(channel, my_match, station_number),
+                restarts=self.MATCH_RESTARTS,
+                on_done=lambda _, station=station_number: self._on_match_done(station)
+            )
             p1_name = sgg_match['slots'][0]['entrant']['name']
             p2_name = sgg_match['slots'][1]['entrant']['name']
-            p1_id = sgg_match['slots'][0]['entrant']['id']
-            p2_id = sgg_match['slots'][1]['entrant']['id']
             try:
-                p1_id = self.tournament.DiscordIdForPlayer.get(p1_id)
-                p2_id = self.tournament.DiscordIdForPlayer.get(p2_id)
-                self.bot.player_in_game.append(p1_id, p2_id)
                 await interaction.followup.send(translate("match_assigned", station=station_number, p1=p1_name, p2=p2_name))
             except:
                 await interaction.channel.send(translate("match_assigned", station=station_number, p1=p1_name, p2=p2_name))
@@ -303,12 +391,18 @@ class MatchManager:
             return None
 
     async def run_match(self, channel, my_match, station_number):
-        """Exécute un match complet avec vérification de présence"""
+        """
+        Exécute un match complet avec vérification de présence.
+
+        Relancée par le superviseur si elle plante : l'étape atteinte
+        (match_info['stage']) et les jeux déjà reportés (gamesWon) sont
+        conservés, le match reprend là où il s'était arrêté.
+        """
         try:
             if not channel:
                 print(translate("no_channel_for_match"))
                 return
-            self.match_already_played.append(my_match.matchId)
+            self.scheduler.played.add(my_match.matchId)
             # Récupérer les informations du match
             p1_id_sgg = my_match.p1['id']
             p2_id_sgg = my_match.p2['id']
@@ -316,39 +410,54 @@ class MatchManager:
             p2_name = my_match.p2['name']
             
             # Récupérer l'ID du set pour les appels API
-            sgg_match = self.active_matches[station_number]['sgg_match']
+            # (le set a déjà été marqué en attente des joueurs lors de l'assignation)
+            match_info = self.active_matches[station_number]
+            sgg_match = match_info['sgg_match']
             set_id = sgg_match['id']
             
-            # Marquer le set comme en attente des joueurs
-            self.tournament.sgg_request.mark_set_as_pending(set_id)
-            
-            # Vérifier la présence des joueurs
-            from view.player_presence import check_player_presence
-            presence_result = await check_player_presence(channel, my_match, self, station_number)
-            
-            if presence_result == 'dq_p1':
-                # Disqualifier le joueur 1, le joueur 2 gagne
-                await channel.send(translate("player_dq_no_show", player=p1_name, winner=p2_name))
-                self.tournament.sgg_request.DQ_player(set_id, p2_id_sgg)
-                await channel.send(translate("channel_delete_soon"))
-                asyncio.create_task(self.schedule_channel_deletion(channel, station_number))
-                return
-                
-            elif presence_result == 'dq_p2':
-                # Disqualifier le joueur 2, le joueur 1 gagne
-                await channel.send(translate("player_dq_no_show", player=p2_name, winner=p1_name))
-                self.tournament.sgg_request.DQ_player(set_id, p1_id_sgg)
-                await channel.send(translate("channel_delete_soon"))
-                asyncio.create_task(self.schedule_channel_deletion(channel, station_number))
+            if match_info.get('stage') != 'reported' and my_match.isComplete:
+                # Plantage entre le dernier jeu reporté et l'enregistrement de l'étape
+                self._record_result(match_info, my_match, my_match.p1.get('gamesWon', 0) > my_match.p2.get('gamesWon', 0))
+            if match_info.get('stage') == 'reported':
+                # Relance après le report du set : suites du report pas encore faites
+                await self._close_reported_match(channel, match_info, station_number)
                 return
             
-            self.tournament.sgg_request.startMatch(set_id)
+            if match_info.get('stage', 'presence') == 'presence':
+                # Vérifier la présence des joueurs
+                presence_check = self.presence_check
+                if presence_check is None:
+                    from view.player_presence import check_player_presence as presence_check
+                presence_result = await presence_check(channel, my_match, self, station_number)
+                
+                if presence_result == 'dq_p1':
+                    # Disqualifier le joueur 1, le joueur 2 gagne
+                    await channel.send(translate("player_dq_no_show", player=p1_name, winner=p2_name))
+                    await self.tournament.sgg_request.DQ_player(set_id, p2_id_sgg)
+                    self._record_result(match_info, my_match, False)
+                    await self._close_reported_match(channel, match_info, station_number)
+                    return
+                    
+                elif presence_result == 'dq_p2':
+                    # Disqualifier le joueur 2, le joueur 1 gagne
+                    await channel.send(translate("player_dq_no_show", player=p2_name, winner=p1_name))
+                    await self.tournament.sgg_request.DQ_player(set_id, p1_id_sgg)
+                    self._record_result(match_info, my_match, True)
+                    await self._close_reported_match(channel, match_info, station_number)
+                    return
+                
+                await self.tournament.sgg_request.startMatch(set_id)
+                match_info['stage'] = 'playing'
             
             
             # Continuer avec le code existant du match...
-            from view.match_report import send_match_report
+            send_match_report = self.game_report
+            if send_match_report is None:
+                from view.match_report import send_match_report
             
-            for game_num in range(1, my_match.bestOf_N + 1):
+            # Après une relance, les jeux déjà reportés ne sont pas rejoués
+            games_played = my_match.p1.get('gamesWon', 0) + my_match.p2.get('gamesWon', 0)
+            for game_num in range(games_played + 1, my_match.bestOf_N + 1):
                 if my_match.isComplete:
                     break
                     
@@ -366,17 +475,18 @@ class MatchManager:
                     )
                     
                     if result["isP1Winner"]:
-                        my_match.report_Match(True, result['p1_char'], result['p2_char'])
+                        await my_match.report_Match(True, result['p1_char'], result['p2_char'])
                         await channel.send(translate("game_reported", game=game_num, winner=p1_name))
                     else:
-                        my_match.report_Match(False, result['p1_char'], result['p2_char'])
+                        await my_match.report_Match(False, result['p1_char'], result['p2_char'])
                         await channel.send(translate("game_reported", game=game_num, winner=p2_name))
                     
                     if my_match.isComplete:
-                        winner_name = p1_name if my_match.p1_score > my_match.p2_score else p2_name
-                        await channel.send(translate("match_finished", winner=winner_name))
-                        await channel.send(translate("channel_delete_soon"))
-                        asyncio.create_task(self.schedule_channel_deletion(channel, station_number))
+                        # report_Match compte les jeux gagnés dans gamesWon (p1_score n'est pas mis à jour)
+                        p1_won = my_match.p1.get('gamesWon', 0) > my_match.p2.get('gamesWon', 0)
+                        self._record_result(match_info, my_match, p1_won)
+                        await channel.send(translate("match_finished", winner=p1_name if p1_won else p2_name))
+                        await self._close_reported_match(channel, match_info, station_number)
                         break
                         
                 except asyncio.TimeoutError:
@@ -384,14 +494,114 @@ class MatchManager:
                     return
                     
         except Exception as e:
-            await channel.send(translate("match_error", error=e))
             print(translate("match_error_log", error=e))
+            try:
+                await channel.send(translate("match_error", error=e))
+            except Exception:
+                pass
+            # Remontée au superviseur, qui relance le match
+            raise
 
     
+    @staticmethod
+    def _record_result(match_info: Dict, my_match, p1_won: bool):
+        """Enregistre le set comme reporté, avant toute suite : une relance n'en saute aucune"""
+        match_info['result'] = (my_match.p1, my_match.p2) if p1_won else (my_match.p2, my_match.p1)
+        match_info['stage'] = 'reported'
+    
+    async def _close_reported_match(self, channel, match_info: Dict, station_number: int):
+        """
+        Suites d'un set reporté : sets suivants préparés, canal supprimé plus tard.
+        Rejouée à chaque relance de la tâche du match, sans rien faire deux fois.
+        """
+        if match_info.get('result') is not None:
+            winner, loser = match_info['result']
+            self.prestage_successors(channel.guild, match_info['sgg_match'], winner, loser, station_number)
+        if match_info.get('deletion_scheduled'):
+            return
+        match_info['deletion_scheduled'] = True
+        self.delete_channel_later(channel, station_number)
+        await channel.send(translate("channel_delete_soon"))
+    
+    def prestage_successors(self, guild, sgg_match, winner, loser, station_number: int):
+        """
+        Prépare les sets suivants du bracket dès le report d'un set : leur
+        canal est créé en arrière-plan, au nom de la station qui va se libérer.
+
+        La prédiction ne sert qu'à gagner la création du canal : le set n'entre
+        dans la file (et n'est attribué) qu'une fois renvoyé appelable par une
+        synchronisation avec start.gg.
+        """
+        bracket = self.tournament.bracket
+        if bracket is None:
+            return []
+        predicted = bracket.report(sgg_match['id'], winner, loser, self.tournament.set_store.sets)
+        current_match_ids = set(self._assigning)
+        current_match_ids.update(match_info['sgg_match']['id'] for match_info in self.active_matches.values())
+        staged = []
+        for match in predicted:
+            if match['id'] in current_match_ids or match['id'] in self._prestaged or match['id'] in self.scheduler.pending:
+                continue
+            my_match = sggMatch_to_MyMatch(match, self.tournament)
+            task = self.tasks.spawn(
+                "prestage", lambda my_match=my_match: self.create_match_channel(guild, my_match, station_number)
+            )
+            # Seule une synchronisation lancée après la prédiction peut la confirmer ou la démentir
+            self._prestaged[match['id']] = (task, self.syncs_started)
+            staged.append(match)
+        if staged:
+            print(translate("prestaged_sets_log", count=len(staged)))
+        return staged
+    
+    async def _take_prestaged_channel(self, set_id, station_number: int):
+        """Canal préparé pour ce set (renommé si une autre station lui a été attribuée), ou None"""
+        task, _ = self._prestaged.pop(set_id, (None, None))
+        if task is None:
+            return None
+        try:
+            channel = await task
+        except Exception as e:
+            print(f"Error match channel: {e}")
+            return None
+        if channel is not None and channel.name != f"station-{station_number}":
+            try:
+                await channel.edit(name=f"station-{station_number}")
+            except discord.HTTPException as e:
+                print(f"Error match channel: {e}")
+        return channel
+    
+    def _discard_stale_prestaged(self):
+        """
+        Supprime les canaux préparés pour des sets qu'une synchronisation lancée
+        depuis la prédiction n'a pas renvoyés appelables (prédiction démentie)
+        """
+        synced = self.syncs_started
+        stale = [
+            set_id for set_id, (_, staged_at) in self._prestaged.items()
+            if staged_at < synced and set_id not in self.scheduler.pending and set_id not in self._assigning
+        ]
+        for set_id in stale:
+            task, _ = self._prestaged.pop(set_id)
+            self.tasks.spawn("channel_deletion", lambda task=task: self._delete_prestaged_channel(task))
+    
+    async def _delete_prestaged_channel(self, task):
+        try:
+            channel = await task
+            if channel is not None:
+                await channel.delete()
+        except Exception as e:
+            print(f"Error match channel: {e}")
+    
+    def delete_channel_later(self, channel, station_number: int):
+        """Supprime le canal après CHANNEL_DELETION_DELAY secondes, en tâche supervisée (annulée à l'arrêt du tournoi)"""
+        self.tasks.spawn(
+            "channel_deletion", lambda: self.schedule_channel_deletion(channel, station_number),
+            delay=self.CHANNEL_DELETION_DELAY
+        )
+    
     async def schedule_channel_deletion(self, channel, station_number: int):
-        """Programme la suppression du channel après 1 minute"""
+        """Supprime le channel du match (appelée par delete_channel_later, une fois le délai écoulé)"""
         try:
-            await asyncio.sleep(60)
             if channel:
                 await channel.delete()
                 print(translate("channel_deleted_log", station=station_number))
@@ -402,19 +612,13 @@ class MatchManager:
         except Exception as e:
             print(translate("channel_delete_error_log", station=station_number, error=e))
     
+    def _on_match_done(self, station_number: int):
+        self._completed_stations.add(station_number)
+        self.notify()
+    
     async def check_completed_matches(self, interaction):
-        """Vérifie et nettoie les matchs terminés"""
-        completed_stations = []
-        
-        for station_num, match_info in self.active_matches.items():
-            task = match_info['task']
-            my_match = match_info['match_object']
-            
-            # Vérifier si le match est terminé
-            if task and task.done() or my_match.isComplete:
-                completed_stations.append(station_num)
-        
-        # Nettoyer les matchs terminés
+        """Nettoie les matchs dont la tâche s'est terminée depuis le dernier passage"""
+        completed_stations, self._completed_stations = self._completed_stations, set()
         for station_num in completed_stations:
             await self.cleanup_completed_match(interaction, station_num)
     
@@ -424,17 +628,8 @@ class MatchManager:
             match_info = self.active_matches.get(station_number)
             if not match_info:
                 return
-            # Retirer les joueurs de la liste des joueurs en jeu
-            sgg_match = match_info['sgg_match']
-            p1_id = sgg_match['slots'][0]['entrant']['id']
-            p2_id = sgg_match['slots'][1]['entrant']['id']
-            p1_id = self.tournament.DiscordIdForPlayer.get(p1_id)
-            p2_id = self.tournament.DiscordIdForPlayer.get(p2_id)
-            try:
-                self.bot.player_in_game.remove(p1_id)
-                self.bot.player_in_game.remove(p2_id)
-            except ValueError:
-                pass  # En cas où les IDs ne sont pas dans la liste
+            # Retirer les joueurs des joueurs en jeu : leurs matchs en attente redeviennent prêts
+            self.scheduler.mark_finished(match_info['sgg_match'])
             for station in self.tournament.station:
                 if station['number'] == station_number:
                     station['isUsed'] = False
@@ -442,7 +637,12 @@ class MatchManager:
                         del station['current_match']
                     break
             del self.active_matches[station_number]
-            await self.refresh_matches_list()
+            self.scheduler.free_station(station_number)
+            # Le set suivant du bracket est peut-être appelable : actualisation avancée,
+            # commune à toutes les stations libérées pendant le délai du poll controller
+            self.poll_controller.notify_completion()
+            self.request_refresh(delay=self.poll_controller.seconds_until_due())
+            self.notify()
             try:
                 await interaction.followup.send(translate("station_freed", number=station_number))
             except:
@@ -464,7 +664,7 @@ class MatchManager:
         )
         embed.add_field(
             name=translate("status_pending_matches_label"),
-            value=len(self.pending_matches),
+            value=len(self.scheduler),
             inline=True
         )
         embed.add_field(
@@ -484,4 +684,10 @@ class MatchManager:
                 value="\n".join(stations_info) if stations_info else translate("status_none"),
                 inline=False
             )
+        task_counts = self.tasks.counts()
+        embed.add_field(
+            name=translate("status_tasks_label"),
+            value="\n".join(f"{kind} : {count}" for kind, count in sorted(task_counts.items())) or translate("status_none"),
+            inline=False
+        )
         await interaction.followup.send(embed=embed)
\ No newline at end of file
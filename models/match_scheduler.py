@@ -0,0 +1,191 @@
+import heapq
+import time
+import weakref
+from collections import Counter, deque
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+
+class BusyPlayers:
+    """
+    Joueurs en match, avec un compteur de références par joueur.
+
+    Partagé entre les gestionnaires de toutes les pools (bot.player_in_game) :
+    quand un joueur redevient libre, chaque planificateur abonné en est
+    prévenu et débloque ses matchs en attente de ce joueur.
+
+    idle_since garde l'heure (clock, time.time par défaut) de fin du dernier
+    match de chaque joueur ; un joueur jamais vu est libre depuis la création
+    du registre.
+    """
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self.clock = clock
+        self.counts = Counter()
+        self.idle_since: Dict[object, float] = {}
+        self.started_at = clock()
+        self._listeners = weakref.WeakSet()
+
+    def __contains__(self, player) -> bool:
+        return self.counts[player] > 0
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def subscribe(self, listener):
+        self._listeners.add(listener)
+
+    def idle_since_of(self, player) -> float:
+        return self.idle_since.get(player, self.started_at)
+
+    def acquire(self, players: Iterable):
+        for player in players:
+            self.counts[player] += 1
+
+    def release(self, players: Iterable):
+        for player in players:
+            if self.counts[player] <= 1:
+                self.counts.pop(player, None)
+                self.idle_since[player] = self.clock()
+                for listener in list(self._listeners):
+                    listener.on_player_idle(player)
+            else:
+                self.counts[player] -= 1
+
+
+class MatchScheduler:
+    """
+    File d'attribution des matchs d'une pool, mise à jour par événements.
+
+    - pending : matchs en attente, dans l'ordre des rounds
+    - ready : tas (priorité, rang, ID) des matchs dont les deux joueurs sont libres
+    - waiting : joueur occupé -> matchs qu'il bloque
+    - played : sets déjà lancés
+    - free_stations : numéros des stations libres
+
+    Prendre le prochain match jouable ou libérer un joueur ne parcourt ni la
+    file d'attente ni la liste des joueurs en match.
+
+    priority(match, joueurs) donne la clé du tas (la plus petite passe en
+    premier) ; elle est calculée à l'entrée dans ready et ne doit donc pas
+    dépendre de l'heure courante. Sans elle, l'ordre des rounds s'applique.
+
+    on_ready() est appelé chaque fois qu'un match devient prêt (nouveau set,
+    joueur libéré dans n'importe quelle pool) pour réveiller l'attribution.
+    """
+    def __init__(self, busy: BusyPlayers, player_keys: Callable[[Dict], List],
+                 priority: Optional[Callable[[Dict, List], float]] = None,
+                 on_ready: Optional[Callable[[], None]] = None):
+        self.busy = busy
+        self.player_keys = player_keys
+        self.priority = priority
+        self.on_ready = on_ready
+        self.pending: Dict[str, Dict] = {}
+        self.ready: List[tuple] = []
+        self.waiting: Dict[object, Set] = {}
+        self.played: Set = set()
+        self.free_stations = deque()
+        self._ranks: Dict[str, int] = {}
+        self._players: Dict[str, List] = {}
+        self._names: Dict[object, str] = {}
+        self._next_rank = 0
+        busy.subscribe(self)
+
+    def __len__(self) -> int:
+        return len(self.pending)
+
+    def __contains__(self, match_id) -> bool:
+        return match_id in self.pending
+
+    def add_match(self, match: Dict) -> bool:
+        """Ajoute un match en fin de file. Retourne False s'il y est déjà ou a déjà été lancé."""
+        match_id = match['id']
+        if match_id in self.pending or match_id in self.played:
+            return False
+        players = self.player_keys(match)
+        self.pending[match_id] = match
+        self._players[match_id] = players
+        self._ranks[match_id] = self._next_rank
+        self._next_rank += 1
+        for player, slot in zip(players, match['slots']):
+            self._names[player] = slot['entrant']['name']
+        self._queue(match_id)
+        return True
+
+    def set_pending(self, matches: Iterable[Dict]):
+        """Remplace la file (ordre des rounds) ; les index sont reconstruits."""
+        self.pending = {}
+        self.ready = []
+        self.waiting = {}
+        self._ranks = {}
+        self._players = {}
+        self._next_rank = 0
+        for match in matches:
+            self.add_match(match)
+
+    def remove_match(self, match_id) -> Optional[Dict]:
+        match = self.pending.pop(match_id, None)
+        if match is None:
+            return None
+        # Les entrées de ready sont ignorées à la lecture (suppression paresseuse)
+        for player in self._players.pop(match_id, []):
+            blocked = self.waiting.get(player)
+            if blocked is not None:
+                blocked.discard(match_id)
+                if not blocked:
+                    del self.waiting[player]
+        self._ranks.pop(match_id, None)
+        return match
+
+    def _queue(self, match_id):
+        """Place le match dans ready, ou en attente de ses joueurs occupés."""
+        busy_players = [player for player in self._players[match_id] if player in self.busy]
+        if busy_players:
+            for player in busy_players:
+                self.waiting.setdefault(player, set()).add(match_id)
+        else:
+            rank = self._ranks[match_id]
+            key = self.priority(self.pending[match_id], self._players[match_id]) if self.priority else rank
+            heapq.heappush(self.ready, (key, rank, match_id))
+            if self.on_ready is not None:
+                self.on_ready()
+
+    def peek_ready(self) -> Optional[tuple]:
+        """Clé (priorité, rang) du match prioritaire dont les joueurs sont libres, sans le retirer."""
+        while self.ready:
+            _, rank, match_id = self.ready[0]
+            if self._ranks.get(match_id) != rank:
+                heapq.heappop(self.ready)
+                continue  # Retiré ou remplacé depuis
+            if any(player in self.busy for player in self._players[match_id]):
+                # Un joueur a été pris par une autre pool entre-temps
+                heapq.heappop(self.ready)
+                self._queue(match_id)
+                continue
+            return self.ready[0][:2]
+        return None
+
+    def pop_ready(self) -> Optional[Dict]:
+        """Retire et retourne le match prioritaire dont les joueurs sont libres."""
+        if self.peek_ready() is None:
+            return None
+        _, _, match_id = heapq.heappop(self.ready)
+        return self.remove_match(match_id)
+
+    def on_player_idle(self, player):
+        for match_id in self.waiting.pop(player, ()):
+            if match_id in self.pending:
+                self._queue(match_id)
+
+    def blocked_player_names(self) -> Set[str]:
+        """Noms des joueurs occupés qui bloquent au moins un match de la file."""
+        return {self._names.get(player, str(player)) for player in self.waiting}
+
+    def mark_started(self, match: Dict):
+        self.played.add(match['id'])
+        self.busy.acquire(self.player_keys(match))
+
+    def mark_finished(self, match: Dict):
+        self.busy.release(self.player_keys(match))
+
+    def free_station(self, station_number: int):
+        if station_number not in self.free_stations:
+            self.free_stations.append(station_number)
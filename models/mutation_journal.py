@@ -0,0 +1,449 @@
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+
+class MutationRejected(Exception):
+    """start.gg a refusé la mutation elle-même (ex: set déjà terminé) : la renvoyer ne changera rien."""
+
+
+class MutationJournal:
+    """
+    Journal durable (SQLite en mode WAL) des mutations start.gg.
+
+    Les mutations sont écrites sur disque puis envoyées par un worker en
+    arrière-plan, et les mutations non envoyées survivent à un redémarrage
+    du bot ou à une coupure réseau. Les mutations d'un même set partent dans
+    l'ordre du journal : tant que la plus ancienne n'est pas envoyée (ou
+    abandonnée), les suivantes l'attendent. Les lots sont choisis par
+    priorité, plusieurs lots peuvent être en vol, et un lot qui échoue est
+    reprogrammé d'un seul bloc. Chaque envoi réserve ses lignes pour une
+    durée limitée afin que plusieurs clients partageant le fichier ne les
+    envoient pas deux fois.
+
+    Les accès se font sur la boucle asyncio : le verrou du fichier n'est
+    jamais attendu plus de busy_timeout secondes. S'il est tenu par un autre
+    processus, la transaction est retentée après LOCK_RETRY_DELAY sans
+    bloquer la boucle. Le résultat de chaque mutation envoyée est gardé dans
+    sa ligne, pour qu'un appelant dont la mutation a été envoyée par un autre
+    processus le retrouve.
+    """
+    PENDING = "pending"
+    DONE = "done"
+    FAILED = "failed"
+    LOCK_RETRY_DELAY = 0.05
+    # Intervalle de relecture de la ligne par submit() (mutation envoyée par un autre processus)
+    WAITER_POLL_INTERVAL = 1.0
+
+    # Un seul journal (et un seul worker) par fichier dans le processus
+    _shared: Dict[str, "MutationJournal"] = {}
+
+    def __init__(self, db_path: str, send: Callable[..., Awaitable[Any]], max_attempts: int = 20,
+                 batch_size: int = 20, base_backoff: float = 2, max_backoff: float = 120, claim_duration: float = 60,
+                 max_batches_in_flight: int = 4, busy_timeout: float = 0.01):
+        """
+        Args:
+            db_path: Fichier SQLite du journal.
+            send: Coroutine send(field, arguments, selection, priority) qui retourne
+                  le résultat de la mutation, None en cas d'échec transitoire, ou
+                  lève MutationRejected si start.gg refuse la mutation.
+        """
+        self.send = send
+        self.max_attempts = max_attempts
+        self.batch_size = batch_size
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.claim_duration = claim_duration
+        self.max_batches_in_flight = max_batches_in_flight
+        self.db = sqlite3.connect(db_path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS mutations ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, idempotency_key TEXT NOT NULL, "
+            "field TEXT NOT NULL, arguments TEXT NOT NULL, selection TEXT NOT NULL, "
+            "priority INTEGER NOT NULL, status TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, "
+            "next_attempt_at REAL NOT NULL, claimed_until REAL NOT NULL DEFAULT 0, last_error TEXT, "
+            "created_at REAL NOT NULL, updated_at REAL NOT NULL, set_id TEXT, result TEXT)"
+        )
+        self._migrate()
+        self.db.execute("CREATE INDEX IF NOT EXISTS mutations_pending_set ON mutations(status, set_id, id)")
+        # Les mutations envoyées depuis plus d'un jour n'ont plus d'intérêt
+        self.db.execute("DELETE FROM mutations WHERE status = ? AND updated_at < ?", (self.DONE, time.time() - 86400))
+        self.db.commit()
+        # Préparation faite : désormais le verrou n'est plus attendu que brièvement (voir _transaction)
+        self.db.execute(f"PRAGMA busy_timeout = {int(busy_timeout * 1000)}")
+        self._worker: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._idle: Optional[asyncio.Event] = None
+        self._batches: Set[asyncio.Task] = set()  # Lots en cours d'envoi
+        self._in_flight: Set[int] = set()  # Lignes de ces lots
+        self._waiters: Dict[int, asyncio.Future] = {}  # ID de ligne -> résultat de son prochain envoi
+
+    @classmethod
+    def shared(cls, db_path: str, send: Callable[..., Awaitable[Any]], **kwargs) -> "MutationJournal":
+        """Journal du fichier db_path, créé au premier appel puis réutilisé par tous les clients du processus."""
+        path = os.path.realpath(db_path)
+        journal = cls._shared.get(path)
+        if journal is None:
+            journal = cls._shared[path] = cls(path, send, **kwargs)
+        return journal
+
+    def _migrate(self):
+        """Journaux créés par une version précédente : colonnes set_id et result, et plus d'unicité globale des clés."""
+        columns = {row[1] for row in self.db.execute("PRAGMA table_info(mutations)")}
+        if "set_id" not in columns:
+            self.db.execute("ALTER TABLE mutations ADD COLUMN set_id TEXT")
+            for row_id, arguments in self.db.execute("SELECT id, arguments FROM mutations").fetchall():
+                self.db.execute(
+                    "UPDATE mutations SET set_id = ? WHERE id = ?",
+                    (self._set_id_of(json.loads(arguments)), row_id)
+                )
+        if "result" not in columns:
+            self.db.execute("ALTER TABLE mutations ADD COLUMN result TEXT")
+        self.db.execute("DROP INDEX IF EXISTS mutations_pending_key")
+
+    async def _transaction(self, work: Callable[[], Any]) -> Any:
+        """
+        Exécute work() dans une transaction BEGIN IMMEDIATE et retourne son
+        résultat. Tant qu'un autre processus tient le verrou, réessaie après
+        LOCK_RETRY_DELAY au lieu de bloquer la boucle.
+        """
+        while True:
+            try:
+                with self.db:
+                    self.db.execute("BEGIN IMMEDIATE")
+                    return work()
+            except sqlite3.OperationalError as e:
+                if "locked" not in str(e):
+                    raise
+            await asyncio.sleep(self.LOCK_RETRY_DELAY)
+
+    @staticmethod
+    def make_idempotency_key(field: str, arguments: Dict[str, tuple]) -> str:
+        values = {name: value for name, (_, value) in arguments.items()}
+        return f"{field}:{json.dumps(values, sort_keys=True, default=str)}"
+
+    @staticmethod
+    def _set_id_of(arguments: Dict[str, tuple]) -> Optional[str]:
+        set_id = arguments.get("setId")
+        return str(set_id[1]) if set_id is not None else None
+
+    def start(self):
+        """Démarre le worker s'il ne tourne pas (nécessite une boucle asyncio active)."""
+        if self._worker is None or self._worker.done():
+            self._wakeup = asyncio.Event()
+            self._idle = asyncio.Event()
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        interrupted = list(self._in_flight)
+        tasks = [task for task in [self._worker, *self._batches] if task and not task.done()]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        # Les lignes des lots interrompus sont de nouveau disponibles tout de suite
+        if interrupted:
+            await self._transaction(lambda: self.db.executemany(
+                "UPDATE mutations SET claimed_until = 0 WHERE id = ?", [(row_id,) for row_id in interrupted]
+            ))
+        self._worker = None
+
+    async def append(self, field: str, arguments: Dict[str, tuple], selection: str, priority: int,
+                     idempotency_key: Optional[str] = None) -> int:
+        """
+        Ajoute une mutation au journal et retourne l'ID de sa ligne.
+
+        Si la dernière mutation en attente du même set est identique (même
+        clé d'idempotence), elle n'est pas ajoutée une seconde fois : l'ID
+        retourné est celui de la ligne existante. Une mutation identique
+        séparée par une autre (report, reset, report) est bien rejouée.
+        """
+        key = idempotency_key or self.make_idempotency_key(field, arguments)
+        set_id = self._set_id_of(arguments)
+
+        def write() -> int:
+            now = time.time()
+            if set_id is None:
+                last = self.db.execute(
+                    "SELECT id, idempotency_key FROM mutations WHERE status = ? AND set_id IS NULL "
+                    "AND idempotency_key = ? ORDER BY id DESC LIMIT 1",
+                    (self.PENDING, key)
+                ).fetchone()
+            else:
+                last = self.db.execute(
+                    "SELECT id, idempotency_key FROM mutations WHERE status = ? AND set_id = ? ORDER BY id DESC LIMIT 1",
+                    (self.PENDING, set_id)
+                ).fetchone()
+            if last is not None and last[1] == key:
+                return last[0]
+            return self.db.execute(
+                "INSERT INTO mutations (idempotency_key, field, arguments, selection, priority, status, "
+                "next_attempt_at, created_at, updated_at, set_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, field, json.dumps(arguments), selection, int(priority), self.PENDING, now, now, now, set_id)
+            ).lastrowid
+
+        row_id = await self._transaction(write)
+        self.start()
+        self._idle.clear()
+        self._wakeup.set()
+        return row_id
+
+    async def submit(self, field: str, arguments: Dict[str, tuple], selection: str, priority: int,
+                     timeout: Optional[float] = None) -> Optional[Any]:
+        """
+        Ajoute une mutation au journal et attend le résultat de son prochain envoi.
+
+        Retourne le résultat de la mutation, ou None si start.gg l'a refusée,
+        si l'envoi a échoué (elle reste alors dans le journal et sera
+        rejouée) ou si rien n'est revenu avant timeout secondes. Si un autre
+        processus partageant le fichier envoie la mutation, son résultat est
+        relu dans le journal.
+        """
+        row_id = await self.append(field, arguments, selection, priority)
+        attempts = self.db.execute("SELECT attempts FROM mutations WHERE id = ?", (row_id,)).fetchone()[0]
+        loop = asyncio.get_running_loop()
+        future = self._waiters.get(row_id)
+        if future is None:
+            future = self._waiters[row_id] = loop.create_future()
+        deadline = None if timeout is None else loop.time() + timeout
+        while True:
+            wait = self.WAITER_POLL_INTERVAL if deadline is None else min(self.WAITER_POLL_INTERVAL, deadline - loop.time())
+            if wait <= 0:
+                return None
+            try:
+                return await asyncio.wait_for(asyncio.shield(future), timeout=wait)
+            except asyncio.TimeoutError:
+                settled, result = self._committed_result(row_id, attempts)
+                if settled:
+                    self._resolve(row_id, result)
+                    return result
+
+    def _committed_result(self, row_id: int, attempts: int) -> Tuple[bool, Optional[Any]]:
+        """
+        Relit la ligne dans le journal et retourne (envoi terminé, résultat)
+        pour un appelant qui l'a vue à attempts tentatives.
+        """
+        row = self.db.execute("SELECT status, attempts, result FROM mutations WHERE id = ?", (row_id,)).fetchone()
+        if row is None:
+            return True, None
+        status, row_attempts, result = row
+        if status == self.DONE:
+            return True, json.loads(result) if result is not None else None
+        return status == self.FAILED or row_attempts > attempts, None
+
+    def _resolve(self, row_id: int, result: Optional[Any]):
+        future = self._waiters.pop(row_id, None)
+        if future is not None and not future.done():
+            future.set_result(result)
+
+    async def _claim_batch(self) -> Tuple[List[tuple], Optional[float]]:
+        """
+        Réserve le prochain lot à envoyer et retourne (lignes, délai avant la
+        prochaine mutation due, None s'il n'y en a pas).
+
+        Seules les premières mutations en attente de chaque set sont
+        candidates ; les sets passent par ordre de priorité (la plus urgente
+        de leurs mutations dues), puis par ancienneté. Le lot garde l'ordre du
+        journal : le document les exécute dans cet ordre.
+        """
+        def claim() -> Tuple[List[tuple], Optional[float]]:
+            now = time.time()
+            rows = self.db.execute(
+                "SELECT id, set_id, field, arguments, selection, priority, attempts, next_attempt_at, claimed_until "
+                "FROM mutations WHERE status = ? ORDER BY id",
+                (self.PENDING,)
+            ).fetchall()
+            groups: Dict[Any, List[tuple]] = {}
+            blocked = set()
+            next_due = None
+            for row in rows:
+                row_id, set_id = row[0], row[1]
+                group = set_id if set_id is not None else ("row", row_id)
+                if group in blocked:
+                    continue
+                if row_id in self._in_flight:
+                    # Ce set attend la fin d'un lot en vol, qui réveillera le worker
+                    blocked.add(group)
+                    continue
+                due_at = max(row[7], row[8])
+                if due_at > now:
+                    blocked.add(group)
+                    next_due = due_at if next_due is None else min(next_due, due_at)
+                    continue
+                groups.setdefault(group, []).append(row)
+            batch = []
+            for group_rows in sorted(groups.values(), key=lambda group_rows: (min(row[5] for row in group_rows), group_rows[0][0])):
+                room = self.batch_size - len(batch)
+                if room <= 0:
+                    next_due = now
+                    break
+                batch.extend(group_rows[:room])
+            batch.sort(key=lambda row: row[0])
+            self.db.executemany(
+                "UPDATE mutations SET claimed_until = ? WHERE id = ?",
+                [(now + self.claim_duration, row[0]) for row in batch]
+            )
+            return batch, None if next_due is None else max(0.0, next_due - now)
+
+        batch, delay = await self._transaction(claim)
+        self._in_flight.update(row[0] for row in batch)
+        return batch, delay
+
+    def _next_due_in(self) -> Optional[float]:
+        row = self.db.execute(
+            "SELECT MIN(MAX(next_attempt_at, claimed_until)) FROM mutations WHERE status = ?", (self.PENDING,)
+        ).fetchone()
+        if row[0] is None:
+            return None
+        return max(0.0, row[0] - time.time())
+
+    async def _run(self):
+        """Boucle du worker : réserve les lots dus et les envoie sans attendre la fin des précédents."""
+        while True:
+            self._wakeup.clear()
+            if len(self._batches) < self.max_batches_in_flight:
+                batch, delay = await self._claim_batch()
+            else:
+                # Un lot qui se termine réveille le worker
+                batch, delay = [], None
+            if batch:
+                self._idle.clear()
+                task = asyncio.create_task(self._send_batch(batch))
+                self._batches.add(task)
+                task.add_done_callback(self._on_batch_done)
+                continue
+            if delay is None and not self._batches:
+                self._idle.set()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def _on_batch_done(self, task: asyncio.Task):
+        self._batches.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"❌ Envoi d'un lot du journal interrompu : {task.exception()}")
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _send_batch(self, batch: List[tuple]):
+        """Envoie un lot (un seul document) et enregistre le résultat de chaque mutation."""
+        try:
+            # Envoyées ensemble : StartGG les regroupe dans un seul document, dans l'ordre
+            results = await asyncio.gather(
+                *[self.send(field, {name: tuple(arg) for name, arg in json.loads(arguments).items()}, selection, priority)
+                  for _, _, field, arguments, selection, priority, _, _, _ in batch],
+                return_exceptions=True
+            )
+            now = time.time()
+            failed = []
+            updates: List[Tuple[str, tuple]] = []
+            resolved: List[Tuple[int, Optional[Any]]] = []
+            # Dernière mutation envoyée de chaque set : une mutation plus ancienne ne doit pas repasser après
+            last_sent = {}
+            for row, result in zip(batch, results):
+                if row[1] is not None and result is not None and not isinstance(result, BaseException):
+                    last_sent[row[1]] = row[0]
+            for row, result in zip(batch, results):
+                row_id, field, attempts = row[0], row[2], row[6]
+                if isinstance(result, MutationRejected):
+                    # Refus définitif : inutile de réessayer, les mutations suivantes du set partent
+                    print(f"❌ Mutation {field} (#{row_id}) refusée par start.gg : {result}")
+                    updates.append((
+                        "UPDATE mutations SET status = ?, attempts = ?, claimed_until = 0, last_error = ?, "
+                        "updated_at = ? WHERE id = ?",
+                        (self.FAILED, attempts + 1, str(result), now, row_id)
+                    ))
+                    resolved.append((row_id, None))
+                elif result is not None and not isinstance(result, BaseException):
+                    updates.append((
+                        "UPDATE mutations SET status = ?, attempts = ?, claimed_until = 0, result = ?, "
+                        "updated_at = ? WHERE id = ?",
+                        (self.DONE, attempts + 1, json.dumps(result, default=str), now, row_id)
+                    ))
+                    resolved.append((row_id, result))
+                elif row[1] in last_sent and last_sent[row[1]] > row_id:
+                    # Une mutation plus récente du set est passée dans le même document : la rejouer la défairait
+                    print(f"❌ Mutation {field} (#{row_id}) abandonnée : une mutation plus récente du set est passée")
+                    updates.append((
+                        "UPDATE mutations SET status = ?, attempts = ?, claimed_until = 0, last_error = ?, "
+                        "updated_at = ? WHERE id = ?",
+                        (self.FAILED, attempts + 1, "dépassée par une mutation plus récente du set", now, row_id)
+                    ))
+                    resolved.append((row_id, None))
+                else:
+                    failed.append((row, str(result) if isinstance(result, BaseException) else "réponse vide"))
+            if failed:
+                # Un seul délai pour tout le lot : il repartira en un seul document
+                attempts = max(row[6] for row, _ in failed) + 1
+                next_attempt_at = now + random.uniform(0, min(self.max_backoff, self.base_backoff * (2 ** attempts)))
+                for row, error in failed:
+                    row_id, field, attempts = row[0], row[2], row[6] + 1
+                    if attempts >= self.max_attempts:
+                        print(f"❌ Mutation {field} (#{row_id}) abandonnée après {attempts} tentatives")
+                        status = self.FAILED
+                    else:
+                        status = self.PENDING
+                    updates.append((
+                        "UPDATE mutations SET status = ?, attempts = ?, next_attempt_at = ?, claimed_until = 0, "
+                        "last_error = ?, updated_at = ? WHERE id = ?",
+                        (status, attempts, next_attempt_at, error, now, row_id)
+                    ))
+                    resolved.append((row_id, None))
+            await self._transaction(lambda: [self.db.execute(sql, parameters) for sql, parameters in updates])
+            for row_id, result in resolved:
+                self._resolve(row_id, result)
+        finally:
+            self._in_flight.difference_update(row[0] for row in batch)
+
+    async def flush(self, timeout: Optional[float] = None):
+        """Attend que toutes les mutations en attente aient été envoyées (ou abandonnées)."""
+        if self._next_due_in() is None:
+            return
+        self.start()
+        self._idle.clear()
+        self._wakeup.set()
+        await asyncio.wait_for(self._idle.wait(), timeout=timeout)
+
+    async def retry_failed(self) -> int:
+        """Remet en attente les mutations abandonnées. Retourne leur nombre."""
+        now = time.time()
+        count = await self._transaction(lambda: self.db.execute(
+            "UPDATE mutations SET status = ?, attempts = 0, next_attempt_at = ?, updated_at = ? "
+            "WHERE status = ?",
+            (self.PENDING, now, now, self.FAILED)
+        ).rowcount)
+        if count:
+            self.start()
+            self._wakeup.set()
+        return count
+
+    def get_backlog(self, limit: int = 10) -> Dict[str, Any]:
+        """Retourne le nombre de mutations par état et les dernières en attente ou en échec."""
+        counts = dict(self.db.execute("SELECT status, COUNT(*) FROM mutations GROUP BY status").fetchall())
+        rows = self.db.execute(
+            "SELECT id, field, status, attempts, last_error, created_at FROM mutations "
+            "WHERE status != ? ORDER BY id DESC LIMIT ?",
+            (self.DONE, limit)
+        ).fetchall()
+        return {
+            "pending": counts.get(self.PENDING, 0),
+            "failed": counts.get(self.FAILED, 0),
+            "done": counts.get(self.DONE, 0),
+            "entries": [
+                {
+                    "id": row[0],
+                    "field": row[1],
+                    "status": row[2],
+                    "attempts": row[3],
+                    "last_error": row[4],
+                    "created_at": time.strftime("%H:%M:%S", time.localtime(row[5]))
+                }
+                for row in rows
+            ]
+        }
@@ -0,0 +1,69 @@
+import time
+from typing import Callable, Dict
+
+
+class AdaptivePollController:
+    """
+    Intervalle d'actualisation adaptatif des sets d'un événement (un par SetPoller).
+
+    L'intervalle descend au minimum quand des sets se terminent ou que de
+    nouveaux matchs arrivent alors que des stations sont libres, et double à
+    chaque actualisation sans changement (jusqu'à max_interval). Il ne descend
+    jamais sous le plancher qui limiterait le polling à budget_fraction du
+    budget de requêtes par minute des clés, compte tenu du nombre de pages
+    (de requêtes) du dernier polling (record_requests).
+
+    clock : horloge en secondes (time.monotonic, ou l'horloge virtuelle du simulateur).
+    """
+    def __init__(self, min_interval: float = 5, base_interval: float = 30, max_interval: float = 240,
+                 budget_fraction: float = 0.2, requests_per_poll: int = 1,
+                 clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self.min_interval = min_interval
+        self.base_interval = base_interval
+        self.max_interval = max_interval
+        self.budget_fraction = budget_fraction
+        self.requests_per_poll = requests_per_poll
+        self.interval = base_interval
+        self.budget_floor = min_interval
+        self.budget = 0  # Requêtes par minute de toutes les clés (dernier update_budget)
+        self.next_poll_at = clock() + base_interval
+
+    def seconds_until_due(self) -> float:
+        return max(0.0, self.next_poll_at - self.clock())
+
+    def due(self) -> bool:
+        return self.clock() >= self.next_poll_at
+
+    def update_budget(self, rate_status: Dict[str, Dict]):
+        """Recalcule le plancher à partir du statut des clés (get_rate_limit_status)."""
+        keys = [status for status in rate_status.values() if isinstance(status, dict) and 'requêtes_utilisées' in status]
+        budget = sum(status['requêtes_utilisées'] + status['requêtes_restantes'] for status in keys)
+        if budget > 0:
+            self.budget = budget
+            self._update_floor()
+
+    def record_requests(self, requests: int):
+        """Nombre de requêtes (pages) du dernier polling : le plancher en tient compte."""
+        self.requests_per_poll = max(1, requests)
+        self._update_floor()
+
+    def _update_floor(self):
+        if self.budget > 0:
+            self.budget_floor = max(self.min_interval, 60 * self.requests_per_poll / (self.budget_fraction * self.budget))
+
+    def record_poll(self, changes: int, free_stations: int):
+        """Ajuste l'intervalle après une actualisation et programme la suivante."""
+        if changes > 0 and free_stations > 0:
+            self.interval = self.min_interval
+        elif changes > 0:
+            self.interval = self.base_interval
+        else:
+            # Rien de nouveau : recul exponentiel
+            self.interval = min(self.max_interval, max(self.interval, self.min_interval) * 2)
+        self.next_poll_at = self.clock() + max(self.interval, self.budget_floor)
+
+    def notify_completion(self):
+        """Un set vient de se terminer : le suivant du bracket est peut-être appelable."""
+        self.interval = self.min_interval
+        self.next_poll_at = min(self.next_poll_at, self.clock() + max(self.min_interval, self.budget_floor))
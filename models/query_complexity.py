@@ -0,0 +1,95 @@
+import re
+from typing import Dict, Optional
+
+# Nombre d'éléments supposé pour les listes non paginées (valeur par défaut : 1)
+LIST_FANOUT = {
+    "slots": 2,
+    "selections": 2,
+    "participants": 1,
+    "authorizations": 4,
+    "games": 5,
+}
+
+_TOKEN = re.compile(r'\.\.\.|"(?:\\.|[^"\\])*"|[$\w]+|[{}():@!\[\],=]')
+_PER_PAGE = re.compile(r'perPage\s*:\s*(\$\w+|\d+)')
+
+
+def estimate_objects(query: str, variables: Optional[Dict] = None, fanout: Dict[str, int] = LIST_FANOUT) -> int:
+    """
+    Estime le nombre d'objets retournés par une requête GraphQL, comme start.gg
+    les compte pour sa limite par requête.
+
+    Chaque champ avec une sélection compte pour un objet ; les 'nodes' d'une
+    connexion paginée sont multipliés par son perPage (littéral ou variable),
+    les autres listes par LIST_FANOUT.
+    """
+    variables = variables or {}
+    tokens = _TOKEN.findall(query)
+    # Saute l'en-tête (nom de l'opération et déclarations de variables)
+    position = 0
+    depth = 0
+    while position < len(tokens) and not (tokens[position] == "{" and depth == 0):
+        if tokens[position] == "(":
+            depth += 1
+        elif tokens[position] == ")":
+            depth -= 1
+        position += 1
+    if position >= len(tokens):
+        return 0
+    cost, _ = _selection_cost(tokens, position, None, variables, fanout)
+    return cost
+
+
+def _selection_cost(tokens, position, page_size, variables, fanout):
+    """Coût de la sélection qui commence à tokens[position] ('{') ; retourne (coût, position après '}')."""
+    position += 1
+    total = 0
+    while position < len(tokens) and tokens[position] != "}":
+        token = tokens[position]
+        if token == "...":
+            # Fragment en ligne : ses champs appartiennent à l'objet courant
+            position += 1
+            if position < len(tokens) and tokens[position] == "on":
+                position += 2
+            if position < len(tokens) and tokens[position] == "{":
+                cost, position = _selection_cost(tokens, position, page_size, variables, fanout)
+                total += cost
+            continue
+        name = token
+        position += 1
+        if position < len(tokens) and tokens[position] == ":":
+            # Alias : le nom du champ suit
+            name = tokens[position + 1]
+            position += 2
+        field_page_size = None
+        if position < len(tokens) and tokens[position] == "(":
+            start = position
+            depth = 0
+            while True:
+                if tokens[position] == "(":
+                    depth += 1
+                elif tokens[position] == ")":
+                    depth -= 1
+                    if depth == 0:
+                        break
+                position += 1
+            position += 1
+            match = _PER_PAGE.search(" ".join(tokens[start:position]))
+            if match:
+                value = match.group(1)
+                field_page_size = int(variables.get(value[1:], 0) if value.startswith("$") else value)
+        while position < len(tokens) and tokens[position] == "@":
+            # Directive (@include...) : ignorée
+            position += 2
+            if position < len(tokens) and tokens[position] == "(":
+                while tokens[position] != ")":
+                    position += 1
+                position += 1
+        if position < len(tokens) and tokens[position] == "{":
+            child_cost, position = _selection_cost(tokens, position, field_page_size, variables, fanout)
+            if name == "nodes" and page_size is not None:
+                multiplier = page_size
+            else:
+                multiplier = fanout.get(name, 1)
+            total += multiplier * (1 + child_cost)
+    return total, position + 1
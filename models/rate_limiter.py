@@ -0,0 +1,391 @@
+import asyncio
+import hashlib
+import itertools
+import sqlite3
+import time
+from collections import deque
+from enum import IntEnum
+from typing import Dict, List, Optional
+
+# Attente minimale retournée par un refus (secondes) : 0 signifie « jeton pris », et
+# une attente infime due aux arrondis du seau ferait tourner le dispatcher sur place
+MIN_WAIT = 0.001
+
+
+class TokenBucket:
+    """Seau à jetons d'une clé API (rechargement continu)."""
+    def __init__(self, capacity: float, refill_rate: float):
+        self.capacity = capacity
+        self.refill_rate = refill_rate  # Jetons ajoutés par seconde
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self.history = deque()  # Horodatages des requêtes de la dernière minute (statut)
+
+    def refill(self, now: float):
+        """Ajoute les jetons accumulés depuis la dernière mise à jour."""
+        elapsed = now - self.updated_at
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_rate)
+            self.updated_at = now
+
+    def take(self):
+        """Consomme un jeton (le seau doit avoir été rechargé juste avant)."""
+        self.tokens -= 1
+        self.history.append(time.time())
+
+    def time_until_token(self) -> float:
+        """Temps exact (en secondes) avant qu'un jeton soit disponible."""
+        if self.tokens >= 1:
+            return 0.0
+        return max(MIN_WAIT, (1 - self.tokens) / self.refill_rate)
+
+    def used_last_minute(self) -> int:
+        now = time.time()
+        while self.history and now - self.history[0] > 60:
+            self.history.popleft()
+        return len(self.history)
+
+
+class InMemoryRateBackend:
+    """Compteurs de débit en mémoire : un seau à jetons par clé (un seul processus)."""
+    def __init__(self, api_keys: List[str], max_requests_per_minute: int = 80, burst: int = 10):
+        refill_rate = (max_requests_per_minute - burst) / 60
+        self.buckets: Dict[str, TokenBucket] = {key: TokenBucket(burst, refill_rate) for key in api_keys}
+        self.blocked_until: Dict[str, float] = {}  # Clé -> fin du délai demandé par start.gg (time.monotonic)
+
+    def try_acquire(self, api_key: str, cap: float) -> float:
+        """
+        Consomme un jeton si la clé en a un et a fait moins de cap requêtes sur la minute.
+        Retourne 0 en cas de succès, sinon le temps d'attente estimé.
+        """
+        bucket = self.buckets[api_key]
+        now = time.monotonic()
+        blocked_until = self.blocked_until.get(api_key, 0.0)
+        if blocked_until > now:
+            return max(MIN_WAIT, blocked_until - now)
+        bucket.refill(now)
+        if bucket.used_last_minute() >= cap:
+            return max(MIN_WAIT, bucket.history[0] + 60 - time.time())
+        if bucket.tokens >= 1:
+            bucket.take()
+            return 0.0
+        return bucket.time_until_token()
+
+    def available(self, api_key: str) -> float:
+        bucket = self.buckets[api_key]
+        bucket.refill(time.monotonic())
+        return bucket.tokens
+
+    def used_last_minute(self, api_key: str) -> int:
+        return self.buckets[api_key].used_last_minute()
+
+    def oldest_request(self, api_key: str) -> Optional[float]:
+        """Horodatage de la plus ancienne requête de la dernière minute (None si aucune)."""
+        bucket = self.buckets[api_key]
+        bucket.used_last_minute()
+        return bucket.history[0] if bucket.history else None
+
+    def block(self, api_key: str, seconds: float):
+        """Pas de jeton pour cette clé avant la fin du délai demandé par start.gg."""
+        bucket = self.buckets[api_key]
+        bucket.tokens = min(bucket.tokens, 0)
+        until = time.monotonic() + max(seconds, 0)
+        self.blocked_until[api_key] = max(self.blocked_until.get(api_key, 0.0), until)
+
+
+class SQLiteRateBackend:
+    """
+    Compteurs de débit partagés entre plusieurs processus via un fichier SQLite.
+
+    Fenêtre glissante de 60 secondes par clé, plus une limite de rafale
+    (burst requêtes sur la durée de rechargement correspondante). Le test et
+    l'enregistrement d'une requête se font dans une même transaction
+    BEGIN IMMEDIATE : deux bots sur les mêmes clés ne dépassent pas la limite.
+    Les clés sont stockées hachées.
+
+    Les appels se font sur la boucle asyncio : le verrou n'est jamais attendu
+    plus de busy_timeout secondes. Si un autre bot le détient, try_acquire
+    retourne LOCK_RETRY_DELAY et le dispatcher réessaie sans bloquer la
+    boucle ; un block() qui ne peut pas écrire est appliqué localement tout
+    de suite, puis enregistré par la transaction suivante.
+    """
+    LOCK_RETRY_DELAY = 0.05
+
+    def __init__(self, db_path: str, max_requests_per_minute: int = 80, burst: int = 10, busy_timeout: float = 0.01):
+        self.max_requests_per_minute = max_requests_per_minute
+        self.burst = burst
+        self.burst_window = 60 * burst / max_requests_per_minute
+        self._pending_blocks: Dict[str, float] = {}  # Clé hachée -> fin du blocage (time.time) pas encore écrite
+        self.db = sqlite3.connect(db_path, timeout=busy_timeout, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS rate_requests (key TEXT NOT NULL, at REAL NOT NULL)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS rate_requests_key_at ON rate_requests(key, at)")
+        self.db.execute("CREATE TABLE IF NOT EXISTS rate_blocks (key TEXT PRIMARY KEY, until REAL NOT NULL)")
+
+    @staticmethod
+    def _hash(api_key: str) -> str:
+        return hashlib.sha256(api_key.encode()).hexdigest()[:16]
+
+    def try_acquire(self, api_key: str, cap: float) -> float:
+        """Même contrat que InMemoryRateBackend.try_acquire, de façon atomique entre processus."""
+        key = self._hash(api_key)
+        now = time.time()
+        try:
+            self.db.execute("BEGIN IMMEDIATE")
+        except sqlite3.OperationalError:
+            # Verrou tenu par un autre bot : nouvel essai un peu plus tard, sans bloquer la boucle
+            return max(self.LOCK_RETRY_DELAY, self._pending_blocks.get(key, 0.0) - now)
+        try:
+            self._write_pending_blocks()
+            self.db.execute("DELETE FROM rate_requests WHERE key = ? AND at <= ?", (key, now - 60))
+            row = self.db.execute("SELECT until FROM rate_blocks WHERE key = ?", (key,)).fetchone()
+            if row and row[0] > now:
+                return max(MIN_WAIT, row[0] - now)
+            count, oldest = self.db.execute(
+                "SELECT COUNT(*), MIN(at) FROM rate_requests WHERE key = ?", (key,)
+            ).fetchone()
+            if count >= min(cap, self.max_requests_per_minute):
+                return max(MIN_WAIT, oldest + 60 - now)
+            recent, oldest_recent = self.db.execute(
+                "SELECT COUNT(*), MIN(at) FROM rate_requests WHERE key = ? AND at > ?", (key, now - self.burst_window)
+            ).fetchone()
+            if recent >= self.burst:
+                return max(MIN_WAIT, oldest_recent + self.burst_window - now)
+            self.db.execute("INSERT INTO rate_requests (key, at) VALUES (?, ?)", (key, now))
+            return 0.0
+        finally:
+            self.db.execute("COMMIT")
+
+    def available(self, api_key: str) -> float:
+        return self.max_requests_per_minute - self.used_last_minute(api_key)
+
+    def used_last_minute(self, api_key: str) -> int:
+        return self.db.execute(
+            "SELECT COUNT(*) FROM rate_requests WHERE key = ? AND at > ?", (self._hash(api_key), time.time() - 60)
+        ).fetchone()[0]
+
+    def oldest_request(self, api_key: str) -> Optional[float]:
+        return self.db.execute(
+            "SELECT MIN(at) FROM rate_requests WHERE key = ? AND at > ?", (self._hash(api_key), time.time() - 60)
+        ).fetchone()[0]
+
+    def block(self, api_key: str, seconds: float):
+        """Le Retry-After reçu par un processus s'applique à tous."""
+        key = self._hash(api_key)
+        self._pending_blocks[key] = max(self._pending_blocks.get(key, 0.0), time.time() + max(seconds, 0))
+        try:
+            self._write_pending_blocks()
+        except sqlite3.OperationalError:
+            # Verrou tenu ailleurs : déjà appliqué ici, écrit par la prochaine transaction
+            pass
+
+    def _write_pending_blocks(self):
+        for key, until in list(self._pending_blocks.items()):
+            self.db.execute(
+                "INSERT INTO rate_blocks (key, until) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET until = MAX(until, excluded.until)",
+                (key, until)
+            )
+            del self._pending_blocks[key]
+
+
+class CircuitBreaker:
+    """
+    Disjoncteur d'une clé API : après plusieurs échecs consécutifs (429/401/5xx),
+    la clé est mise en quarantaine, puis une seule requête de test est autorisée.
+    """
+    CLOSED = "ok"
+    OPEN = "quarantaine"
+    HALF_OPEN = "test"
+
+    def __init__(self, failure_threshold: int = 3, base_cooldown: float = 30, max_cooldown: float = 300):
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = base_cooldown
+        self.max_cooldown = max_cooldown
+        self.state = self.CLOSED
+        self.failures = 0
+        self.trips = 0  # Quarantaines successives, pour allonger la durée
+        self.open_until = 0.0
+        self.probe_in_flight = False
+
+    def allows_request(self, now: float) -> bool:
+        if self.state == self.OPEN and now >= self.open_until:
+            self.state = self.HALF_OPEN
+        if self.state == self.HALF_OPEN:
+            return not self.probe_in_flight
+        return self.state == self.CLOSED
+
+    def on_acquire(self):
+        if self.state == self.HALF_OPEN:
+            self.probe_in_flight = True
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.failures = 0
+        self.trips = 0
+        self.probe_in_flight = False
+
+    def record_failure(self, now: float, retry_after: Optional[float] = None):
+        self.failures += 1
+        self.probe_in_flight = False
+        # Un Retry-After explicite met la clé de côté immédiatement
+        if retry_after is None and self.state == self.CLOSED and self.failures < self.failure_threshold:
+            return
+        cooldown = min(self.max_cooldown, self.base_cooldown * (2 ** self.trips))
+        if retry_after is not None:
+            cooldown = max(retry_after, 0)
+        self.trips += 1
+        self.state = self.OPEN
+        self.open_until = max(self.open_until, now + cooldown)
+
+
+class Priority(IntEnum):
+    """Classes de priorité des requêtes start.gg (plus petit = plus urgent)."""
+    CRITICAL = 0      # Résultats : report, DQ, reset
+    INTERACTIVE = 1   # Actions visibles : assignation, démarrage, appel, configuration
+    BACKGROUND = 2    # Polling et pagination
+
+
+class KeyRateLimiter:
+    """
+    Répartit les requêtes sur plusieurs clés API avec un seau à jetons par clé.
+
+    Le débit de rechargement est choisi pour que la rafale initiale plus le
+    rechargement ne dépassent jamais max_requests_per_minute sur 60 secondes.
+    Les demandes en attente sont servies par priorité ; une part du budget par
+    minute (critical_reserve) est réservée à la classe CRITICAL, et une demande
+    qui attend depuis starvation_timeout secondes monte d'une classe.
+    
+    Les compteurs sont tenus par un backend : en mémoire par défaut, ou
+    SQLiteRateBackend pour partager les limites entre plusieurs bots.
+    """
+    def __init__(self, api_keys: List[str], max_requests_per_minute: int = 80, burst: int = 10,
+                 critical_reserve: float = 0.1, starvation_timeout: float = 20, backend=None):
+        self.api_keys = api_keys
+        self.max_requests_per_minute = max_requests_per_minute
+        self.critical_reserve = critical_reserve
+        self.starvation_timeout = starvation_timeout
+        self.backend = backend or InMemoryRateBackend(api_keys, max_requests_per_minute, burst)
+        self.breakers: Dict[str, CircuitBreaker] = {key: CircuitBreaker() for key in api_keys}
+        # Demandes en attente : (priorité, arrivée, numéro, future)
+        self._waiters = []
+        self._sequence = itertools.count()
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        self._waiting_logged = False
+
+    def _effective_priority(self, waiter, now: float):
+        """Priorité après vieillissement (protection contre la famine), puis ordre d'arrivée."""
+        priority, arrived_at, sequence, _ = waiter
+        promotion = int((now - arrived_at) // self.starvation_timeout)
+        return (max(Priority.CRITICAL, priority - promotion), sequence)
+
+    def _pick_key(self, priority: Priority):
+        """
+        Consomme un jeton sur la clé la moins chargée utilisable pour cette priorité.
+        
+        Returns:
+            (clé, 0) si un jeton a été pris, sinon (None, délai d'attente estimé).
+        """
+        now = time.monotonic()
+        usable = [key for key in self.api_keys if self.breakers[key].allows_request(now)]
+        if not usable:
+            return None, self._time_until_usable()
+        # Les classes non critiques laissent la réserve de la minute aux reports
+        cap = self.max_requests_per_minute
+        if priority != Priority.CRITICAL:
+            cap = (1 - self.critical_reserve) * self.max_requests_per_minute
+        usable.sort(key=lambda k: (self.backend.available(k), -self.backend.used_last_minute(k)), reverse=True)
+        wait = None
+        for key in usable:
+            delay = self.backend.try_acquire(key, cap)
+            if delay == 0:
+                return key, 0.0
+            wait = delay if wait is None else min(wait, delay)
+        return None, wait
+
+    def _time_until_usable(self) -> float:
+        """Temps avant la fin de la première quarantaine (ou avant le prochain test)."""
+        now = time.monotonic()
+        waits = [max(0.0, breaker.open_until - now) for breaker in self.breakers.values()
+                 if breaker.state == CircuitBreaker.OPEN]
+        # Clé en test avec une requête en cours : on revérifie peu après
+        return min(waits) if waits else 0.5
+
+    def record_success(self, api_key: str):
+        """Signale une réponse valide : referme le disjoncteur de la clé."""
+        self.breakers[api_key].record_success()
+
+    def release_probe(self, api_key: str):
+        """Erreur réseau sans lien avec la clé : autorise un nouveau test sans changer l'état."""
+        self.breakers[api_key].probe_in_flight = False
+
+    def record_failure(self, api_key: str, retry_after: Optional[float] = None):
+        """Signale un échec (429/401/5xx) ; retry_after force la quarantaine pour cette durée."""
+        self.breakers[api_key].record_failure(time.monotonic(), retry_after)
+        if retry_after is not None:
+            self.backend.block(api_key, retry_after)
+
+    async def acquire(self, priority: Priority = Priority.INTERACTIVE) -> str:
+        """Attend qu'une clé ait un jeton disponible pour cette priorité, le consomme et retourne la clé."""
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append((priority, time.monotonic(), next(self._sequence), future))
+        self._wakeup.set()
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        return await future
+
+    async def _dispatch(self):
+        """Distribue les jetons aux demandes en attente, par priorité effective."""
+        while True:
+            self._waiters = [waiter for waiter in self._waiters if not waiter[3].done()]
+            if not self._waiters:
+                self._waiting_logged = False
+                return
+            now = time.monotonic()
+            wait = None
+            for waiter in sorted(self._waiters, key=lambda w: self._effective_priority(w, now)):
+                # La réserve dépend de la classe d'origine, le vieillissement ne change que l'ordre
+                key, delay = self._pick_key(waiter[0])
+                if key is not None:
+                    self.breakers[key].on_acquire()
+                    waiter[3].set_result(key)
+                    self._waiters.remove(waiter)
+                    wait = None
+                    break
+                wait = delay if wait is None else min(wait, delay)
+            if wait is None:
+                continue
+            if not self._waiting_logged:
+                print("⚠️  Toutes les clés API ont atteint leur limite. Attente de disponibilité...")
+                self._waiting_logged = True
+            # Réveil exact au prochain jeton, ou plus tôt si une demande plus urgente arrive
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+
+    def get_status(self) -> Dict[str, Dict]:
+        """Retourne le statut de chaque clé (utilisation sur la dernière minute)."""
+        status = {}
+        now = time.time()
+        monotonic_now = time.monotonic()
+        for i, key in enumerate(self.api_keys):
+            used = self.backend.used_last_minute(key)
+            oldest = self.backend.oldest_request(key)
+            next_reset = oldest + 60 if oldest is not None else now
+            breaker = self.breakers[key]
+            breaker.allows_request(monotonic_now)  # Met à jour l'état si la quarantaine est finie
+            state = breaker.state
+            if state == CircuitBreaker.OPEN:
+                end = now + (breaker.open_until - monotonic_now)
+                state = f"{state} jusqu'à {time.strftime('%H:%M:%S', time.localtime(end))}"
+            status[f"Clé {i+1}"] = {
+                "état": state,
+                "requêtes_utilisées": used,
+                "requêtes_restantes": max(0, self.max_requests_per_minute - used),
+                "jetons_disponibles": int(self.backend.available(key)),
+                "prochaine_réinitialisation": time.strftime("%H:%M:%S", time.localtime(next_reset))
+            }
+        return status
@@ -0,0 +1,91 @@
+import copy
+import json
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+class ResponseCache:
+    """
+    Cache des réponses start.gg en lecture seule, indexé par (opération, variables).
+
+    Deux niveaux : un LRU en mémoire et, si db_path est fourni, une base SQLite
+    qui survit aux redémarrages du bot. Chaque opération a sa propre durée de vie.
+    """
+    def __init__(self, ttls: Dict[str, float], max_entries: int = 256, db_path: Optional[str] = None):
+        self.ttls = ttls
+        self.max_entries = max_entries
+        self.memory: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.db = None
+        if db_path:
+            self.db = sqlite3.connect(db_path)
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS response_cache ("
+                "key TEXT PRIMARY KEY, operation TEXT, value TEXT, expires_at REAL)"
+            )
+            self.db.execute("DELETE FROM response_cache WHERE expires_at < ?", (time.time(),))
+            self.db.commit()
+
+    @staticmethod
+    def _make_key(operation: str, variables: Optional[Dict]) -> str:
+        return json.dumps([operation, variables or {}], sort_keys=True, default=str)
+
+    def get(self, operation: str, variables: Optional[Dict]) -> Tuple[bool, Any]:
+        """Retourne (trouvé, valeur) ; les entrées expirées sont ignorées."""
+        key = self._make_key(operation, variables)
+        now = time.time()
+
+        entry = self.memory.get(key)
+        if entry and entry[0] > now:
+            self.memory.move_to_end(key)
+            self.hits += 1
+            # Copie : l'appelant peut modifier la réponse sans altérer le cache
+            return True, copy.deepcopy(entry[1])
+
+        if self.db is not None:
+            row = self.db.execute(
+                "SELECT value, expires_at FROM response_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row and row[1] > now:
+                value = json.loads(row[0])
+                self._store_in_memory(key, row[1], value)
+                self.hits += 1
+                return True, copy.deepcopy(value)
+
+        self.misses += 1
+        return False, None
+
+    def set(self, operation: str, variables: Optional[Dict], value: Any):
+        """Enregistre une réponse si l'opération a une durée de vie configurée."""
+        ttl = self.ttls.get(operation)
+        if not ttl:
+            return
+        key = self._make_key(operation, variables)
+        expires_at = time.time() + ttl
+        self._store_in_memory(key, expires_at, copy.deepcopy(value))
+        if self.db is not None:
+            self.db.execute(
+                "INSERT OR REPLACE INTO response_cache (key, operation, value, expires_at) VALUES (?, ?, ?, ?)",
+                (key, operation, json.dumps(value), expires_at)
+            )
+            self.db.commit()
+
+    def _store_in_memory(self, key: str, expires_at: float, value: Any):
+        self.memory[key] = (expires_at, value)
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+
+    def get_stats(self) -> Dict[str, int]:
+        disk_entries = 0
+        if self.db is not None:
+            disk_entries = self.db.execute("SELECT COUNT(*) FROM response_cache").fetchone()[0]
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entrées_mémoire": len(self.memory),
+            "entrées_disque": disk_entries
+        }
@@ -0,0 +1,135 @@
+import asyncio
+import os
+import time
+from typing import Callable, Dict, List, Optional
+from models.lang import translate
+from models.poll_controller import AdaptivePollController
+
+
+class SetPoller:
+    """
+    Polling partagé des sets de toutes les pools suivies d'un même événement.
+
+    Une seule requête (phaseGroupIds: [...]) par page couvre toutes les pools ;
+    chaque page est répartie dans le store de la pool concernée. Les
+    gestionnaires qui demandent une actualisation pendant un polling en cours
+    en partagent le résultat ; moins de min_interval secondes après le
+    précédent, la demande n'est pas ignorée mais reportée à la fin de
+    l'intervalle (un seul polling pour toutes les demandes reçues d'ici là).
+
+    poll_controller fixe l'intervalle entre deux pollings pour toutes les
+    pools de l'événement ; chaque polling lui rapporte son nombre de pages.
+    """
+    def __init__(self, sgg_request, event_id, min_interval: float = 10, full_sync_every: int = 20,
+                 clock: Callable[[], float] = time.monotonic):
+        self.sgg_request = sgg_request
+        self.clock = clock
+        self.event_id = event_id
+        self.min_interval = min_interval
+        self.full_sync_every = full_sync_every
+        self.tournaments: Dict[str, List] = {}  # ID de pool -> tournois (un par gestionnaire)
+        self._poll_task: Optional[asyncio.Task] = None
+        self._last_poll = None
+        self._full_requested = False  # Une demande de synchronisation complète attend le prochain polling
+        self._syncs_since_full = 0
+        self.polls_started = 0  # Numéro du dernier polling lancé (voir MatchManager.prestage_successors)
+        # Part du budget de requêtes par minute que le polling des sets peut consommer
+        self.poll_controller = AdaptivePollController(
+            budget_fraction=float(os.getenv('STARTGG_POLL_BUDGET_FRACTION', 0.2)), clock=clock
+        )
+
+    def register(self, tournament):
+        """Ajoute la pool sélectionnée du tournoi au polling partagé."""
+        tournaments = self.tournaments.setdefault(str(tournament.selectedPoolId), [])
+        if tournament in tournaments:
+            return
+        tournaments.append(tournament)
+        tournament.set_poller = self
+        # Nouvelle pool : la prochaine synchronisation doit être complète
+        tournament.set_store.reset()
+
+    async def sync(self, full: bool = False):
+        """Met à jour les stores de toutes les pools (ou attend le polling en cours ou programmé)."""
+        self._full_requested = self._full_requested or full
+        if self._poll_task is None or self._poll_task.done():
+            delay = 0.0
+            if self._last_poll is not None:
+                delay = max(0.0, self.min_interval - (self.clock() - self._last_poll))
+            self._poll_task = asyncio.create_task(self._poll(delay))
+        # shield : l'annulation d'un gestionnaire n'interrompt pas le polling des autres
+        await asyncio.shield(self._poll_task)
+
+    async def _poll(self, delay: float):
+        if delay > 0:
+            await asyncio.sleep(delay)
+        self.polls_started += 1
+        # Les demandes de synchronisation complète reçues jusqu'ici sont servies par ce polling
+        full, self._full_requested = self._full_requested, False
+        stores = [tournament.set_store for tournaments in self.tournaments.values() for tournament in tournaments]
+        marks = [store.updated_after for store in stores]
+        full = full or None in marks or self._syncs_since_full >= self.full_sync_every
+        for store in stores:
+            store.start_sync()
+
+        seen_ids = {pool_id: set() for pool_id in self.tournaments}
+        pages = changes = 0
+        async for sets in self.sgg_request.iter_event_sets(
+            self.event_id, list(self.tournaments), 1, updated_after=None if full else min(marks)
+        ):
+            pages += 1
+            by_pool: Dict[str, List] = {}
+            for match in sets:
+                by_pool.setdefault(str(match['phaseGroup']['id']), []).append(match)
+            for pool_id, pool_sets in by_pool.items():
+                # Sets modifiés comptés une fois par pool, quel que soit le nombre de gestionnaires
+                changes += max([tournament.set_store.merge(pool_sets) for tournament in self.tournaments.get(pool_id, [])], default=0)
+                seen_ids.setdefault(pool_id, set()).update(match['id'] for match in pool_sets)
+
+        for pool_id, tournaments in self.tournaments.items():
+            for tournament in tournaments:
+                tournament.set_store.finish_sync(seen_ids[pool_id] if full else None)
+        self._last_poll = self.clock()
+        if full:
+            self._syncs_since_full = 0
+        else:
+            self._syncs_since_full += 1
+        await self._schedule_next_poll(pages, changes)
+
+    async def _schedule_next_poll(self, pages: int, changes: int):
+        """Programme le prochain polling : plus tôt si des stations attendent, plus tard si rien ne bouge."""
+        self.poll_controller.record_requests(pages)
+        try:
+            self.poll_controller.update_budget(await self.sgg_request.get_rate_limit_status())
+        except Exception as e:
+            print(translate("refresh_error_log", error=e))
+        free_stations = {
+            station['number']
+            for tournaments in self.tournaments.values() for tournament in tournaments
+            for station in tournament.station or [] if not station['isUsed']
+        }
+        self.poll_controller.record_poll(changes, len(free_stations))
+
+
+def attach_set_pollers(tournaments: List) -> List[SetPoller]:
+    """
+    Regroupe les tournois (un par pool) par événement et leur attribue un polling partagé.
+
+    Les tournois déjà inscrits gardent leur polling (et leur store) : seules
+    les nouvelles pools rejoignent celui de leur événement, ou en créent un.
+    """
+    def poller_key(tournament):
+        return (id(tournament.sgg_request), tournament.selectedEvent['id'])
+
+    pollers: Dict[tuple, SetPoller] = {}
+    for tournament in tournaments:
+        poller = tournament.set_poller
+        if poller is not None:
+            pollers.setdefault((id(poller.sgg_request), poller.event_id), poller)
+    for tournament in tournaments:
+        if tournament.selectedEvent is None or tournament.selectedPoolId is None or tournament.set_poller is not None:
+            continue
+        key = poller_key(tournament)
+        if key not in pollers:
+            pollers[key] = SetPoller(tournament.sgg_request, tournament.selectedEvent['id'])
+        pollers[key].register(tournament)
+    return list(pollers.values())
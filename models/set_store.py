@@ -0,0 +1,121 @@
+from typing import Dict, Iterable, List, Optional, Set
+
+
+class SetStore:
+    """
+    Copie locale des sets d'une pool, indexée par ID.
+
+    Retient le plus grand updatedAt reçu (high-water mark) pour ne demander
+    ensuite à start.gg que les sets modifiés depuis. Les réponses
+    incrémentales ne sont pas filtrées par état : un set qui passe en cours
+    ou terminé y apparaît et sort alors des sets appelables.
+
+    Les IDs des sets ajoutés, modifiés ou retirés s'accumulent jusqu'au
+    prochain take_changes(), pour que la file d'attente n'applique que le delta.
+    """
+    CALLABLE_STATE = 1  # Set non commencé
+
+    def __init__(self, overlap: int = 5):
+        self.sets: Dict[str, Dict] = {}
+        self.high_water_mark: Optional[int] = None
+        # Plus grand updatedAt de la synchronisation en cours, validé à la fin
+        # seulement : une synchronisation interrompue ne doit pas sauter de sets
+        self._next_mark: Optional[int] = None
+        # Marge (secondes) sur le filtre updatedAfter, pour ne pas rater une
+        # modification faite dans la même seconde que la précédente réponse
+        self.overlap = overlap
+        # IDs modifiés depuis le dernier take_changes(), None après un reset (delta inconnu)
+        self._changes: Optional[Set] = None
+
+    def copy(self) -> "SetStore":
+        """Copie indépendante (les sets reçus sont remplacés, jamais modifiés : ils sont partagés)."""
+        copied = SetStore(self.overlap)
+        copied.sets = dict(self.sets)
+        copied.high_water_mark = self.high_water_mark
+        return copied
+
+    def reset(self):
+        self.sets = {}
+        self.high_water_mark = None
+        self._next_mark = None
+        self._changes = None
+
+    @property
+    def updated_after(self) -> Optional[int]:
+        """Valeur à passer au filtre updatedAfter, ou None si une synchronisation complète est nécessaire."""
+        if self.high_water_mark is None:
+            return None
+        return self.high_water_mark - self.overlap
+
+    def start_sync(self):
+        """Oublie le high-water mark d'une synchronisation précédente interrompue."""
+        self._next_mark = None
+
+    def merge(self, sets: Iterable[Dict]) -> int:
+        """
+        Intègre une page de sets reçus de start.gg (avec 'state' et 'updatedAt').
+        Retourne le nombre de sets ajoutés ou modifiés.
+        """
+        changed = 0
+        for new_set in sets:
+            set_id = new_set['id']
+            if self.sets.get(set_id) != new_set:
+                self.sets[set_id] = new_set
+                changed += 1
+                if self._changes is not None:
+                    self._changes.add(set_id)
+            updated_at = new_set.get('updatedAt')
+            if updated_at is not None:
+                current = self._next_mark if self._next_mark is not None else self.high_water_mark
+                if current is None or updated_at > current:
+                    self._next_mark = updated_at
+        return changed
+
+    def finish_sync(self, seen_ids: Optional[Iterable] = None) -> int:
+        """
+        Valide le high-water mark une fois toutes les pages reçues.
+
+        Args:
+            seen_ids: IDs reçus lors d'une synchronisation complète ; les autres
+                      sets sont alors retirés. None pour une synchronisation incrémentale.
+
+        Returns:
+            Nombre de sets retirés.
+        """
+        if self._next_mark is not None:
+            self.high_water_mark = self._next_mark
+            self._next_mark = None
+        if seen_ids is None:
+            return 0
+        seen_ids = set(seen_ids)
+        removed = [set_id for set_id in self.sets if set_id not in seen_ids]
+        for set_id in removed:
+            del self.sets[set_id]
+            if self._changes is not None:
+                self._changes.add(set_id)
+        return len(removed)
+
+    def take_changes(self) -> Optional[Set]:
+        """
+        Retourne les IDs des sets ajoutés, modifiés ou retirés depuis l'appel
+        précédent, puis repart de zéro. None si le store a été vidé entre-temps :
+        le delta est inconnu et la file doit être reconstruite.
+        """
+        changes, self._changes = self._changes, set()
+        return changes
+
+    def get(self, set_id) -> Optional[Dict]:
+        return self.sets.get(set_id)
+
+    @classmethod
+    def is_callable(cls, match: Dict) -> bool:
+        """Set non commencé, avec deux joueurs et hors stream."""
+        return (
+            match.get('state', cls.CALLABLE_STATE) == cls.CALLABLE_STATE
+            and match['slots'][0]['entrant'] is not None
+            and match['slots'][1]['entrant'] is not None
+            and match['stream'] is None
+        )
+
+    def callable_sets(self) -> List[Dict]:
+        return [s for s in self.sets.values() if self.is_callable(s)]
@@ -0,0 +1,266 @@
+import asyncio
+import inspect
+import itertools
+import json
+import os
+import socket
+import sys
+import tempfile
+from typing import Any, Dict, Optional
+
+from dotenv import load_dotenv
+from models.startgg_request import StartGG
+
+# Les pages d'entrants ou de sets dépassent largement la limite par défaut (64 Ko) d'une ligne
+STREAM_LIMIT = 16 * 1024 * 1024
+# Sockets Unix absents de certaines plateformes (anciens Windows) : la passerelle n'y est pas disponible
+GATEWAY_SUPPORTED = hasattr(socket, "AF_UNIX")
+
+
+def runtime_dir() -> str:
+    """Dossier privé (0700) de l'utilisateur : le socket donne accès aux clés API du bot."""
+    # Sans getuid (Windows), le dossier temporaire est déjà propre à l'utilisateur
+    name = f"startgg-{os.getuid()}" if hasattr(os, "getuid") else "startgg"
+    return os.getenv("XDG_RUNTIME_DIR") or os.path.join(tempfile.gettempdir(), name)
+
+
+def default_socket_path() -> str:
+    return os.path.join(runtime_dir(), "startgg_gateway.sock")
+
+
+class StartGGGateway:
+    """
+    Passerelle start.gg : un processus local possède les clés API, le cache, les
+    regroupements de mutations et le rate limiting, et sert les bots par un
+    socket Unix.
+
+    Protocole : un message JSON par ligne.
+      requête  : {"id": n, "method": "get_tournament", "args": [...], "kwargs": {...}}
+      réponse  : {"id": n, "result": ...} ou {"id": n, "error": "..."}
+      générateurs (iter_*) : {"id": n, "page": [...]} pour chaque page, puis {"id": n, "done": true}
+    """
+    def __init__(self, client: StartGG, socket_path: Optional[str] = None):
+        self.client = client
+        self.socket_path = socket_path or default_socket_path()
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    # Réservées au processus passerelle
+    PRIVATE_METHODS = {"close"}
+
+    def _resolve(self, method: str):
+        """Seules les méthodes publiques de StartGG sont exposées."""
+        if method.startswith("_") or method in self.PRIVATE_METHODS or not hasattr(self.client, method):
+            return None
+        attr = getattr(self.client, method)
+        if not callable(attr):
+            return None
+        return attr
+
+    async def start(self):
+        # Seul l'utilisateur du bot peut joindre le socket : dossier privé créé en 0700, socket en 0600
+        socket_dir = os.path.dirname(os.path.abspath(self.socket_path))
+        if not os.path.isdir(socket_dir):
+            os.makedirs(socket_dir, mode=0o700)
+        elif hasattr(os, "getuid") and socket_dir == runtime_dir() and os.stat(socket_dir).st_uid != os.getuid():
+            raise PermissionError(f"Le dossier du socket {socket_dir} appartient à un autre utilisateur")
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        # umask : le socket n'est jamais accessible aux autres, même avant le chmod
+        previous_umask = os.umask(0o177)
+        try:
+            self._server = await asyncio.start_unix_server(self._handle_connection, path=self.socket_path, limit=STREAM_LIMIT)
+        finally:
+            os.umask(previous_umask)
+        os.chmod(self.socket_path, 0o600)
+        print(f"🔌 Passerelle start.gg en écoute sur {self.socket_path}")
+
+    async def serve_forever(self):
+        await self.start()
+        try:
+            async with self._server:
+                await self._server.serve_forever()
+        finally:
+            await self.client.journal.flush(timeout=30)
+            await self.client.close()
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        write_lock = asyncio.Lock()
+        tasks = set()
+
+        async def send(message: Dict[str, Any]):
+            async with write_lock:
+                writer.write(json.dumps(message).encode() + b"\n")
+                await writer.drain()
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                # Chaque requête est traitée à part : une réponse lente ne bloque pas les autres
+                task = asyncio.create_task(self._handle_request(json.loads(line), send))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except (ConnectionError, json.JSONDecodeError) as e:
+            print(f"❌ Connexion à la passerelle interrompue: {e}")
+        finally:
+            for task in tasks:
+                task.cancel()
+            writer.close()
+
+    async def _handle_request(self, request: Dict[str, Any], send):
+        request_id = request.get("id")
+        method = self._resolve(request.get("method", ""))
+        if method is None:
+            await send({"id": request_id, "error": f"Méthode inconnue: {request.get('method')}"})
+            return
+        try:
+            if inspect.isasyncgenfunction(method):
+                async for page in method(*request.get("args", []), **request.get("kwargs", {})):
+                    await send({"id": request_id, "page": page})
+                await send({"id": request_id, "done": True})
+                return
+            result = method(*request.get("args", []), **request.get("kwargs", {}))
+            if inspect.isawaitable(result):
+                result = await result
+            await send({"id": request_id, "result": result})
+        except ConnectionError:
+            pass
+        except Exception as e:
+            await send({"id": request_id, "error": str(e)})
+
+
+class GatewayClient:
+    """
+    Client de la passerelle, utilisable à la place de StartGG : mêmes méthodes,
+    exécutées par le processus passerelle.
+    """
+    def __init__(self, socket_path: Optional[str] = None):
+        self.socket_path = socket_path or default_socket_path()
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._connect_lock: Optional[asyncio.Lock] = None
+        self._ids = itertools.count(1)
+        # Réponses attendues : file des messages reçus pour chaque requête
+        self._pending: Dict[int, asyncio.Queue] = {}
+        self._generators = {
+            name for name, attr in inspect.getmembers(StartGG) if inspect.isasyncgenfunction(attr)
+        }
+
+    async def _connect(self):
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        async with self._connect_lock:
+            if self._writer is not None and not self._writer.is_closing():
+                return
+            self._reader, self._writer = await asyncio.open_unix_connection(self.socket_path, limit=STREAM_LIMIT)
+            self._reader_task = asyncio.create_task(self._read_responses())
+
+    async def _read_responses(self):
+        try:
+            while True:
+                line = await self._reader.readline()
+                if not line:
+                    break
+                message = json.loads(line)
+                queue = self._pending.get(message.get("id"))
+                if queue is not None:
+                    queue.put_nowait(message)
+        finally:
+            # Passerelle arrêtée : les requêtes en cours échouent
+            self._writer.close()
+            for queue in self._pending.values():
+                queue.put_nowait({"error": "Passerelle start.gg déconnectée"})
+
+    async def _send(self, method: str, args, kwargs):
+        """Envoie une requête ; retourne (id, file des messages de réponse)."""
+        await self._connect()
+        request_id = next(self._ids)
+        queue = asyncio.Queue()
+        self._pending[request_id] = queue
+        try:
+            self._writer.write(json.dumps({"id": request_id, "method": method, "args": list(args), "kwargs": kwargs}).encode() + b"\n")
+            await self._writer.drain()
+        except ConnectionError:
+            self._pending.pop(request_id, None)
+            raise
+        return request_id, queue
+
+    async def call(self, method: str, *args, **kwargs) -> Any:
+        """Appelle une méthode de StartGG dans la passerelle (None en cas d'échec, comme StartGG)."""
+        try:
+            request_id, queue = await self._send(method, args, kwargs)
+        except (ConnectionError, FileNotFoundError) as e:
+            print(f"❌ Passerelle start.gg injoignable ({self.socket_path}): {e}")
+            return None
+        try:
+            message = await queue.get()
+        finally:
+            self._pending.pop(request_id, None)
+        if "error" in message:
+            print(f"❌ Erreur de la passerelle ({method}): {message['error']}")
+            return None
+        return message.get("result")
+
+    async def stream(self, method: str, *args, **kwargs):
+        """Générateur asynchrone relayant les pages d'un générateur de StartGG."""
+        try:
+            request_id, queue = await self._send(method, args, kwargs)
+        except (ConnectionError, FileNotFoundError) as e:
+            raise ValueError(f"Passerelle start.gg injoignable ({self.socket_path}): {e}")
+        try:
+            while True:
+                message = await queue.get()
+                if "error" in message:
+                    raise ValueError(message["error"])
+                if message.get("done"):
+                    return
+                yield message["page"]
+        finally:
+            self._pending.pop(request_id, None)
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if name in self._generators:
+            return lambda *args, **kwargs: self.stream(name, *args, **kwargs)
+
+        async def method(*args, **kwargs):
+            return await self.call(name, *args, **kwargs)
+        method.__name__ = name
+        return method
+
+    async def close(self):
+        """Ferme la connexion (la passerelle, elle, continue de servir les autres bots)."""
+        if self._writer is not None:
+            self._writer.close()
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+
+
+def create_startgg_client():
+    """
+    Client start.gg du bot : passerelle si STARTGG_GATEWAY_SOCKET est défini
+    et que la plateforme a des sockets Unix, sinon client direct.
+    """
+    socket_path = os.getenv('STARTGG_GATEWAY_SOCKET')
+    if socket_path and not GATEWAY_SUPPORTED:
+        print("⚠️ Sockets Unix indisponibles sur cette plateforme : STARTGG_GATEWAY_SOCKET ignoré, client start.gg direct")
+    elif socket_path:
+        return GatewayClient(socket_path)
+    return StartGG()
+
+
+if __name__ == "__main__":
+    # Lancement : python -m models.startgg_gateway
+    load_dotenv()
+    if not GATEWAY_SUPPORTED:
+        sys.exit("❌ Sockets Unix indisponibles sur cette plateforme : lancez les bots sans passerelle")
+    gateway = StartGGGateway(StartGG(), os.getenv('STARTGG_GATEWAY_SOCKET') or default_socket_path())
+    try:
+        asyncio.run(gateway.serve_forever())
+    except KeyboardInterrupt:
+        print("🛑 Passerelle start.gg arrêtée")
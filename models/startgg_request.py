@@ -1,35 +1,91 @@
-import requests
-import time
+import aiohttp
+import asyncio
+import copy
+import json
 import os
+import random
+import time
+from email.utils import parsedate_to_datetime
+from functools import wraps
 from typing import Optional, Dict, Any, List
-from collections import deque
-from threading import Lock
+from models.rate_limiter import KeyRateLimiter, Priority, SQLiteRateBackend
+from models.response_cache import ResponseCache
+from models.mutation_journal import MutationJournal, MutationRejected
+from models.query_complexity import estimate_objects
+
+# Fichier du journal des mutations par défaut : à côté du bot, quel que soit le dossier de lancement
+DEFAULT_JOURNAL_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "startgg_journal.sqlite3")
 
 class StartGG:
-    def __init__(self, api_keys: Optional[List[str]] = None):
+    # Durée de vie (secondes) des réponses en cache pour les requêtes en lecture seule
+    CACHE_TTLS = {
+        "get_tournament": 300,
+        "get_event_phases": 600,
+        "get_phase_match_for_round": 600,
+        "get_all_characters": 7 * 24 * 3600,
+    }
+    # start.gg refuse les requêtes qui retournent plus de 1000 objets
+    MAX_QUERY_OBJECTS = 1000
+    # Part de la limite visée par l'estimation (les listes non paginées sont approximées)
+    QUERY_OBJECTS_MARGIN = 0.9
+    MAX_PER_PAGE = 500
+
+    def __init__(self, api_keys: Optional[List[str]] = None, cache_path: Optional[str] = None,
+                 journal_path: Optional[str] = None, rate_limit_path: Optional[str] = None):
         """
-        Initialise le client StartGG avec gestion des limites de rate.
+        Initialise le client StartGG asynchrone avec gestion des limites de rate.
         
         Args:
             api_keys: Liste des clés API. Si None, utilise les variables d'environnement
                      STARTGG_API_KEY_1, STARTGG_API_KEY_2, etc.
+            cache_path: Fichier SQLite du cache persistant. Si None, utilise
+                     STARTGG_CACHE_PATH (cache en mémoire uniquement si absent).
+            journal_path: Fichier SQLite du journal des mutations. Si None, utilise
+                     STARTGG_JOURNAL_PATH ou startgg_journal.sqlite3 à la racine du
+                     bot. Tous les clients du processus partagent le même journal.
+            rate_limit_path: Fichier SQLite partagé des compteurs de débit, pour
+                     plusieurs bots utilisant les mêmes clés. Si None, utilise
+                     STARTGG_RATE_LIMIT_PATH (compteurs en mémoire si absent).
         """
         self.api_keys = api_keys or self._load_api_keys_from_env()
         if not self.api_keys:
             raise ValueError("Aucune clé API fournie. Voir la documentation pour configurer les variables d'environnement.")
         
-        self.current_key_index = 0
         self.base_url = "https://api.start.gg/gql/alpha"
+        self.timeout = aiohttp.ClientTimeout(total=10)
+        # Session HTTP partagée (connexions keep-alive), créée à la première requête
+        self._session: Optional[aiohttp.ClientSession] = None
         
-        # Rate limiting: 80 requêtes par minute par clé
+        # Rate limiting: 80 requêtes par minute par clé (seau à jetons, ou fenêtre glissante partagée)
         self.max_requests_per_minute = 80 
-        self.request_history = {}  # Dict par clé API
-        self.locks = {}  # Locks par clé API
+        # Part du budget par minute réservée aux reports (classe CRITICAL)
+        critical_reserve = float(os.getenv('STARTGG_CRITICAL_RESERVE', 0.1))
+        rate_limit_path = rate_limit_path or os.getenv('STARTGG_RATE_LIMIT_PATH')
+        rate_backend = SQLiteRateBackend(rate_limit_path, self.max_requests_per_minute) if rate_limit_path else None
+        self.rate_limiter = KeyRateLimiter(self.api_keys, self.max_requests_per_minute,
+                                           critical_reserve=critical_reserve, backend=rate_backend)
+        # Backoff des erreurs transitoires (secondes)
+        self.base_backoff = 1
+        self.max_backoff = 30
         
-        # Initialisation pour chaque clé
-        for key in self.api_keys:
-            self.request_history[key] = deque()
-            self.locks[key] = Lock()
+        # Regroupement des mutations émises dans une courte fenêtre en un seul document aliasé
+        self.batch_window = 0.05  # secondes
+        self.max_batch_size = 20
+        self._batch_queue = []
+        self._batch_task: Optional[asyncio.Task] = None
+        
+        # Cache des requêtes en lecture seule (LRU mémoire + SQLite optionnel)
+        self.cache = ResponseCache(self.CACHE_TTLS, db_path=cache_path or os.getenv('STARTGG_CACHE_PATH'))
+        
+        # Requêtes en lecture en cours : les appels identiques attendent la même réponse
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self.shared_requests = 0  # Nombre de requêtes évitées grâce au partage
+        
+        # Journal durable des mutations de sets, envoyées en arrière-plan (write-behind)
+        journal_path = journal_path or os.getenv('STARTGG_JOURNAL_PATH', DEFAULT_JOURNAL_PATH)
+        self.journal = MutationJournal.shared(journal_path, self._send_journaled_mutation)
+        # Attente maximale du résultat d'une mutation journalisée avec wait=True (elle reste dans le journal au-delà)
+        self.mutation_result_timeout = 30
     def _load_api_keys_from_env(self) -> List[str]:
         """Charge les clés API depuis les variables d'environnement."""
         keys = []
@@ -50,55 +106,58 @@ class StartGG:
         
         return keys
     
-    def _get_current_headers(self) -> Dict[str, str]:
-        """Retourne les headers avec la clé API courante."""
-        current_key = self.api_keys[self.current_key_index]
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Retourne la session HTTP partagée, en la recréant si elle a été fermée."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit_per_host=len(self.api_keys) * 4, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+        return self._session
+    
+    async def close(self):
+        """Arrête le worker du journal et ferme la session HTTP (à appeler à l'arrêt du bot)."""
+        await self.journal.stop()
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+    
+    def _get_headers(self, api_key: str) -> Dict[str, str]:
+        """Retourne les headers pour la clé API donnée."""
         return {
-            "Authorization": f"Bearer {current_key}",
+            "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json",
             "Accept": "application/json"
         }
     
-    def _can_make_request(self, api_key: str) -> bool:
-        """Vérifie si on peut faire une requête avec cette clé API."""
-        with self.locks[api_key]:
-            now = time.time()
-            history = self.request_history[api_key]
-            
-            # Nettoie l'historique (garde seulement les requêtes de la dernière minute)
-            while history and now - history[0] > 60:
-                history.popleft()
-            
-            return len(history) < self.max_requests_per_minute
-    
-    def _record_request(self, api_key: str):
-        """Enregistre une requête pour cette clé API."""
-        with self.locks[api_key]:
-            self.request_history[api_key].append(time.time())
-    
-    def _get_available_key(self) -> Optional[str]:
-        """Trouve une clé API disponible ou attend qu'une se libère."""
-        # D'abord, essaie de trouver une clé immédiatement disponible
-        for i, key in enumerate(self.api_keys):
-            if self._can_make_request(key):
-                self.current_key_index = i
-                return key
-        
-        print("⚠️  Toutes les clés API ont atteint leur limite. Attente de disponibilité...")
-        
-        # Aucune clé disponible, attend qu'une se libère
-        while True:
-            for i, key in enumerate(self.api_keys):
-                if self._can_make_request(key):
-                    self.current_key_index = i
-                    print(f"✅ Clé API {i+1} disponible")
-                    return key
-            
-            # Attend 1 seconde avant de revérifier
-            time.sleep(1)
-    
-    def _make_request(self, query: str, variables: Optional[Dict] = None) -> Optional[Dict[str, Any]]:
-        """Méthode interne pour les requêtes GraphQL avec gestion du rate limiting."""
+    @staticmethod
+    def _parse_retry_after(headers) -> Optional[float]:
+        """Lit le délai demandé par start.gg (Retry-After ou X-RateLimit-Reset), en secondes."""
+        value = headers.get("Retry-After")
+        if value:
+            try:
+                return float(value)
+            except ValueError:
+                try:
+                    return (parsedate_to_datetime(value).timestamp() - time.time())
+                except (TypeError, ValueError):
+                    pass
+        reset = headers.get("X-RateLimit-Reset")
+        if reset:
+            try:
+                reset = float(reset)
+                # Horodatage absolu ou nombre de secondes restantes
+                return reset - time.time() if reset > 1e9 else reset
+            except ValueError:
+                pass
+        return None
+    
+    def _backoff_delay(self, attempt: int) -> float:
+        """Backoff exponentiel avec jitter complet (évite que tous les clients relancent ensemble)."""
+        return random.uniform(0, min(self.max_backoff, self.base_backoff * (2 ** attempt)))
+    
+    async def _make_request(self, query: str, variables: Optional[Dict] = None, priority: Priority = Priority.INTERACTIVE) -> Optional[Dict[str, Any]]:
+        """Méthode interne pour les requêtes GraphQL avec gestion du rate limiting et des priorités."""
+        # Reprend l'envoi des mutations restées dans le journal (ex: après un redémarrage)
+        self.journal.start()
         payload = {
             "query": query,
             "variables": variables or {}
@@ -108,68 +167,305 @@ class StartGG:
         retry_count = 0
         
         while retry_count < max_retries:
+            # Obtient la clé la moins chargée hors quarantaine (attend un jeton si besoin)
+            api_key = await self.rate_limiter.acquire(priority)
+            key_number = self.api_keys.index(api_key) + 1
             try:
-                # Obtient une clé API disponible
-                api_key = self._get_available_key()
-                if not api_key:
-                    print("❌ Aucune clé API disponible")
-                    return None
-                
-                # Enregistre la requête
-                self._record_request(api_key)
-                
                 # Fait la requête
-                headers = self._get_current_headers()
-                response = requests.post(
-                    self.base_url,
-                    headers=headers,
-                    json=payload,
-                    timeout=10
-                )
+                headers = self._get_headers(api_key)
+                session = await self._get_session()
+                async with session.post(self.base_url, headers=headers, json=payload) as response:
+                    if response.status == 429 or response.status in (401, 403) or response.status >= 500:
+                        retry_after = self._parse_retry_after(response.headers)
+                        self.rate_limiter.record_failure(api_key, retry_after)
+                        retry_count += 1
+                        if response.status == 429:
+                            # La clé est mise de côté pendant Retry-After : on repart sur une autre
+                            print(f"⚠️  Rate limit atteint pour la clé {key_number}. Changement de clé...")
+                            if retry_after is None and retry_count < max_retries:
+                                # Sans délai indiqué, la clé n'est pas mise de côté : backoff comme pour les 5xx
+                                await asyncio.sleep(self._backoff_delay(retry_count))
+                        elif response.status in (401, 403):
+                            print(f"❌ Clé {key_number} refusée ({response.status}). Changement de clé...")
+                        else:
+                            print(f"❌ Erreur serveur start.gg ({response.status}) avec la clé {key_number} (tentative {retry_count}/{max_retries})")
+                            if retry_count < max_retries:
+                                await asyncio.sleep(retry_after if retry_after else self._backoff_delay(retry_count))
+                        continue
+                    
+                    if response.status == 400:
+                        # Requête refusée (ex: trop complexe) : inutile de la renvoyer telle quelle
+                        data = await response.json(content_type=None)
+                        self.rate_limiter.record_success(api_key)
+                        return data
+                    
+                    response.raise_for_status()
+                    data = await response.json()
+                    self.rate_limiter.record_success(api_key)
+                    return data
                 
-                # Gère les erreurs de rate limiting
-                if response.status_code == 429:
-                    print(f"⚠️  Rate limit atteint pour la clé {self.current_key_index + 1}. Changement de clé...")
-                    retry_count += 1
-                    continue
-                
-                response.raise_for_status()
-                return response.json()
-                
-            except requests.exceptions.RequestException as e:
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                # Erreur réseau : ne dépend pas de la clé, on libère un éventuel test de disjoncteur
+                self.rate_limiter.release_probe(api_key)
                 print(f"❌ Erreur API (tentative {retry_count + 1}/{max_retries}): {e}")
                 retry_count += 1
                 if retry_count < max_retries:
-                    time.sleep(2 ** retry_count)  # Backoff exponentiel
+                    await asyncio.sleep(self._backoff_delay(retry_count))
                 
         print("❌ Échec après toutes les tentatives")
         return None
     
-    def get_rate_limit_status(self) -> Dict[str, Dict]:
-        """Retourne le statut du rate limiting pour chaque clé."""
-        status = {}
-        now = time.time()
+    async def _shared_request(self, query: str, variables: Optional[Dict] = None, priority: Priority = Priority.INTERACTIVE) -> Optional[Dict[str, Any]]:
+        """
+        Requête en lecture dédupliquée : si une requête identique (query + variables)
+        est déjà en cours, on attend sa réponse au lieu de consommer un autre jeton.
+        """
+        key = json.dumps([query, variables or {}], sort_keys=True, default=str)
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._make_request(query, variables, priority))
+            self._in_flight[key] = task
+
+            def _forget(done_task, key=key):
+                if self._in_flight.get(key) is done_task:
+                    del self._in_flight[key]
+            task.add_done_callback(_forget)
+        else:
+            self.shared_requests += 1
+        # shield : l'annulation d'un appelant n'annule pas la requête partagée
+        response = await asyncio.shield(task)
+        # La réponse de la tâche n'appartient à personne : chaque appelant (le premier
+        # compris) reçoit sa copie, qu'il peut modifier sans toucher celles des autres
+        return copy.deepcopy(response)
+    
+    async def _cached_request(self, operation: str, query: str, variables: Optional[Dict] = None, priority: Priority = Priority.INTERACTIVE) -> Optional[Dict[str, Any]]:
+        """Comme _make_request, mais sert la réponse depuis le cache si elle est encore valide."""
+        found, response = self.cache.get(operation, variables)
+        if found:
+            return response
+        response = await self._shared_request(query, variables, priority)
+        # Ne met en cache que les réponses complètes
+        if response and response.get("data") and not response.get("errors"):
+            self.cache.set(operation, variables, response)
+        return response
+    
+    async def _journal_mutation(self, field: str, arguments: Dict[str, tuple], selection: str = "", priority: Priority = Priority.INTERACTIVE,
+                                wait: bool = False) -> Optional[Any]:
+        """
+        Écrit la mutation dans le journal et rend la main dès qu'elle y est :
+        le worker l'envoie ensuite (regroupée avec les autres) et la rejoue tant
+        que start.gg ne l'a pas reçue. Une panne de start.gg ne bloque donc pas
+        l'appelant. Retourne None.
+
+        Avec wait=True, attend en plus le résultat de son prochain envoi : le
+        résultat de la mutation, ou None si start.gg l'a refusée, si l'envoi a
+        échoué ou s'il n'est pas revenu en mutation_result_timeout secondes.
+        """
+        if wait:
+            return await self.journal.submit(field, arguments, selection, priority, timeout=self.mutation_result_timeout)
+        await self.journal.append(field, arguments, selection, priority)
+        return None
+    
+    async def _send_journaled_mutation(self, field: str, arguments: Dict[str, tuple], selection: str, priority: int) -> Optional[Any]:
+        """Envoi effectif d'une mutation du journal."""
+        return await self._batch_mutation(field, arguments, selection, Priority(priority))
+    
+    async def get_journal_backlog(self) -> Dict[str, Any]:
+        """Retourne l'état du journal des mutations (en attente, en échec, envoyées)."""
+        return self.journal.get_backlog()
+    
+    async def retry_failed_mutations(self) -> int:
+        """Remet en attente les mutations abandonnées du journal. Retourne leur nombre."""
+        return await self.journal.retry_failed()
+    
+    async def _batch_mutation(self, field: str, arguments: Dict[str, tuple], selection: str = "", priority: Priority = Priority.INTERACTIVE) -> Optional[Any]:
+        """
+        Met une mutation en file pour l'envoyer avec les autres dans un seul document.
         
-        for i, key in enumerate(self.api_keys):
-            with self.locks[key]:
-                history = self.request_history[key]
-                # Nettoie l'historique
-                while history and now - history[0] > 60:
-                    history.popleft()
-                
-                remaining = self.max_requests_per_minute - len(history)
-                next_reset = history[0] + 60 if history else now
-                
-                status[f"Clé {i+1}"] = {
-                    "requêtes_utilisées": len(history),
-                    "requêtes_restantes": remaining,
-                    "prochaine_réinitialisation": time.strftime("%H:%M:%S", time.localtime(next_reset))
-                }
+        Args:
+            field: Nom de la mutation GraphQL (ex: "assignStation").
+            arguments: {nom: (type GraphQL, valeur)} pour chaque argument.
+            selection: Sélection des champs retournés (ex: "{ id }").
+            priority: Classe de priorité ; le document part avec la plus urgente du lot.
+        
+        Returns:
+            Le résultat de cette mutation, ou None si l'envoi a échoué.
+        
+        Raises:
+            MutationRejected: start.gg a refusé cette mutation (erreur sur son alias,
+                ou document refusé alors qu'elle y était seule).
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._batch_queue.append((field, arguments, selection, priority, future))
+        if self._batch_task is None:
+            self._batch_task = asyncio.create_task(self._flush_batch())
+        return await future
+    
+    async def _flush_batch(self):
+        """Attend la fin de la fenêtre puis envoie les mutations en file."""
+        await asyncio.sleep(self.batch_window)
+        operations, self._batch_queue = self._batch_queue, []
+        # Les mutations arrivées pendant l'envoi déclenchent un nouveau flush
+        self._batch_task = None
+        for start in range(0, len(operations), self.max_batch_size):
+            await self._send_batch(operations[start:start + self.max_batch_size])
+    
+    async def _send_batch(self, operations: list):
+        """Envoie un document aliasé (a1, a2...) et redistribue les résultats à chaque appelant."""
+        declarations = []
+        fields = []
+        variables = {}
+        for i, (field, arguments, selection, _, _) in enumerate(operations, start=1):
+            alias = f"a{i}"
+            call_args = []
+            for name, (gql_type, value) in arguments.items():
+                variable = f"{alias}_{name}"
+                declarations.append(f"${variable}: {gql_type}")
+                call_args.append(f"{name}: ${variable}")
+                variables[variable] = value
+            fields.append(f"{alias}: {field}({', '.join(call_args)}) {selection}")
+        # Les champs d'une mutation sont exécutés dans l'ordre du document
+        query = f"mutation Batch({', '.join(declarations)}) {{\n    " + "\n    ".join(fields) + "\n}"
         
+        try:
+            priority = min(operation[3] for operation in operations)
+            response = await self._make_request(query, variables, priority)
+        except Exception as e:
+            print(f"❌ Erreur lors de l'envoi groupé: {e}")
+            response = None
+        
+        failed_aliases = {}
+        document_errors = []
+        for error in (response or {}).get("errors") or []:
+            path = error.get("path") or []
+            if path:
+                failed_aliases[path[0]] = error.get('message')
+                print(f"❌ Mutation {path[0]} refusée: {error.get('message')}")
+            else:
+                document_errors.append(error.get('message') or "erreur sans message")
+        data = (response or {}).get("data") or {}
+        if response is not None and not data and not document_errors:
+            # Réponse sans données (HTTP 400) : start.gg a refusé le document lui-même
+            document_errors.append(response.get("message") or "document refusé")
+        if document_errors:
+            # Erreur du document (validation, HTTP 400) : le renvoyer tel quel échouerait de nouveau
+            print(f"❌ Envoi groupé refusé par start.gg: {'; '.join(document_errors)}")
+            if not data and len(operations) > 1:
+                # Rien n'a été exécuté : chaque mutation repart seule (dans l'ordre) pour n'écarter que la fautive
+                for operation in operations:
+                    await self._send_batch([operation])
+                return
+        
+        for i, (_, _, _, _, future) in enumerate(operations, start=1):
+            if future.done():
+                continue
+            alias = f"a{i}"
+            if alias in failed_aliases:
+                future.set_exception(MutationRejected(failed_aliases[alias]))
+            elif response is None:
+                future.set_result(None)
+            elif data.get(alias) is None and document_errors:
+                future.set_exception(MutationRejected("; ".join(document_errors)))
+            else:
+                future.set_result(data.get(alias))
+    
+    def _fit_page_size(self, query: str, variables: Dict[str, Any], per_page: Optional[int] = None) -> int:
+        """
+        Plus grande valeur de perPage (au plus per_page) pour laquelle l'estimation
+        du nombre d'objets de la requête reste sous la limite de start.gg.
+        """
+        per_page = per_page or self.MAX_PER_PAGE
+        base = estimate_objects(query, dict(variables, perPage=0))
+        per_node = estimate_objects(query, dict(variables, perPage=1)) - base
+        if per_node <= 0:
+            return per_page
+        budget = self.MAX_QUERY_OBJECTS * self.QUERY_OBJECTS_MARGIN - base
+        return max(1, min(per_page, int(budget // per_node)))
+    
+    @staticmethod
+    def _is_complexity_error(response: Optional[Dict[str, Any]]) -> bool:
+        """Indique si start.gg a refusé la requête parce qu'elle retourne trop d'objets."""
+        if not response:
+            return False
+        messages = [response.get("message") or ""]
+        messages += [error.get("message") or "" for error in response.get("errors") or []]
+        return any("complexity" in message.lower() for message in messages)
+    
+    async def _fetch_page(self, query: str, variables: Dict[str, Any], extract, page: int, per_page: int) -> Optional[Dict[str, Any]]:
+        """
+        Récupère une page d'une connexion (nodes + pageInfo).
+        
+        Si start.gg juge la page trop complexe, elle est découpée en sous-pages
+        de taille moitié, récupérées en parallèle puis recollées ; le résultat
+        garde la numérotation d'origine.
+        """
+        response = await self._shared_request(query, dict(variables, pageNumber=page, perPage=per_page), Priority.BACKGROUND)
+        if not self._is_complexity_error(response):
+            return extract(response)
+        if per_page <= 1:
+            print("❌ Requête trop complexe même avec une page d'un élément")
+            return None
+        
+        sub_size = (per_page + 1) // 2
+        start, end = (page - 1) * per_page, page * per_page
+        first_sub, last_sub = start // sub_size + 1, (end - 1) // sub_size + 1
+        print(f"⚠️  Page {page} trop complexe ({per_page} éléments) : découpage en {last_sub - first_sub + 1} sous-requêtes")
+        parts = await asyncio.gather(*[
+            self._fetch_page(query, variables, extract, sub_page, sub_size)
+            for sub_page in range(first_sub, last_sub + 1)
+        ])
+        if any(part is None for part in parts):
+            return None
+        nodes = [node for part in parts for node in part["nodes"]]
+        offset = start - (first_sub - 1) * sub_size
+        page_info = parts[0].get("pageInfo") or {}
+        total = page_info.get("total")
+        if total is None:
+            total = (page_info.get("totalPages") or 1) * sub_size
+        return {
+            "pageInfo": {"total": total, "totalPages": max(1, -(-total // per_page))},
+            "nodes": nodes[offset:offset + per_page]
+        }
+    
+    async def _iter_pages(self, query: str, variables: Dict[str, Any], extract, per_page: Optional[int], error_message: str):
+        """
+        Générateur asynchrone des nodes d'une connexion paginée ($pageNumber, $perPage).
+        
+        La taille de page est la plus grande que permet la limite d'objets de
+        start.gg ; la première page donne le nombre total de pages, les suivantes
+        sont récupérées en parallèle (réparties sur les clés) et produites dans
+        l'ordre d'arrivée.
+        """
+        per_page = self._fit_page_size(query, variables, per_page)
+        first_page = await self._fetch_page(query, variables, extract, 1, per_page)
+        if first_page is None:
+            raise ValueError(error_message)
+        yield first_page["nodes"]
+        
+        total_pages = (first_page.get("pageInfo") or {}).get("totalPages") or 1
+        tasks = [
+            asyncio.create_task(self._fetch_page(query, variables, extract, page, per_page))
+            for page in range(2, total_pages + 1)
+        ]
+        try:
+            for next_page in asyncio.as_completed(tasks):
+                result = await next_page
+                if result is None:
+                    raise ValueError(error_message)
+                yield result["nodes"]
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    async def get_rate_limit_status(self) -> Dict[str, Dict]:
+        """Retourne le statut du rate limiting pour chaque clé, plus les compteurs du cache."""
+        status = self.rate_limiter.get_status()
+        status["Cache"] = self.cache.get_stats()
+        status["Cache"]["requêtes_partagées"] = self.shared_requests
         return status
 
-    # Toutes vos méthodes existantes restent identiques, seule _make_request change
-    def get_tournament(self, event_slug: str) -> Optional[Dict[str, Any]]:
+    # Méthodes de l'API : coroutines à attendre depuis le bot (voir StartGGSync pour les scripts)
+    async def get_tournament(self, event_slug: str) -> Optional[Dict[str, Any]]:
         """Récupère les informations d'un événement par son slug."""
         query = """
  query Tournament($slug: String!) {
@@ -188,12 +484,12 @@ class StartGG:
 }
         """
         variables = {"slug": event_slug}
-        response = self._make_request(query, variables)
+        response = await self._cached_request("get_tournament", query, variables)
         if response and "data" in response:
             return response["data"]["tournament"]
         return None
     
-    def get_event_phases(self, event_id: str) -> Optional[Dict[str, Any]]:
+    async def get_event_phases(self, event_id: str) -> Optional[Dict[str, Any]]:
         """Récupère les phases d'un événement par son ID."""
         query = """
             query EventPhases($eventId: ID!) {
@@ -218,50 +514,93 @@ class StartGG:
             }
         """
         variables = {"eventId": event_id}
-        response = self._make_request(query, variables)
+        response = await self._cached_request("get_event_phases", query, variables)
         if response and "data" in response:
             return response["data"]["event"]
         return None
     
-    def get_phase_matches(self, eventId: str, phase_id: str, phaseGroupId: str, state=1) -> Optional[Dict[str, Any]]:
-        """Récupère les matchs d'une phase spécifique. permet de filtrer par état."""
-        query = """
-    query PhaseSets($phaseId: ID!,$phaseGroupId: ID!, $eventId: ID! , $state: [Int]!) {
-         event(id: $eventId) {
-        phases(phaseId: $phaseId) {
-            id
-            name
-            sets(filters: { phaseGroupIds: [$phaseGroupId], state: $state , hideEmpty: true}) {
-                nodes {
+    async def iter_event_sets(self, eventId: str, phaseGroupIds: List[str], state=1,
+                              updated_after: Optional[int] = None, per_page: Optional[int] = None):
+        """
+        Générateur asynchrone des sets de plusieurs pools d'un événement, page par page.
+        
+        Une seule requête par page couvre toutes les pools (phaseGroupIds). Si
+        updated_after (timestamp) est fourni, seuls les sets modifiés depuis sont
+        retournés, quel que soit leur état (synchronisation incrémentale).
+        """
+        if updated_after is None:
+            filters = "phaseGroupIds: $phaseGroupIds, state: $state , hideEmpty: true"
+            filter_variable = "$state: [Int]!"
+            variables = {"eventId": eventId, "phaseGroupIds": phaseGroupIds, "state": state}
+        else:
+            filters = "phaseGroupIds: $phaseGroupIds, updatedAfter: $updatedAfter , hideEmpty: true"
+            filter_variable = "$updatedAfter: Timestamp!"
+            variables = {"eventId": eventId, "phaseGroupIds": phaseGroupIds, "updatedAfter": updated_after}
+        query = f"""
+    query EventSets($eventId: ID!, $phaseGroupIds: [ID]!, {filter_variable}, $pageNumber: Int!, $perPage: Int!) {{
+        event(id: $eventId) {{
+            sets(page: $pageNumber, perPage: $perPage, filters: {{ {filters} }}) {{
+                pageInfo {{
+                    total
+                    totalPages
+                }}
+                nodes {{
                     id
                     identifier
                     round
                     fullRoundText
-                    slots {
-                        entrant {
+                    state
+                    updatedAt
+                    phaseGroup {{
+                        id
+                    }}
+                    slots {{
+                        entrant {{
                             name
                             id
-                        }
-                    }
-                    stream {
+                        }}
+                    }}
+                    stream {{
                         id
-                    }
-                    station {
+                    }}
+                    station {{
                         id
-                    }
-                }
-            }
-        }
-    }
-    }
+                    }}
+                }}
+            }}
+        }}
+    }}
         """
-        variables = {"phaseId": phase_id, "phaseGroupId": phaseGroupId, "eventId": eventId, "state": state}
-        response = self._make_request(query, variables)
-        if response and "data" in response:
-            return response["data"]["event"]["phases"]
-        return None
+        def extract(response):
+            if response and response.get("data") and response["data"].get("event"):
+                return response["data"]["event"]["sets"]
+            return None
+        
+        async for sets in self._iter_pages(
+            query, variables, extract, per_page,
+            f"Impossible de récupérer les sets des pools {phaseGroupIds}"
+        ):
+            yield sets
+
+    async def iter_phase_sets(self, eventId: str, phase_id: str, phaseGroupId: str, state=1,
+                              updated_after: Optional[int] = None, per_page: Optional[int] = None):
+        """Générateur asynchrone des sets d'une seule pool (la pool détermine la phase)."""
+        async for sets in self.iter_event_sets(eventId, [phaseGroupId], state, updated_after, per_page):
+            yield sets
+
+    async def get_phase_matches(self, eventId: str, phase_id: str, phaseGroupId: str, state=1,
+                                updated_after: Optional[int] = None) -> Optional[List[Dict[str, Any]]]:
+        """Récupère tous les sets d'une pool (toutes les pages). permet de filtrer par état."""
+        all_sets = []
+        try:
+            async for sets in self.iter_phase_sets(eventId, phase_id, phaseGroupId, state, updated_after):
+                all_sets.extend(sets)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return None
+        return all_sets
     
-    def get_phase_match_for_round(self, eventId: str, phase_id: str, phaseGroupId: str) -> Optional[Dict[str, Any]]:
+    async def get_phase_match_for_round(self, eventId: str, phase_id: str, phaseGroupId: str) -> Optional[Dict[str, Any]]:
         """Récupère les matchs d'une phase spécifique. permet de filtrer par état."""
         query = """
     query PhaseSets($phaseId: ID!,$phaseGroupId: ID!, $eventId: ID!) {
@@ -278,48 +617,70 @@ class StartGG:
     }
         """
         variables = {"phaseId": phase_id, "phaseGroupId": phaseGroupId, "eventId": eventId}
-        response = self._make_request(query, variables)
+        response = await self._cached_request("get_phase_match_for_round", query, variables)
         if response and "data" in response:
             return response["data"]["event"]["phases"][0]['sets']
         return None
-    
-    def update_match_score(self, set_id: str, games: list[Dict], winner_id: str) -> Optional[Dict[str, Any]]:
-        """Met à jour le score d'un match avec reportBracketSet"""
+
+    async def get_phase_group_bracket(self, phaseGroupId: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Récupère la structure du bracket d'une pool : pour chaque set, les sets
+        dont ses slots reçoivent le gagnant ou le perdant (prereqId/prereqType).
+        """
         query = """
-    mutation ReportBracketSet($setId: ID!, $winnerId: ID!, $gameData: [BracketSetGameDataInput!]!) {
-        reportBracketSet(
-            setId: $setId,
-            winnerId: $winnerId,
-            gameData: $gameData
-        ) {
-            id
-            state
-            identifier
+    query PhaseGroupBracket($phaseGroupId: ID!, $pageNumber: Int!, $perPage: Int!) {
+        phaseGroup(id: $phaseGroupId) {
+            sets(page: $pageNumber, perPage: $perPage, sortType: STANDARD) {
+                pageInfo {
+                    total
+                    totalPages
+                }
+                nodes {
+                    id
+                    identifier
+                    round
+                    fullRoundText
+                    slots {
+                        prereqId
+                        prereqType
+                        prereqPlacement
+                    }
+                }
+            }
         }
     }
         """
-        
-        formatted_games = []
-        for game in games:
-            formatted_game = {
-                "gameNum": game["gameNum"],
-                "winnerId": game["winnerId"],
-                "selections": game.get("selections", [])
-            }
-            formatted_games.append(formatted_game)
-        
-        variables = {
-            "setId": set_id,
-            "winnerId": winner_id,
-            "gameData": games
-        }
-        
-        response = self._make_request(query, variables)
-        if response and "data" in response:
-            return response["data"]["reportBracketSet"]
-        return None
+        def extract(response):
+            if response and response.get("data") and response["data"].get("phaseGroup"):
+                return response["data"]["phaseGroup"]["sets"]
+            return None
+
+        all_sets = []
+        try:
+            async for sets in self._iter_pages(
+                query, {"phaseGroupId": phaseGroupId}, extract, None,
+                f"Impossible de récupérer le bracket de la pool {phaseGroupId}"
+            ):
+                all_sets.extend(sets)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return None
+        return all_sets
+
+    async def update_match_score(self, set_id: str, games: list[Dict], winner_id: str) -> Optional[Dict[str, Any]]:
+        """Met à jour le score d'un match avec reportBracketSet (envoi différé via le journal)"""
+        return await self._journal_mutation(
+            "reportBracketSet",
+            {
+                "setId": ("ID!", set_id),
+                "winnerId": ("ID!", winner_id),
+                "gameData": ("[BracketSetGameDataInput!]!", games)
+            },
+            "{ id state identifier }",
+            Priority.CRITICAL
+        )
     
-    def get_all_characters(self, id: int = 1386) -> Optional[Dict[str, Any]]:
+    async def get_all_characters(self, id: int = 1386) -> Optional[Dict[str, Any]]:
         """Récupère tous les personnages disponibles."""
         query = """
    query Videogame ($id: ID!) {
@@ -332,17 +693,24 @@ class StartGG:
 }
         """
         variables = {"id": id}
-        response = self._make_request(query, variables)
+        response = await self._cached_request("get_all_characters", query, variables)
         if response and "data" in response:
             return response["data"]["videogame"]["characters"]
         return None
 
-    def get_all_player_event(self, event_id: str) -> Optional[Dict[str, Any]]:
-        """Récupère tous les joueurs d'un événement."""
+    async def iter_event_players(self, event_id: str, per_page: Optional[int] = None):
+        """
+        Générateur asynchrone des entrants d'un événement, page par page
+        (voir _iter_pages pour la taille de page et le parallélisme).
+        """
         query = """
-    query EventPlayers ($eventId: ID!, $pageNumber: Int!) {
+    query EventPlayers ($eventId: ID!, $pageNumber: Int!, $perPage: Int!) {
     event(id: $eventId) {
-        entrants(query: { page: $pageNumber, perPage: 100 }) {
+        entrants(query: { page: $pageNumber, perPage: $perPage }) {
+            pageInfo {
+                total
+                totalPages
+            }
             nodes {
                 id
                 name
@@ -361,50 +729,41 @@ class StartGG:
     }
 }
         """
+        def extract(response):
+            if response and response.get("data") and response["data"].get("event"):
+                return response["data"]["event"]["entrants"]
+            return None
+        
+        async for players in self._iter_pages(
+            query, {"eventId": event_id}, extract, per_page,
+            f"Impossible de récupérer les entrants de l'événement {event_id}"
+        ):
+            yield players
+
+    async def get_all_player_event(self, event_id: str) -> Optional[Dict[str, Any]]:
+        """Récupère tous les joueurs d'un événement."""
         all_players = []
-        for page in range(1, 100):
-            variables = {"eventId": event_id, "pageNumber": page}
-            response = self._make_request(query, variables)
-            if response and "data" in response:
-                players = response["data"]["event"]["entrants"]["nodes"]
-                if not players:
-                    break
+        try:
+            async for players in self.iter_event_players(event_id):
                 all_players.extend(players)
-            else:
-                return None
+        except ValueError as e:
+            print(f"❌ {e}")
+            return None
         return all_players if all_players else None
     
-    def startMatch(self, matchId: str):
+    async def startMatch(self, matchId: str):
         """Démarre un match en utilisant l'API StartGG."""
-        query = """
-        mutation MarkSetInProgress ($matchId: ID!) {
-            markSetInProgress(setId: $matchId) {
-                id
-            }
-        }
-        """
-        variables = {"matchId": matchId}
-        response = self._make_request(query, variables)
-        if response and "data" in response:
-            return response["data"]["markSetInProgress"]
-        return None
+        return await self._journal_mutation("markSetInProgress", {"setId": ("ID!", matchId)}, "{ id }")
     
-    def assign_station_to_set(self, set_id: str, station_id: str) -> Optional[Dict[str, Any]]:
+    async def assign_station_to_set(self, set_id: str, station_id: str) -> Optional[Dict[str, Any]]:
         """Assigne une station à un set."""
-        query = """
-        mutation assignStation($setId: ID!, $stationId: ID!) {
-            assignStation(setId: $setId, stationId: $stationId) {
-                identifier
-            }
-        }
-        """
-        variables = {"setId": set_id, "stationId": station_id}
-        response = self._make_request(query, variables)
-        if response and "data" in response:
-            return response["data"]["assignStation"]
-        return None
+        return await self._journal_mutation(
+            "assignStation",
+            {"setId": ("ID!", set_id), "stationId": ("ID!", station_id)},
+            "{ identifier }"
+        )
     
-    def create_station(self, tournament_id: str, station_number: int) -> Optional[Dict[str, Any]]:
+    async def create_station(self, tournament_id: str, station_number: int) -> Optional[Dict[str, Any]]:
         """Crée une nouvelle station pour un événement."""
         query = """
         mutation UpsertStation( $tournamentId: ID!, $fields: StationUpsertInput!) {
@@ -414,12 +773,12 @@ class StartGG:
     }
         """
         variables = {"tournamentId": tournament_id, "fields": {"number": station_number}}
-        response = self._make_request(query, variables)
+        response = await self._make_request(query, variables)
         if response and "data" in response:
             return response["data"]["upsertStation"]['id']
         return None
     
-    def delete_station(self, station_id: str) -> Optional[Dict[str, Any]]:
+    async def delete_station(self, station_id: str) -> Optional[Dict[str, Any]]:
         """Supprime une station."""
         query = """
         mutation DeleteStation($stationId: ID!) {
@@ -427,62 +786,59 @@ class StartGG:
         }
         """
         variables = {"stationId": station_id}
-        response = self._make_request(query, variables)
+        response = await self._make_request(query, variables)
         return response
     
-    def reset_set(self, set_id: str) -> Optional[Dict[str, Any]]:
+    async def reset_set(self, set_id: str) -> Optional[Dict[str, Any]]:
         """Réinitialise un set."""
-        query = """
-        mutation ResetSet($setId: ID!) {
-            resetSet(setId: $setId) {
-                id
-            }
-        }
-        """
-        variables = {"setId": set_id}
-        response = self._make_request(query, variables)
-        if response and "data" in response:
-            return True
-        return False
+        return await self._journal_mutation("resetSet", {"setId": ("ID!", set_id)}, "{ id }", Priority.CRITICAL)
     
-    def mark_set_as_pending(self, set_id: str) -> Optional[Dict[str, Any]]:
+    async def mark_set_as_pending(self, set_id: str) -> Optional[Dict[str, Any]]:
         """Marque un set comme en attente."""
-        query = """
-        mutation MarkSetAsPending($setId: ID!) {
-            markSetCalled(setId: $setId) {
-                id
-            }
-        }
-        """
-        variables = {"setId": set_id}
-        response = self._make_request(query, variables)
-        if response and "data" in response:
-            return True
-        return False
+        return await self._journal_mutation("markSetCalled", {"setId": ("ID!", set_id)}, "{ id }")
     
-    def DQ_player(self, set_id: str, winner_id: str):
+    async def DQ_player(self, set_id: str, winner_id: str):
         """Disqualifie un joueur d'un set."""
-        query = """
-        mutation DisqualifyPlayer($setId: ID!, $winnerId: ID!) {
-            reportBracketSet(isDQ: true , setId: $setId, winnerId: $winnerId) {
-                id
-            }
-        }
-        """
-        variables = {"setId": set_id, "winnerId": winner_id}
-        response = self._make_request(query, variables)
-        if response and "data" in response:
-            return True
-        return False
+        return await self._journal_mutation(
+            "reportBracketSet",
+            {"isDQ": ("Boolean", True), "setId": ("ID!", set_id), "winnerId": ("ID!", winner_id)},
+            "{ id }",
+            Priority.CRITICAL
+        )
+
+
+class StartGGSync:
+    """Enveloppe synchrone de StartGG pour les scripts (hors boucle asyncio)."""
+    def __init__(self, api_keys: Optional[List[str]] = None):
+        self._client = StartGG(api_keys)
+        # Boucle privée : la session HTTP reste liée à une seule boucle entre les appels
+        self._loop = asyncio.new_event_loop()
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if not asyncio.iscoroutinefunction(attr):
+            return attr
+
+        @wraps(attr)
+        def wrapper(*args, **kwargs):
+            return self._loop.run_until_complete(attr(*args, **kwargs))
+        return wrapper
+
+    def close(self):
+        """Envoie les mutations du journal, puis ferme la session HTTP et la boucle privée."""
+        self._loop.run_until_complete(self._client.journal.flush())
+        self._loop.run_until_complete(self._client.close())
+        self._loop.close()
 
 
 # Exemple d'utilisation
 if __name__ == "__main__":
     # Initialisation avec les clés depuis l'environnement
-    client = StartGG()
+    client = StartGGSync()
     
     # Ou initialisation manuelle avec des clés
-    # client = StartGG(["votre_cle_1", "votre_cle_2", "votre_cle_3"])
+    # client = StartGGSync(["votre_cle_1", "votre_cle_2", "votre_cle_3"])
     
     # Vérifier le statut des limites
-    
\ No newline at end of file
+    print(client.get_rate_limit_status())
+    client.close()
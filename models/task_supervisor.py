@@ -0,0 +1,85 @@
+import asyncio
+from collections import Counter
+from typing import Awaitable, Callable, Dict, Optional
+
+
+class TaskSupervisor:
+    """
+    Tâches d'arrière-plan d'un gestionnaire de matchs, suivies ensemble.
+
+    - spawn(type, factory) lance factory() et garde la tâche jusqu'à sa fin
+      (les exceptions sont journalisées au lieu de disparaître)
+    - limits : nombre maximal de tâches d'un même type exécutées en même
+      temps ; les suivantes attendent leur tour
+    - restarts : une tâche qui échoue est relancée par factory() dans la
+      même tâche asyncio, jusqu'à ce nombre de fois
+    - delay : attente avant le premier lancement, hors limite de concurrence
+    - cancel_all() annule et attend toutes les tâches (arrêt du tournoi)
+    - counts() donne le nombre de tâches en vie par type
+    """
+    def __init__(self, name: str, limits: Optional[Dict[str, int]] = None):
+        self.name = name
+        self.limits = {kind: asyncio.Semaphore(limit) for kind, limit in (limits or {}).items()}
+        self.tasks: Dict[asyncio.Task, str] = {}
+        self.failures = Counter()
+
+    def __len__(self) -> int:
+        return len(self.tasks)
+
+    def spawn(self, kind: str, factory: Callable[[], Awaitable], restarts: int = 0,
+              on_done: Optional[Callable[[asyncio.Task], None]] = None, delay: float = 0) -> asyncio.Task:
+        """
+        Lance une tâche suivie.
+
+        Args:
+            kind: type de tâche (compteurs, limite de concurrence)
+            factory: fonction sans argument qui retourne la coroutine à exécuter
+            restarts: nombre de relances après une exception
+            on_done: appelé avec la tâche quand elle est définitivement terminée
+            delay: secondes d'attente avant le lancement (sans occuper de place dans la limite)
+        """
+        task = asyncio.create_task(self._run(kind, factory, restarts, delay), name=f"{self.name}:{kind}")
+        self.tasks[task] = kind
+        task.add_done_callback(lambda finished: self._finished(finished, on_done))
+        return task
+
+    async def _run(self, kind: str, factory: Callable[[], Awaitable], restarts: int, delay: float = 0):
+        if delay > 0:
+            await asyncio.sleep(delay)
+        attempt = 0
+        while True:
+            try:
+                limit = self.limits.get(kind)
+                if limit is None:
+                    return await factory()
+                async with limit:
+                    return await factory()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failures[kind] += 1
+                print(f"❌ Tâche {kind} ({self.name}) en échec : {e}")
+                if attempt >= restarts:
+                    raise
+                attempt += 1
+                print(f"🔁 Relance de la tâche {kind} ({self.name}) : {attempt}/{restarts}")
+
+    def _finished(self, task: asyncio.Task, on_done):
+        self.tasks.pop(task, None)
+        if not task.cancelled():
+            # Exception déjà journalisée dans _run : récupérée pour ne pas être signalée par asyncio
+            task.exception()
+        if on_done is not None:
+            on_done(task)
+
+    def counts(self) -> Counter:
+        return Counter(self.tasks.values())
+
+    async def cancel_all(self):
+        """Annule toutes les tâches (sauf l'appelante) et attend leur fin."""
+        current = asyncio.current_task()
+        tasks = [task for task in self.tasks if task is not current]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
@@ -1,6 +1,10 @@
+import asyncio
 import copy
 from models.startgg_request import StartGG
+from models.startgg_gateway import create_startgg_client
 from models.match import Match
+from models.set_store import SetStore
+from models.bracket import BracketGraph
 global_id_counter = 0
 
 import threading
@@ -21,7 +25,7 @@ class Tournament:
         if startgg_request:
             self.sgg_request = startgg_request
         else:
-            self.sgg_request =  StartGG()
+            self.sgg_request = create_startgg_client()
         self.events = None
         self.selectedEvent = None
         self.name= None
@@ -31,6 +35,7 @@ class Tournament:
         self.selectedPoolId = None
         self.selectedPool = None
         self.playerList = []
+        self.playerListEventId = None  # Événement pour lequel playerList a été chargée
         self.DiscordIdForPlayer = {}
         self.selectedPhase = None
         self.rounds = None
@@ -41,8 +46,22 @@ class Tournament:
         self.round_where_bo5_start_winner = None 
         self.round_where_bo5_start_loser = None
         self.bo_custom = False  # Indique si la configuration par round est personnalisée
-        result = self.sgg_request.get_tournament(slug)
         self.already_selected = []
+        self.set_store = SetStore()  # Sets de la pool sélectionnée, synchronisés de façon incrémentale
+        self.full_sync_every = 20  # Synchronisation complète toutes les N synchronisations incrémentales
+        self._syncs_since_full = 0
+        self.bracket = None  # Graphe du bracket de la pool sélectionnée (voir load_bracket)
+        self.set_poller = None  # Polling partagé entre les pools d'un même événement (voir SetPoller)
+
+    @classmethod
+    async def create(cls, slug, startgg_request: StartGG = None):
+        """Crée un tournoi et charge ses informations depuis start.gg."""
+        tournament = cls(slug, startgg_request)
+        await tournament.load()
+        return tournament
+
+    async def load(self):
+        result = await self.sgg_request.get_tournament(self.slug)
         if result:
             self.name = result.get('name')
             self.events = result.get('events', [])
@@ -50,44 +69,52 @@ class Tournament:
             self.id = result.get('id')
             self.IsAdmin = result.get('admins', []) != None
         else:
-            raise ValueError(f"Tournament with slug '{slug}' not found.")
-    def _set_player_list(self):
+            raise ValueError(f"Tournament with slug '{self.slug}' not found.")
+    async def _set_player_list(self):
         if self.selectedEvent:
-            players = self.sgg_request.get_all_player_event(self.selectedEvent['id'])
-            if players:
-                for player in players:
-                    
-                    newPlayer = {
-                        'id': player['id'],
-                        'name': player['name'],
-                    }
-                    if player['participants'][0]['user'] != None:
-                            for elt in player['participants'][0]['user']['authorizations']:
-                                if elt['type'] == 'DISCORD':
-                                    newPlayer['discordId'] = elt['externalId']
-                                    newPlayer['discordName'] = elt['externalUsername']
-                    else:
-                        newPlayer['discordId'] = get_next_global_int_id()  # Assign a unique ID if no Discord ID is found
-                        newPlayer['discordName'] = None
-                    self.playerList.append(newPlayer)
-                for player in self.playerList:
-                    if player['discordId'] != None:
-                        self.DiscordIdForPlayer[player['id']] = player['discordId']
-            else:
+            # Liste déjà chargée pour cet événement : pas de nouvel appel API
+            if self.playerList and self.playerListEventId == self.selectedEvent['id']:
+                return
+            self.playerList = []
+            self.DiscordIdForPlayer = {}
+            try:
+                # Le mapping Discord est construit au fur et à mesure de l'arrivée des pages
+                async for players in self.sgg_request.iter_event_players(self.selectedEvent['id']):
+                    for player in players:
+                        newPlayer = {
+                            'id': player['id'],
+                            'name': player['name'],
+                        }
+                        if player['participants'][0]['user'] != None:
+                                for elt in player['participants'][0]['user']['authorizations'] or []:
+                                    if elt['type'] == 'DISCORD':
+                                        newPlayer['discordId'] = elt['externalId']
+                                        newPlayer['discordName'] = elt['externalUsername']
+                        else:
+                            newPlayer['discordId'] = get_next_global_int_id()  # Assign a unique ID if no Discord ID is found
+                            newPlayer['discordName'] = None
+                        self.playerList.append(newPlayer)
+                        if newPlayer.get('discordId') != None:
+                            self.DiscordIdForPlayer[newPlayer['id']] = newPlayer['discordId']
+                # Chargement complet : les appels suivants réutilisent la liste
+                self.playerListEventId = self.selectedEvent['id']
+            except ValueError as e:
+                print(e)
+            if not self.playerList:
                 raise ValueError("No players found for the selected event.")
         else:
             raise ValueError("No event selected. Please select an event first.")
-    def select_event(self, event_id :int):
-        self.selectedEvent = self.sgg_request.get_event_phases(event_id)
+    async def select_event(self, event_id :int):
+        self.selectedEvent = await self.sgg_request.get_event_phases(event_id)
         if self.selectedEvent:
-            self._set_player_list()
-            self.characterList = self.sgg_request.get_all_characters(self.selectedEvent['videogame']['id'])  # Mettre à jour la liste des personnages pour l'événement sélectionné
-    def select_event_by_name(self, event_name: str):
+            await self._set_player_list()
+            self.characterList = await self.sgg_request.get_all_characters(self.selectedEvent['videogame']['id'])  # Mettre à jour la liste des personnages pour l'événement sélectionné
+    async def select_event_by_name(self, event_name: str):
         event_name = event_name.replace('-', ' ')
         if self.events:
             for event in self.events:
                 if event['name'].lower() == event_name.lower():
-                    self.selectedEvent = self.sgg_request.get_event_phases(event['id'])
+                    self.selectedEvent = await self.sgg_request.get_event_phases(event['id'])
                     return
 
     def set_best_of(self, bestOf_N: int, round_where_bo5_start_winner: int = None , round_where_bo5_start_loser: int = None):
@@ -97,9 +124,9 @@ class Tournament:
             self.round_where_bo5_start_loser = round_where_bo5_start_loser
         else:
             raise ValueError("Best of N must be a positive integer.")
-    def get_event_phases(self):
+    async def get_event_phases(self):
         if self.selectedEvent:
-            phases = self.sgg_request.get_event_phases(self.selectedEvent['id'])
+            phases = await self.sgg_request.get_event_phases(self.selectedEvent['id'])
             if phases:
                 return phases
             else:
@@ -120,9 +147,11 @@ class Tournament:
                 if int(phase['id']) == int(phase_id):
                     self.selectedPhase = phase
                     self.selectedPoolId = None
+                    self.set_store.reset()
+                    self.bracket = None
         else:
             raise ValueError("No event selected. Please select an event first.")
-    def select_pool(self, pool_id: int):
+    async def select_pool(self, pool_id: int):
         if pool_id is not int:
             if pool_id.isdigit():
                 pool_id = int(pool_id)
@@ -131,11 +160,14 @@ class Tournament:
         if self.selectedPhase is None:
             return
         if self.selectedEvent:
+            if self.selectedPoolId != pool_id:
+                self.set_store.reset()
+                self.bracket = None
             self.selectedPoolId = pool_id
             for pool in self.selectedPhase.get('phaseGroups', [])['nodes']:
                 if int(pool['id']) == int(pool_id):
                     self.selectedPool = pool
-                    self._set_player_list()
+                    await self._set_player_list()
         else:
             raise ValueError("No event selected. Please select an event first.")
     def order_match(self,matchList):
@@ -151,7 +183,24 @@ class Tournament:
         # Tri de la liste
         sorted_data = sorted(matchList, key=custom_sort_key)
         return sorted_data
-    def get_matches(self, state : int = 1):
+    async def load_bracket(self):
+        """Charge le graphe du bracket de la pool (chemin critique de chaque set)."""
+        if self.selectedPoolId is None:
+            return None
+        sets = await self.sgg_request.get_phase_group_bracket(self.selectedPoolId)
+        if sets is not None:
+            self.bracket = BracketGraph(sets)
+        return self.bracket
+    def best_of_for(self, match) -> int:
+        """Nombre de jeux du set selon son round (BO5 à partir des rounds configurés)."""
+        if self.round_where_bo5_start_winner is not None and self.round_where_bo5_start_loser is not None:
+            if match['round'] >= self.round_where_bo5_start_winner and match['round'] >= 0:
+                return 5
+            elif match['round'] < 0 and match['round'] <= self.round_where_bo5_start_loser:
+                return 5
+            return 3
+        return self.bestOf_N
+    async def get_matches(self, state : int = 1, full_sync: bool = False):
         if self.selectedEvent == None:
             raise ValueError("No event selected. Please select an event first.")
         if self.selectedPhaseId == None:
@@ -159,21 +208,60 @@ class Tournament:
         if self.selectedPoolId == None:
             raise ValueError("No pool selected. Please select an pool first.")
 
-        matches = self.sgg_request.get_phase_matches(self.selectedEvent['id'], self.selectedPhaseId, self.selectedPoolId , state)
-        final_matches = []
-        if matches:
-            for match in matches[0]['sets']['nodes']:
-                entrants = match['slots']
-    
-                if entrants[0]['entrant'] != None and entrants[1]['entrant'] != None and match['stream'] == None:
-                    final_matches.append(match)
-                    
-            final_matches = self.order_match(final_matches)
-            
-            return final_matches
-        else:
+        if state == SetStore.CALLABLE_STATE:
+            # Sets non commencés : servis par le store local, mis à jour par deltas
+            await self.sync_sets(full=full_sync)
+            return self.order_match(self.set_store.callable_sets())
+
+        matches = await self.sgg_request.get_phase_matches(self.selectedEvent['id'], self.selectedPhaseId, self.selectedPoolId , state)
+        if matches is None:
             raise ValueError("No matches found for the selected phase.")
-    def get_round_of_match(self):
+        final_matches = []
+        for match in matches:
+            entrants = match['slots']
+            if entrants[0]['entrant'] != None and entrants[1]['entrant'] != None and match['stream'] == None:
+                final_matches.append(match)
+        return self.order_match(final_matches)
+    async def iter_matches(self, full_sync: bool = False):
+        """
+        Générateur asynchrone des sets appelables de la pool, page par page.
+        
+        Chaque page reçue est intégrée au store local puis produite aussitôt.
+        Hors synchronisation complète (premier appel, full_sync=True ou toutes
+        les full_sync_every fois), seuls les sets modifiés depuis la dernière
+        synchronisation sont demandés à start.gg.
+        """
+        if self.selectedEvent == None:
+            raise ValueError("No event selected. Please select an event first.")
+        if self.selectedPhaseId == None:
+            raise ValueError("No phase selected. Please select an phase first.")
+        if self.selectedPoolId == None:
+            raise ValueError("No pool selected. Please select an pool first.")
+
+        if self.set_poller is not None:
+            # Une seule requête pour toutes les pools de l'événement, répartie dans chaque store
+            await self.set_poller.sync(full=full_sync)
+            yield self.order_match(self.set_store.callable_sets())
+            return
+
+        updated_after = self.set_store.updated_after
+        full = full_sync or updated_after is None or self._syncs_since_full >= self.full_sync_every
+        seen_ids = set()
+        self.set_store.start_sync()
+        async for sets in self.sgg_request.iter_phase_sets(
+            self.selectedEvent['id'], self.selectedPhaseId, self.selectedPoolId,
+            SetStore.CALLABLE_STATE, updated_after=None if full else updated_after
+        ):
+            self.set_store.merge(sets)
+            seen_ids.update(match['id'] for match in sets)
+            yield self.order_match([match for match in sets if SetStore.is_callable(match)])
+        self.set_store.finish_sync(seen_ids if full else None)
+        self._syncs_since_full = 0 if full else self._syncs_since_full + 1
+    async def sync_sets(self, full: bool = False):
+        """Met à jour le store local des sets de la pool (toutes les pages)."""
+        async for _ in self.iter_matches(full_sync=full):
+            pass
+    async def get_round_of_match(self):
         if self.selectedEvent == None:
             raise ValueError("No event selected. Please select an event first.")
         if self.selectedPhaseId == None:
@@ -182,7 +270,7 @@ class Tournament:
             raise ValueError("No pool selected. Please select an pool first.")
         if self.rounds is not None:
             return self.rounds
-        matches = self.sgg_request.get_phase_match_for_round(self.selectedEvent['id'], self.selectedPhaseId, self.selectedPoolId)
+        matches = await self.sgg_request.get_phase_match_for_round(self.selectedEvent['id'], self.selectedPhaseId, self.selectedPoolId)
         if matches:
             roundList = []
             unique_rounds = []
@@ -197,7 +285,7 @@ class Tournament:
         else:
             raise ValueError("No matches found for the selected phase.")
     
-    def assign_Match_to_station(self, match , station_number: int):
+    async def assign_Match_to_station(self, match , station_number: int):
         if self.selectedEvent == None:
             raise ValueError("No event selected. Please select an event first.")
         if self.selectedPhaseId == None:
@@ -209,14 +297,13 @@ class Tournament:
             if s['number'] == station_number:
                 if s['isUsed'] == False:
                     s['isUsed'] = True
-                    myMatch.set_station(s['id'])
-                    myMatch.start_match()
+                    await asyncio.gather(myMatch.set_station(s['id']), myMatch.start_match())
                     s['match'] = match
                     print(f"Match assigné à la station {station_number}.")
                     return match
                 else:
                     raise ValueError(f"Station {station_number} is already in use.")
-    def create_station(self, number):
+    async def create_station(self, number):
         if not self.station:
             self.station = []
         else :
@@ -224,7 +311,7 @@ class Tournament:
                 if s['number'] == number:
                     print(f"Station {number} already exists.")
                     return
-        id = self.sgg_request.create_station(self.id, number)
+        id = await self.sgg_request.create_station(self.id, number)
         if id is None:
             print(f"Failed to create station {number}.")
             return
@@ -238,12 +325,12 @@ class Tournament:
         print(f"Station {number} created.")
         return new_station
        
-    def delete_station(self, number):
+    async def delete_station(self, number):
         if self.station:
             for s in self.station:
                 if s['number'] == number:
                     if not s['isUsed']:
-                        self.sgg_request.delete_station(s['id'])
+                        await self.sgg_request.delete_station(s['id'])
                         self.station.remove(s)
                         print(f"Station {number} deleted.")
                         return
@@ -265,34 +352,27 @@ class Tournament:
         else:
             print("No stations available.")
             return None
-    def __deepcopy__(self, memo = None):
-        if memo is None:
-            memo = {}
-        # Crée une nouvelle instance sans utiliser deepcopy sur sgg_request
-        copied = type(self)(self.slug)
-        memo[id(self)] = copied
+    def snapshot(self):
+        """
+        Tournoi d'une pool lancée, sans appel API ni copie profonde.
 
-        # Copie manuellement les champs, sauf ceux à éviter
-        for attr, value in self.__dict__.items():
-            if attr == 'sgg_request':
-                # Réutiliser la même instance (ou créer une nouvelle manuellement si besoin)
-                setattr(copied, attr, self.sgg_request)
-            else:
-                setattr(copied, attr, copy.deepcopy(value, memo))
+        Les données statiques (événements, joueurs, personnages, phase et
+        pool sélectionnées) sont partagées : elles ne sont jamais modifiées
+        en place, seulement remplacées lors d'un rechargement. Seul l'état
+        propre à la pool (stations, sets, bracket) est copié.
+        """
+        copied = copy.copy(self)
+        copied.station = [dict(station) for station in self.station] if self.station is not None else None
+        copied.already_selected = list(self.already_selected)
+        copied.set_store = self.set_store.copy()
+        copied.bracket = copy.deepcopy(self.bracket) if self.bracket is not None else None
+        # La copie n'est pas inscrite au polling partagé
+        copied.set_poller = None
         return copied
-    
+
 
 def sggMatch_to_MyMatch(match, tournament : Tournament):
-    if tournament.round_where_bo5_start_winner is not None and tournament.round_where_bo5_start_loser is not None:
-        if match['round'] >= tournament.round_where_bo5_start_winner and match['round'] >= 0:
-            bestOf_N = 5
-        elif match['round'] < 0 and match['round'] <= tournament.round_where_bo5_start_loser:
-            bestOf_N = 5
-        else :
-            bestOf_N = 3
-            
-    else:
-        bestOf_N = tournament.bestOf_N
+    bestOf_N = tournament.best_of_for(match)
     p1 = match['slots'][0]['entrant']
     p2 = match['slots'][1]['entrant']
     matchId = match['id']
@@ -26,5 +26,6 @@ def install_package(package):
 ensure_pip()
 install_package("requests")
 install_package("discord")
+install_package("aiohttp")
 install_package("python-dotenv")
 print("\n\nInstallation completed successfully!")
\ No newline at end of file
@@ -0,0 +1,3 @@
+from simulation.simulator import SimulationConfig, run_simulation
+
+__all__ = ["SimulationConfig", "run_simulation"]
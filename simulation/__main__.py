@@ -0,0 +1,42 @@
+import argparse
+import contextlib
+import io
+
+from simulation.simulator import SimulationConfig, run_simulation
+
+
+def main():
+    # Lancement : python -m simulation --entrants 32 256 2048 --stations 16
+    parser = argparse.ArgumentParser(description="Simulation d'un tournoi en double élimination (temps virtuel)")
+    parser.add_argument("--entrants", type=int, nargs="+", default=[32, 128, 512, 2048])
+    parser.add_argument("--stations", type=int, default=16)
+    parser.add_argument("--best-of", type=int, default=3)
+    parser.add_argument("--game-minutes", type=float, default=7.0)
+    parser.add_argument("--game-minutes-sd", type=float, default=2.5)
+    parser.add_argument("--no-show-rate", type=float, default=0.02)
+    parser.add_argument("--api-latency", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--verbose", action="store_true", help="Affiche les logs du bot")
+    args = parser.parse_args()
+
+    print(f"{'entrants':>8} {'sets':>6} {'durée (h)':>10} {'utilisation':>12} {'attente (min)':>14} {'API/set':>8}")
+    for entrants in args.entrants:
+        config = SimulationConfig(
+            entrants=entrants, stations=args.stations, best_of=args.best_of,
+            game_minutes=args.game_minutes, game_minutes_sd=args.game_minutes_sd,
+            no_show_rate=args.no_show_rate, api_latency=args.api_latency, seed=args.seed
+        )
+        logs = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+        with logs:
+            report = run_simulation(config)
+        print(
+            f"{report['entrants']:>8} {report['sets_played']:>6} {report['makespan_hours']:>10.2f} "
+            f"{report['station_utilisation']:>11.1%} {report['avg_player_idle_minutes']:>14.1f} "
+            f"{report['api_calls_per_set']:>8.2f}"
+        )
+        if not report['finished']:
+            print(f"⚠️  Bracket inachevé : {report['sets_remaining']} sets restants")
+
+
+if __name__ == "__main__":
+    main()
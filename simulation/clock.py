@@ -0,0 +1,65 @@
+import asyncio
+import contextlib
+import selectors
+import time
+
+
+class _VirtualSelector(selectors.SelectSelector):
+    """
+    Sélecteur de la boucle virtuelle : les descripteurs réels (le self-pipe
+    d'asyncio) sont interrogés sans attente, et l'attente demandée par la
+    boucle (jusqu'au prochain timer) est ajoutée à l'horloge virtuelle.
+    """
+    def __init__(self):
+        super().__init__()
+        self.loop = None
+
+    def select(self, timeout=None):
+        events = super().select(0)
+        if events:
+            return events
+        if timeout is None:
+            # Aucune tâche prête ni timer : plus rien ne pourra se produire
+            raise RuntimeError("Simulation bloquée : aucune tâche ni échéance en attente")
+        self.loop.advance(timeout)
+        return []
+
+
+class VirtualTimeLoop(asyncio.SelectorEventLoop):
+    """
+    Boucle asyncio en temps virtuel accéléré : quand aucune tâche n'est
+    prête, l'horloge saute directement à la prochaine échéance (asyncio.sleep,
+    wait_for...). Une journée de tournoi se joue en quelques secondes.
+
+    time() sert aussi d'horloge aux composants du bot (poll controller,
+    registre des joueurs occupés) pendant la simulation.
+    """
+    def __init__(self, start: float = 0.0):
+        selector = _VirtualSelector()
+        super().__init__(selector)
+        selector.loop = self
+        self._virtual_time = start
+
+    def time(self) -> float:
+        return self._virtual_time
+
+    def advance(self, seconds: float):
+        if seconds > 0:
+            self._virtual_time += seconds
+
+
+@contextlib.contextmanager
+def virtual_clocks(loop: VirtualTimeLoop):
+    """
+    Fait suivre le temps virtuel de la boucle à time.time et time.monotonic
+    (limiteur de débit, journal des mutations, cache du vrai client StartGG),
+    le temps de la simulation.
+    """
+    real_time, real_monotonic = time.time, time.monotonic
+    epoch = real_time()
+    time.time = lambda: epoch + loop.time()
+    time.monotonic = loop.time
+    try:
+        yield
+    finally:
+        time.time, time.monotonic = real_time, real_monotonic
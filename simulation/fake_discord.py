@@ -0,0 +1,86 @@
+import asyncio
+from collections import Counter
+from typing import Dict, List, Optional
+
+
+class FakeMember:
+    def __init__(self, member_id: int, name: str):
+        self.id = member_id
+        self.name = name
+
+
+class FakeCategory:
+    def __init__(self, name: str):
+        self.name = name
+
+
+class FakeChannel:
+    """Salon textuel : chaque appel compte comme une requête Discord et dure latency secondes."""
+    def __init__(self, guild: "FakeGuild", name: str, category: Optional[FakeCategory] = None,
+                 overwrites: Optional[Dict] = None):
+        self.guild = guild
+        self.name = name
+        self.category = category
+        self.overwrites = overwrites or {}
+
+    async def send(self, *args, **kwargs):
+        await self.guild.call("send")
+
+    async def edit(self, name: Optional[str] = None, **kwargs):
+        await self.guild.call("edit_channel")
+        if name is not None:
+            self.name = name
+
+    async def delete(self):
+        await self.guild.call("delete_channel")
+        if self in self.guild.channels:
+            self.guild.channels.remove(self)
+
+
+class FakeGuild:
+    """Serveur Discord minimal : ce que MatchManager utilise pour les salons de match."""
+    def __init__(self, members: List[FakeMember], latency: float = 0.15):
+        self.members = members
+        self.latency = latency
+        self.categories: List[FakeCategory] = []
+        self.channels: List[FakeChannel] = []
+        self.default_role = object()
+        self.calls = Counter()
+
+    async def call(self, method: str):
+        self.calls[method] += 1
+        await asyncio.sleep(self.latency)
+
+    async def create_category(self, name: str) -> FakeCategory:
+        await self.call("create_category")
+        category = FakeCategory(name)
+        self.categories.append(category)
+        return category
+
+    async def create_text_channel(self, name: str, category: Optional[FakeCategory] = None,
+                                  overwrites: Optional[Dict] = None) -> FakeChannel:
+        await self.call("create_channel")
+        channel = FakeChannel(self, name, category, overwrites)
+        self.channels.append(channel)
+        return channel
+
+
+class FakeFollowup:
+    def __init__(self, guild: FakeGuild):
+        self.guild = guild
+
+    async def send(self, *args, **kwargs):
+        await self.guild.call("followup")
+
+
+class FakeInteraction:
+    """Interaction de la commande /start_matches."""
+    def __init__(self, guild: FakeGuild):
+        self.guild = guild
+        self.channel = FakeChannel(guild, "admin")
+        self.followup = FakeFollowup(guild)
+
+
+class FakeBot:
+    def __init__(self, player_in_game):
+        self.player_in_game = player_in_game
@@ -0,0 +1,400 @@
+import asyncio
+import json
+import re
+from collections import Counter, deque
+from typing import Dict, List, Optional, Tuple
+
+# Entrant fictif des slots vides d'un bracket incomplet
+BYE = {"id": None, "name": "BYE", "bye": True}
+
+CREATED, ACTIVE, COMPLETED = 1, 2, 3
+
+
+def seed_order(size: int) -> List[int]:
+    """Ordre des seeds (1-indexés) dans le premier round d'un bracket de taille 2^k : 1 contre size, etc."""
+    order = [1]
+    while len(order) < size:
+        total = len(order) * 2 + 1
+        order = [seed for pair in ((s, total - s) for s in order) for seed in pair]
+    return order
+
+
+class FakeStartGG:
+    """
+    Faux serveur GraphQL start.gg pour le simulateur : un événement d'une
+    pool en double élimination.
+
+    Le bot l'interroge avec le vrai client StartGG, par l'intermédiaire de
+    FakeSession (la session aiohttp) : regroupement des mutations, journal,
+    limiteur de débit, cache et partage des requêtes sont ceux du bot.
+    Chaque document HTTP reçu compte dans calls (par opération) et dure
+    api_latency secondes de temps virtuel ; au-delà de requests_per_minute
+    documents par clé sur 60 secondes, le serveur répond 429 (Retry-After).
+    Les sets avec un BYE sont résolus automatiquement, comme sur start.gg.
+    """
+    TOURNAMENT_ID = 1
+    EVENT_ID = 10
+    PHASE_ID = 100
+    POOL_ID = 1000
+    PAGE_SIZE = 100
+
+    def __init__(self, entrants: int, api_latency: float = 0.3, requests_per_minute: int = 80):
+        if entrants < 4:
+            raise ValueError("Il faut au moins 4 entrants")
+        self.api_latency = api_latency
+        self.requests_per_minute = requests_per_minute
+        self.entrants = [{"id": i, "name": f"Player {i}"} for i in range(1, entrants + 1)]
+        self.discord_ids = {entrant["id"]: 10 ** 17 + entrant["id"] for entrant in self.entrants}
+        self.sets: Dict[int, Dict] = {}
+        # Set -> [(set suivant, index du slot, placement : 1 gagnant, 2 perdant)]
+        self.progressions: Dict[int, List[tuple]] = {}
+        self.stations: Dict[int, int] = {}
+        self.calls = Counter()  # Documents HTTP reçus, par opération (Batch pour les mutations groupées)
+        self.mutations = Counter()  # Mutations exécutées, par champ (plusieurs par document Batch)
+        self.throttled = 0  # Documents refusés en 429
+        self._recent_calls: Dict[str, deque] = {}  # Clé API -> heures des documents des 60 dernières secondes
+        self.finished = asyncio.Event()
+        self.grand_final_id = None
+        self.reset_id = None
+        self._next_id = 5000
+        self._build_bracket()
+
+    # Construction du bracket
+
+    def _now(self) -> float:
+        return asyncio.get_running_loop().time()
+
+    def _new_set(self, round_number: int, round_text: str) -> Dict:
+        self._next_id += 1
+        new_set = {
+            "id": self._next_id,
+            "identifier": None,
+            "round": round_number,
+            "fullRoundText": round_text,
+            "state": CREATED,
+            "updatedAt": 0,
+            "slots": [{"entrant": None, "prereqId": None, "prereqType": None, "prereqPlacement": None} for _ in range(2)],
+            "station": None,
+            # Chronologie, pour les mesures du simulateur
+            "assigned_at": None,
+            "completed_at": None,
+            "winner": None,
+            "loser": None,
+        }
+        self.sets[new_set["id"]] = new_set
+        self.progressions[new_set["id"]] = []
+        return new_set
+
+    def _link(self, source: Dict, target: Dict, slot_index: int, placement: int):
+        slot = target["slots"][slot_index]
+        slot.update(prereqId=source["id"], prereqType="set", prereqPlacement=placement)
+        self.progressions[source["id"]].append((target["id"], slot_index, placement))
+
+    def _build_bracket(self):
+        rounds = 1
+        while 2 ** rounds < len(self.entrants):
+            rounds += 1
+        size = 2 ** rounds
+        by_seed = {seed: entrant for seed, entrant in enumerate(self.entrants, 1)}
+
+        winners = []
+        first_round = []
+        order = seed_order(size)
+        for index in range(size // 2):
+            new_set = self._new_set(1, "Winners Round 1")
+            for slot_index, seed in enumerate(order[2 * index:2 * index + 2]):
+                new_set["slots"][slot_index].update(prereqId=seed, prereqType="seed")
+            first_round.append(new_set)
+        winners.append(first_round)
+        for round_number in range(2, rounds + 1):
+            text = "Winners Final" if round_number == rounds else f"Winners Round {round_number}"
+            previous = winners[-1]
+            current = []
+            for index in range(len(previous) // 2):
+                new_set = self._new_set(round_number, text)
+                self._link(previous[2 * index], new_set, 0, 1)
+                self._link(previous[2 * index + 1], new_set, 1, 1)
+                current.append(new_set)
+            winners.append(current)
+
+        losers_round = 1
+        losers_round_sets = []
+        for index in range(size // 4):
+            new_set = self._new_set(-losers_round, "Losers Round 1")
+            self._link(winners[0][2 * index], new_set, 0, 2)
+            self._link(winners[0][2 * index + 1], new_set, 1, 2)
+            losers_round_sets.append(new_set)
+        last_losers = losers_round_sets
+        for round_number in range(2, rounds + 1):
+            # Round de repêchage : gagnants des perdants contre perdants du round r des gagnants
+            losers_round += 1
+            dropping = winners[round_number - 1]
+            text = "Losers Final" if round_number == rounds else f"Losers Round {losers_round}"
+            current = []
+            for index, previous in enumerate(last_losers):
+                new_set = self._new_set(-losers_round, text)
+                self._link(previous, new_set, 0, 1)
+                self._link(dropping[len(dropping) - 1 - index], new_set, 1, 2)
+                current.append(new_set)
+            last_losers = current
+            if round_number < rounds:
+                losers_round += 1
+                reduced = []
+                for index in range(len(last_losers) // 2):
+                    new_set = self._new_set(-losers_round, f"Losers Round {losers_round}")
+                    self._link(last_losers[2 * index], new_set, 0, 1)
+                    self._link(last_losers[2 * index + 1], new_set, 1, 1)
+                    reduced.append(new_set)
+                last_losers = reduced
+
+        grand_final = self._new_set(rounds + 1, "Grand Final")
+        self._link(winners[-1][0], grand_final, 0, 1)
+        self._link(last_losers[0], grand_final, 1, 1)
+        reset = self._new_set(rounds + 2, "Grand Final Reset")
+        self._link(grand_final, reset, 0, 1)
+        self._link(grand_final, reset, 1, 2)
+        self.grand_final_id, self.reset_id = grand_final["id"], reset["id"]
+
+        # Placement des seeds (BYE au-delà du nombre d'entrants), puis résolution des BYE
+        for new_set in first_round:
+            for slot in new_set["slots"]:
+                slot["entrant"] = by_seed.get(slot["prereqId"], BYE)
+            self._resolve_byes(new_set)
+
+    # Déroulement du bracket
+
+    def _resolve_byes(self, bracket_set: Dict):
+        """Termine d'office un set dont un slot est un BYE, dès que ses deux slots sont connus."""
+        entrants = [slot["entrant"] for slot in bracket_set["slots"]]
+        if any(entrant is None for entrant in entrants) or bracket_set["state"] == COMPLETED:
+            return
+        if entrants[0].get("bye") or entrants[1].get("bye"):
+            winner, loser = (entrants[1], entrants[0]) if entrants[0].get("bye") else (entrants[0], entrants[1])
+            self._complete(bracket_set, winner, loser)
+
+    def _complete(self, bracket_set: Dict, winner: Dict, loser: Dict):
+        bracket_set.update(state=COMPLETED, winner=winner, loser=loser, updatedAt=int(self._now()))
+        if not (winner.get("bye") or loser.get("bye")):
+            bracket_set["completed_at"] = self._now()
+        if bracket_set["id"] == self.grand_final_id and winner is bracket_set["slots"][0]["entrant"]:
+            # Le joueur du côté gagnants remporte la grande finale : pas de reset
+            self.sets[self.reset_id].update(state=COMPLETED, updatedAt=int(self._now()))
+            self.finished.set()
+            return
+        if bracket_set["id"] == self.reset_id:
+            self.finished.set()
+            return
+        for target_id, slot_index, placement in self.progressions[bracket_set["id"]]:
+            target = self.sets[target_id]
+            target["slots"][slot_index]["entrant"] = winner if placement == 1 else loser
+            target["updatedAt"] = int(self._now())
+            self._resolve_byes(target)
+
+    @staticmethod
+    def _node(bracket_set: Dict) -> Dict:
+        """Set au format des nodes de la requête EventSets."""
+        return {
+            "id": bracket_set["id"],
+            "identifier": bracket_set["identifier"],
+            "round": bracket_set["round"],
+            "fullRoundText": bracket_set["fullRoundText"],
+            "state": bracket_set["state"],
+            "updatedAt": bracket_set["updatedAt"],
+            "phaseGroup": {"id": FakeStartGG.POOL_ID},
+            "slots": [
+                {"entrant": None if slot["entrant"] is None or slot["entrant"].get("bye")
+                 else {"name": slot["entrant"]["name"], "id": slot["entrant"]["id"]}}
+                for slot in bracket_set["slots"]
+            ],
+            "stream": None,
+            "station": {"id": bracket_set["station"]} if bracket_set["station"] else None,
+        }
+
+    # Transport : un document GraphQL par requête HTTP
+
+    async def post(self, payload: Dict, api_key: str) -> Tuple[int, Dict, Dict]:
+        """Traite un document GraphQL ; retourne (statut HTTP, en-têtes, corps JSON)."""
+        await asyncio.sleep(self.api_latency)
+        query, variables = payload["query"], payload.get("variables") or {}
+        operation = re.match(r"\s*(?:query|mutation)\s+(\w+)", query).group(1)
+        self.calls[operation] += 1
+        now = self._now()
+        recent = self._recent_calls.setdefault(api_key, deque())
+        while recent and recent[0] <= now - 60:
+            recent.popleft()
+        if len(recent) >= self.requests_per_minute:
+            self.throttled += 1
+            return 429, {"Retry-After": str(max(1, int(recent[0] + 60 - now) + 1))}, {"message": "Rate limit exceeded"}
+        recent.append(now)
+        handler = getattr(self, f"_op_{operation}", None)
+        if handler is None:
+            return 400, {}, {"errors": [{"message": f"Opération inconnue : {operation}"}]}
+        # Aller-retour JSON : le client ne reçoit jamais les objets du serveur
+        return 200, {}, json.loads(json.dumps(handler(query, variables)))
+
+    @staticmethod
+    def _page(nodes: List, variables: Dict) -> Dict:
+        per_page, page = variables["perPage"], variables["pageNumber"]
+        return {
+            "pageInfo": {"total": len(nodes), "totalPages": -(-len(nodes) // per_page) if per_page else 0},
+            "nodes": nodes[(page - 1) * per_page:page * per_page],
+        }
+
+    # Requêtes en lecture (nom de l'opération du document -> _op_<nom>)
+
+    def _op_Tournament(self, query: str, variables: Dict) -> Dict:
+        return {"data": {"tournament": {
+            "id": self.TOURNAMENT_ID,
+            "name": "Simulation",
+            "events": [{"id": self.EVENT_ID, "name": "Simulation", "numEntrants": len(self.entrants)}],
+            "admins": [],
+        }}}
+
+    def _op_EventPhases(self, query: str, variables: Dict) -> Dict:
+        return {"data": {"event": {
+            "id": self.EVENT_ID,
+            "name": "Simulation",
+            "numEntrants": len(self.entrants),
+            "phases": [{
+                "id": self.PHASE_ID,
+                "name": "Bracket",
+                "phaseGroups": {"nodes": [{"id": self.POOL_ID, "displayIdentifier": "A1"}]},
+            }],
+            "videogame": {"id": 1},
+        }}}
+
+    def _op_Videogame(self, query: str, variables: Dict) -> Dict:
+        return {"data": {"videogame": {"characters": [{"id": 1, "name": "Mario"}, {"id": 2, "name": "Link"}]}}}
+
+    def _op_EventPlayers(self, query: str, variables: Dict) -> Dict:
+        nodes = [{
+            "id": entrant["id"],
+            "name": entrant["name"],
+            "participants": [{"user": {"authorizations": [{
+                "id": entrant["id"],
+                "type": "DISCORD",
+                "externalId": str(self.discord_ids[entrant["id"]]),
+                "externalUsername": entrant["name"],
+            }]}}],
+        } for entrant in self.entrants]
+        return {"data": {"event": {"entrants": self._page(nodes, variables)}}}
+
+    def _op_EventSets(self, query: str, variables: Dict) -> Dict:
+        if str(self.POOL_ID) not in [str(pool_id) for pool_id in variables["phaseGroupIds"]]:
+            selected = []
+        elif "updatedAfter" in variables:
+            selected = [s for s in self.sets.values() if s["updatedAt"] >= variables["updatedAfter"]]
+        else:
+            state = variables["state"]
+            states = state if isinstance(state, list) else [state]
+            selected = [s for s in self.sets.values() if s["state"] in states]
+        # hideEmpty : sans les sets dont aucun joueur n'est encore connu
+        nodes = [self._node(s) for s in selected if any(slot["entrant"] is not None for slot in s["slots"])]
+        return {"data": {"event": {"sets": self._page(nodes, variables)}}}
+
+    def _op_PhaseGroupBracket(self, query: str, variables: Dict) -> Dict:
+        nodes = [{
+            "id": s["id"],
+            "identifier": s["identifier"],
+            "round": s["round"],
+            "fullRoundText": s["fullRoundText"],
+            "slots": [{key: slot[key] for key in ("prereqId", "prereqType", "prereqPlacement")} for slot in s["slots"]],
+        } for s in self.sets.values()]
+        return {"data": {"phaseGroup": {"sets": self._page(nodes, variables)}}}
+
+    # Mutations
+
+    def _op_UpsertStation(self, query: str, variables: Dict) -> Dict:
+        station_id = 90000 + variables["fields"]["number"]
+        self.stations[station_id] = variables["fields"]["number"]
+        self.mutations["upsertStation"] += 1
+        return {"data": {"upsertStation": {"id": station_id}}}
+
+    def _op_DeleteStation(self, query: str, variables: Dict) -> Dict:
+        self.stations.pop(int(variables["stationId"]), None)
+        self.mutations["deleteStation"] += 1
+        return {"data": {"deleteStation": True}}
+
+    def _op_Batch(self, query: str, variables: Dict) -> Dict:
+        """Document aliasé de StartGG._send_batch : champs exécutés dans l'ordre, erreurs par alias."""
+        data, errors = {}, []
+        for alias, field, call_args in re.findall(r"^\s*(\w+): (\w+)\(([^)]*)\)", query, re.MULTILINE):
+            arguments = {}
+            for argument in call_args.split(","):
+                name, variable = (part.strip() for part in argument.split(":"))
+                arguments[name] = variables[variable.lstrip("$")]
+            self.mutations[field] += 1
+            bracket_set = self.sets.get(int(arguments["setId"]))
+            handler = getattr(self, f"_mutation_{field}", None)
+            if bracket_set is None or handler is None:
+                data[alias] = None
+                errors.append({"message": f"{field} : set {arguments['setId']} introuvable", "path": [alias]})
+                continue
+            data[alias] = handler(bracket_set, arguments)
+        response = {"data": data}
+        if errors:
+            response["errors"] = errors
+        return response
+
+    def _mutation_assignStation(self, bracket_set: Dict, arguments: Dict) -> Dict:
+        bracket_set["station"] = int(arguments["stationId"])
+        bracket_set["updatedAt"] = int(self._now())
+        if bracket_set["assigned_at"] is None:
+            bracket_set["assigned_at"] = self._now()
+        return {"identifier": bracket_set["identifier"]}
+
+    def _mutation_markSetCalled(self, bracket_set: Dict, arguments: Dict) -> Dict:
+        return {"id": bracket_set["id"]}
+
+    def _mutation_markSetInProgress(self, bracket_set: Dict, arguments: Dict) -> Dict:
+        if bracket_set["state"] == CREATED:
+            bracket_set.update(state=ACTIVE, updatedAt=int(self._now()))
+        return {"id": bracket_set["id"]}
+
+    def _mutation_resetSet(self, bracket_set: Dict, arguments: Dict) -> Dict:
+        bracket_set.update(state=CREATED, updatedAt=int(self._now()), assigned_at=None)
+        return {"id": bracket_set["id"]}
+
+    def _mutation_reportBracketSet(self, bracket_set: Dict, arguments: Dict) -> Dict:
+        if bracket_set["state"] != COMPLETED:
+            first, second = (slot["entrant"] for slot in bracket_set["slots"])
+            winner_id = int(arguments["winnerId"])
+            self._complete(bracket_set, *((first, second) if first["id"] == winner_id else (second, first)))
+        return {"id": bracket_set["id"], "state": bracket_set["state"], "identifier": bracket_set["identifier"]}
+
+
+class FakeResponse:
+    """Réponse HTTP de FakeSession (sous-ensemble d'aiohttp.ClientResponse utilisé par StartGG)."""
+    def __init__(self, backend: FakeStartGG, payload: Dict, api_key: str):
+        self._request = backend.post(payload, api_key)
+        self.status = None
+        self.headers: Dict = {}
+        self._body = None
+
+    async def __aenter__(self) -> "FakeResponse":
+        self.status, self.headers, self._body = await self._request
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def json(self, content_type=None) -> Dict:
+        return self._body
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise RuntimeError(f"HTTP {self.status}")
+
+
+class FakeSession:
+    """Session aiohttp simulée : chaque post() est un document envoyé au faux serveur."""
+    closed = False
+
+    def __init__(self, backend: FakeStartGG):
+        self.backend = backend
+
+    def post(self, url: str, headers: Dict, json: Dict) -> FakeResponse:
+        return FakeResponse(self.backend, json, headers["Authorization"].split(" ", 1)[1])
+
+    async def close(self):
+        self.closed = True
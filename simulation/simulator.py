@@ -0,0 +1,181 @@
+import asyncio
+import os
+import random
+import tempfile
+from typing import Dict, Optional, Tuple
+
+from models.global_scheduler import GlobalMatchScheduler
+from models.match_manager import MatchManager
+from models.match_scheduler import BusyPlayers
+from models.set_poller import SetPoller
+from models.startgg_request import StartGG
+from models.tournament import Tournament
+from simulation.clock import VirtualTimeLoop, virtual_clocks
+from simulation.fake_discord import FakeBot, FakeGuild, FakeInteraction, FakeMember
+from simulation.fake_startgg import FakeSession, FakeStartGG
+
+
+class SimulationConfig:
+    """
+    Paramètres d'une simulation.
+
+    Args:
+        entrants: nombre de joueurs (bracket double élimination, BYE au-delà d'une puissance de 2)
+        stations: nombre de setups
+        best_of: format des sets
+        game_minutes, game_minutes_sd: durée d'un jeu (loi normale, tronquée à 1 minute)
+        no_show_rate: probabilité qu'un joueur ne se présente pas (DQ après la vérification de présence)
+        check_in_seconds: délai de présence des joueurs (uniforme entre les deux bornes)
+        api_latency, discord_latency: durée d'un appel start.gg / Discord (secondes)
+        max_hours: durée maximale simulée
+    """
+    def __init__(self, entrants: int = 64, stations: int = 8, best_of: int = 3,
+                 game_minutes: float = 7.0, game_minutes_sd: float = 2.5, no_show_rate: float = 0.02,
+                 check_in_seconds: Tuple[float, float] = (15, 120), api_latency: float = 0.3,
+                 discord_latency: float = 0.15, seed: Optional[int] = None, max_hours: float = 72):
+        self.entrants = entrants
+        self.stations = stations
+        self.best_of = best_of
+        self.game_minutes = game_minutes
+        self.game_minutes_sd = game_minutes_sd
+        self.no_show_rate = no_show_rate
+        self.check_in_seconds = check_in_seconds
+        self.api_latency = api_latency
+        self.discord_latency = discord_latency
+        self.seed = seed
+        self.max_hours = max_hours
+
+
+class PlayerModel:
+    """Comportement simulé des joueurs : présence, durée des jeux et résultats (classement Elo)."""
+    # Durée d'attente de la vue de présence avant DQ (PlayerPresenceView)
+    PRESENCE_TIMEOUT = 300
+
+    def __init__(self, config: SimulationConfig, entrants, rng: random.Random):
+        self.config = config
+        self.rng = rng
+        # Meilleur seed, meilleur classement (avec du bruit)
+        self.ratings = {
+            entrant["name"]: 1800 - 600 * index / max(1, len(entrants) - 1) + rng.gauss(0, 100)
+            for index, entrant in enumerate(entrants)
+        }
+
+    async def presence_check(self, channel, my_match, match_manager, station_number):
+        absent = [self.rng.random() < self.config.no_show_rate for _ in range(2)]
+        if any(absent):
+            await asyncio.sleep(self.PRESENCE_TIMEOUT)
+            # Comme la vue : sans réponse des deux joueurs, le joueur 2 est DQ
+            return 'dq_p1' if absent[0] and not absent[1] else 'dq_p2'
+        await asyncio.sleep(self.rng.uniform(*self.config.check_in_seconds))
+        return 'continue'
+
+    async def game_report(self, channel, player1, player2, characters):
+        minutes = max(1.0, self.rng.gauss(self.config.game_minutes, self.config.game_minutes_sd))
+        await asyncio.sleep(minutes * 60)
+        p1_win = 1 / (1 + 10 ** ((self.ratings[player2] - self.ratings[player1]) / 400))
+        character = characters[0] if characters else None
+        return {"isP1Winner": self.rng.random() < p1_win, "p1_char": character, "p2_char": character}
+
+
+def _metrics(backend: FakeStartGG, guild: FakeGuild, config: SimulationConfig,
+             started_at: float, ended_at: float, setup_calls: int) -> Dict[str, float]:
+    played = [
+        s for s in backend.sets.values()
+        if s["assigned_at"] is not None and s["completed_at"] is not None
+    ]
+    last_completion = max((s["completed_at"] for s in played), default=started_at)
+    makespan = last_completion - started_at
+    busy = sum(s["completed_at"] - s["assigned_at"] for s in played)
+
+    # Attente des joueurs entre la fin d'un set et l'appel du suivant
+    timeline: Dict[int, list] = {}
+    for s in played:
+        for slot in s["slots"]:
+            timeline.setdefault(slot["entrant"]["id"], []).append((s["assigned_at"], s["completed_at"]))
+    gaps = []
+    for sets in timeline.values():
+        sets.sort()
+        gaps.extend(max(0.0, start - previous_end) for (_, previous_end), (start, _) in zip(sets, sets[1:]))
+
+    # Documents HTTP envoyés à start.gg (un document Batch regroupe plusieurs mutations)
+    api_calls = sum(backend.calls.values()) - setup_calls
+    remaining = sum(
+        1 for s in backend.sets.values()
+        if s["state"] != 3 and s["id"] != backend.reset_id
+    )
+    return {
+        "entrants": config.entrants,
+        "stations": config.stations,
+        "sets_played": len(played),
+        "sets_remaining": remaining,
+        "finished": backend.finished.is_set(),
+        "makespan_hours": makespan / 3600,
+        "station_utilisation": busy / (config.stations * makespan) if makespan > 0 else 0.0,
+        "avg_player_idle_minutes": sum(gaps) / len(gaps) / 60 if gaps else 0.0,
+        "api_calls_per_set": api_calls / len(played) if played else 0.0,
+        "api_calls": dict(backend.calls),
+        "mutations": dict(backend.mutations),
+        "throttled_calls": backend.throttled,
+        "discord_calls": dict(guild.calls),
+        "simulated_hours": (ended_at - started_at) / 3600,
+    }
+
+
+async def _simulate(config: SimulationConfig, journal_path: str) -> Dict[str, float]:
+    loop = asyncio.get_running_loop()
+    rng = random.Random(config.seed)
+    backend = FakeStartGG(config.entrants, api_latency=config.api_latency)
+    # Vrai client start.gg (lots, journal, limiteur de débit, cache), seul le transport HTTP est simulé
+    client = StartGG(api_keys=["simulation"], journal_path=journal_path)
+    client._session = FakeSession(backend)
+    guild = FakeGuild(
+        [FakeMember(backend.discord_ids[entrant["id"]], entrant["name"]) for entrant in backend.entrants],
+        latency=config.discord_latency
+    )
+    players = PlayerModel(config, backend.entrants, rng)
+
+    # Même préparation que /setup_tournament, sur le faux backend
+    tournament = await Tournament.create("simulation", client)
+    await tournament.select_event(FakeStartGG.EVENT_ID)
+    tournament.select_event_phase(str(FakeStartGG.PHASE_ID))
+    await tournament.select_pool(str(FakeStartGG.POOL_ID))
+    tournament.set_best_of(config.best_of)
+    for number in range(1, config.stations + 1):
+        await tournament.create_station(number)
+
+    bot = FakeBot(BusyPlayers(clock=loop.time))
+    manager = MatchManager(bot, tournament)
+    # Polling partagé de l'événement, comme après /start_matches (attach_set_pollers)
+    SetPoller(client, tournament.selectedEvent['id'], clock=loop.time).register(tournament)
+    manager.presence_check = players.presence_check
+    manager.game_report = players.game_report
+    interaction = FakeInteraction(guild)
+
+    setup_calls = sum(backend.calls.values())
+    started_at = loop.time()
+    scheduler = GlobalMatchScheduler([manager])
+    await scheduler.start(interaction)
+    waiters = [asyncio.ensure_future(backend.finished.wait())]
+    if scheduler.task is not None:
+        # Boucle arrêtée avant la fin du bracket : la simulation le signale (sets_remaining)
+        waiters.append(scheduler.task)
+    await asyncio.wait(waiters, timeout=config.max_hours * 3600, return_when=asyncio.FIRST_COMPLETED)
+    ended_at = loop.time()
+    scheduler.stop()
+    await client.close()
+    return _metrics(backend, guild, config, started_at, ended_at, setup_calls)
+
+
+def run_simulation(config: SimulationConfig) -> Dict[str, float]:
+    """Joue un tournoi complet en temps virtuel et retourne les mesures (durée, utilisation, attente, appels API)."""
+    loop = VirtualTimeLoop()
+    with tempfile.TemporaryDirectory() as journal_dir, virtual_clocks(loop):
+        try:
+            return loop.run_until_complete(_simulate(config, os.path.join(journal_dir, "journal.sqlite3")))
+        finally:
+            # Tâches encore en vol (suppression des salons, actualisation...) : abandonnées
+            pending = asyncio.all_tasks(loop)
+            for task in pending:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            loop.close()
@@ -2,7 +2,6 @@ from random import random
 import discord
 from models.lang import translate
 from models.tournament import Tournament
-import copy
 
 
 class BoSelector(discord.ui.Select):
@@ -64,11 +63,10 @@ class BoSelector(discord.ui.Select):
 
 
 class RoundBoSelector(discord.ui.Select):
-    def __init__(self, tournament: 'Tournament', bracket_type: str):
+    def __init__(self, tournament: 'Tournament', bracket_type: str, matches):
         self.tournament = tournament
         self.bracket_type = bracket_type  # "winner" ou "loser"
         
-        matches = tournament.get_round_of_match()
         options = []
         
         # Récupère la valeur actuellement configurée
@@ -294,14 +292,14 @@ class PlayerCanCheckPresenceSelector(discord.ui.Select):
 
 # Vue séparée pour la configuration custom des BOs
 class CustomBoConfigView(discord.ui.View):
-    def __init__(self, main_view, tournament):
+    def __init__(self, main_view, tournament, rounds):
         super().__init__(timeout=300)
         self.main_view = main_view
         self.tournament = tournament
         
         # Ajouter les sélecteurs pour winner et loser bracket
-        self.add_item(RoundBoSelector(tournament, "winner"))
-        self.add_item(RoundBoSelector(tournament, "loser"))
+        self.add_item(RoundBoSelector(tournament, "winner", rounds))
+        self.add_item(RoundBoSelector(tournament, "loser", rounds))
         
         # Bouton pour revenir à la configuration principale
         back_button = discord.ui.Button(
@@ -395,7 +393,8 @@ class SetupAndBestOfConfig(discord.ui.View):
 
     async def show_custom_config(self, interaction: discord.Interaction):
         """Affiche la vue de configuration custom dans un nouveau message"""
-        custom_view = CustomBoConfigView(self, self.tournament)
+        rounds = await self.tournament.get_round_of_match()
+        custom_view = CustomBoConfigView(self, self.tournament, rounds)
         
         embed = discord.Embed(
             title="🔧 Configuration Best-Of personnalisée",
@@ -450,24 +449,27 @@ class SetupAndBestOfConfig(discord.ui.View):
             # Créer les nouvelles stations selon la configuration
             for i in range(self.num_setups):
                 setup_number = self.first_setup_number + i
-                self.tournament.create_station(setup_number)
+                await self.tournament.create_station(setup_number)
             
+            # Configurer le BO dans le gestionnaire
+            if self.selected_bo != "custom":
+                self.tournament.set_best_of(int(self.selected_bo))
+
+            # Instantané de la pool : joueurs, personnages et événement partagés,
+            # stations et sets copiés (aucun appel API, aucune copie profonde)
+            pool_tournament = self.tournament.snapshot()
+
             # Créer le gestionnaire de matchs avec la configuration BO
             from models.match_manager import MatchManager
             player_can_check_presence_of_other_player = self.player_can_check_presence
-            match_manager = MatchManager(self.bot, self.tournament, player_can_check_presence_of_other_player=player_can_check_presence_of_other_player)
-            match_manager.player_list = self.tournament.DiscordIdForPlayer
+            match_manager = MatchManager(self.bot, pool_tournament, player_can_check_presence_of_other_player=player_can_check_presence_of_other_player)
+            match_manager.player_list = pool_tournament.DiscordIdForPlayer
 
-            # Configurer le BO dans le gestionnaire
-            if self.selected_bo != "custom":
-                self.tournament.set_best_of(int(self.selected_bo))
-            # Assigner aux variables globales du bot
-            #Ajoute un nombre random entre 1 et 1000 pour éviter les conflit
-           
+            # Assigner aux variables globales du bot (le gestionnaire et la liste partagent l'instantané)
             if hasattr(self.bot, 'current_tournament'):
-                self.bot.current_tournament.append( copy.deepcopy(self.tournament) )
+                self.bot.current_tournament.append(pool_tournament)
             if hasattr(self.bot, 'match_manager'):
-                self.bot.match_manager.append( match_manager.deepcopy() )
+                self.bot.match_manager.append(match_manager)
 
             # Créer l'embed de confirmation
             embed = discord.Embed(
@@ -31,7 +31,7 @@ class EventSelector(discord.ui.Select):
         selected_event = next((event for event in self.tournament.events if str(event['id']) == selected_event_id), None)
         if selected_event:
             self.tournament.selectedEvent = selected_event
-            self.tournament.select_event(selected_event['id'])
+            await self.tournament.select_event(selected_event['id'])
             # Réinitialiser les sélections dépendantes
             self.tournament.selectedPhase = None
             self.tournament.selectedPools = []
@@ -150,7 +150,7 @@ class PoolSelector(discord.ui.Select):
             selected_pool = next((pool for pool in self.tournament.selectedPhase['phaseGroups']['nodes'] if str(pool['id']) == selected_pool_id), None)
             if selected_pool:
                 self.tournament.selectedPool = selected_pool
-                self.tournament.select_pool(selected_pool_id)
+                await self.tournament.select_pool(selected_pool_id)
             
             await interaction.response.defer(ephemeral=True)
         else:
@@ -212,7 +212,7 @@ class TournamentView(discord.ui.View):
 
         # Mettre à jour la liste des joueurs
         tournament = self.tournament
-        tournament._set_player_list()
+        await tournament._set_player_list()
         
         embed = discord.Embed(
             title=translate("tournament_validated_title"),
@@ -1,6 +1,7 @@
 import discord
 from models.lang import translate
 from models.tournament import Tournament
+from models.startgg_gateway import create_startgg_client
 from view.event_selector_view import TournamentView
 
 
@@ -71,15 +72,25 @@ class TournamentModal(discord.ui.Modal):
             )
             return
         
-        tournament = Tournament(tournament_slug)
-        if len(link_parts) >= 7:
-            tournament.select_event_by_name(link_parts[6].strip())
-        if len(link_parts) >= 9:
-            tournament.select_event_phase(link_parts[8].strip())
-        if len(link_parts) >= 10:
-            tournament.select_pool(link_parts[9].strip())
+        # Un seul client start.gg pour tout le bot (session HTTP, journal, compteurs de débit)
+        sgg_request = None
+        if self.bot is not None:
+            if getattr(self.bot, 'sgg_request', None) is None:
+                self.bot.sgg_request = create_startgg_client()
+            sgg_request = self.bot.sgg_request
+        try:
+            tournament = await Tournament.create(tournament_slug, sgg_request)
+        except ValueError:
+            tournament = None
+        if tournament is not None:
+            if len(link_parts) >= 7:
+                await tournament.select_event_by_name(link_parts[6].strip())
+            if len(link_parts) >= 9:
+                tournament.select_event_phase(link_parts[8].strip())
+            if len(link_parts) >= 10:
+                await tournament.select_pool(link_parts[9].strip())
             
-        if tournament.id is None:
+        if tournament is None or tournament.id is None:
             await interaction.followup.send(
                 translate("tournament_not_found", slug=tournament_slug),
                 ephemeral=True
@@ -93,7 +104,7 @@ class TournamentModal(discord.ui.Modal):
             )
             return
         
-        self._initialize_tournament_defaults(tournament)
+        await self._initialize_tournament_defaults(tournament)
         
         # Étape 1: Demander le nombre de tournois
         number_view = TournamentNumberView()
@@ -154,9 +165,9 @@ class TournamentModal(discord.ui.Modal):
         except (IndexError, AttributeError):
             return None
 
-    def _initialize_tournament_defaults(self, tournament):
+    async def _initialize_tournament_defaults(self, tournament):
         if hasattr(tournament, 'events') and tournament.events:
-            tournament.select_event(tournament.events[0]['id'])
+            await tournament.select_event(tournament.events[0]['id'])
             if hasattr(tournament.selectedEvent, 'phases') and tournament.selectedEvent.get('phases'):
                 tournament.selectedPhase = tournament.selectedEvent['phases'][0]
                 if 'pools' in tournament.selectedPhase: